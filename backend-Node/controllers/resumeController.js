@@ -37,21 +37,8 @@ const analyzeResume = asyncHandler(async (req, res) => {
 
     console.log("Resume analysis successful")
 
-    // Extract resume score from analysis
-    const analysisText = response.data.analysis
-    let resumeScore = 0
-    
-    // Try to extract ATS score from the analysis
-    const atsMatch = analysisText.match(/ATS Score[:\s]+(\d+)/i)
-    if (atsMatch) {
-      resumeScore = parseInt(atsMatch[1])
-    } else {
-      // Try to extract strength score
-      const strengthMatch = analysisText.match(/Strength Score[:\s]+(\d+)/i)
-      if (strengthMatch) {
-        resumeScore = parseInt(strengthMatch[1])
-      }
-    }
+    // The Python backend returns the ATS score alongside the rendered report
+    const resumeScore = response.data.resumeScore || 0
 
     // Save resume score to UserStats
     let userStats = await UserStats.findOne({ userId: req.user._id })
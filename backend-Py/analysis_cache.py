@@ -0,0 +1,230 @@
+"""Content-addressed cache for resume analysis results.
+
+Entries are keyed on a hash of the uploaded PDF bytes plus the normalized job
+description, so a re-upload of the same file skips extraction and scoring
+entirely.  The in-memory tier is an LRU bounded by total payload size with a
+per-entry TTL; an optional SQLite tier (ANALYSIS_CACHE_DB) keeps results
+across restarts and is consulted on memory misses.  Requests never write to
+SQLite themselves: new entries and access times are queued for a writer
+thread, which applies them in batched transactions and drops them (counted)
+if the queue is full.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import request_log
+
+CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+CACHE_DB_PATH = os.getenv("ANALYSIS_CACHE_DB")
+CACHE_DB_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_DB_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Bump when the cached payload shape changes so stale entries are never served
+CACHE_FORMAT_VERSION = b"3"
+
+# The SQLite size check is a table scan, so it only runs every N writes
+DB_TRIM_INTERVAL = 64
+DB_WRITE_QUEUE = 10000
+DB_WRITE_BATCH = 200
+
+
+def normalize_job_description(job_description):
+    """Collapse case and whitespace so trivially different inputs share a key"""
+    return " ".join((job_description or "").lower().split())
+
+
+def cache_key(pdf_bytes, job_description=None):
+    """Return the content address for an upload and job description pair"""
+    digest = hashlib.sha256(CACHE_FORMAT_VERSION + b"\0")
+    digest.update(pdf_bytes)
+    digest.update(b"\0")
+    digest.update(normalize_job_description(job_description).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Size-bounded LRU with TTL and an optional SQLite second tier"""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL_SECONDS,
+                 db_path=CACHE_DB_PATH, db_max_bytes=CACHE_DB_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.db_max_bytes = db_max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, encoded payload)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_path = db_path
+        self._db_writes = 0
+        self._writes = queue.Queue(maxsize=DB_WRITE_QUEUE)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.disk_writes_dropped = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS analysis_cache_last_access ON analysis_cache (last_access)"
+            )
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get(self, key):
+        """Return the cached payload for key, or None on a miss"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, encoded = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(encoded)
+                self._remove(key)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT payload, expires_at FROM analysis_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._queue_write(("touch", key, now))
+                    self._store(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return json.loads(row[0])
+
+            self.misses += 1
+            return None
+
+    def put(self, key, payload):
+        """Cache a JSON-serializable payload under key"""
+        if not self.enabled:
+            return
+        encoded = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, encoded, expires_at)
+        if self._db is not None:
+            self._queue_write(("put", key, encoded, expires_at, time.time()))
+
+    def _queue_write(self, write):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="analysis-cache", daemon=True)
+                    self._writer.start()
+        try:
+            self._writes.put_nowait(write)
+        except queue.Full:
+            self.disk_writes_dropped += 1
+
+    def _write_loop(self):
+        db = sqlite3.connect(self._db_path, timeout=30)
+        stopping = False
+        while not stopping:
+            writes = [self._writes.get()]
+            while len(writes) < DB_WRITE_BATCH:
+                try:
+                    writes.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            if writes[-1] is None:
+                stopping = True
+                writes.pop()
+            try:
+                with db:
+                    for write in writes:
+                        if write[0] == "put":
+                            _, key, encoded, expires_at, accessed = write
+                            db.execute(
+                                "INSERT OR REPLACE INTO analysis_cache (key, payload, size, expires_at, last_access) "
+                                "VALUES (?, ?, ?, ?, ?)",
+                                (key, encoded, len(encoded), expires_at, accessed),
+                            )
+                            self._db_writes += 1
+                            if self._db_writes % DB_TRIM_INTERVAL == 0:
+                                self._trim_db(db)
+                        else:
+                            _, key, accessed = write
+                            db.execute("UPDATE analysis_cache SET last_access = ? WHERE key = ?", (accessed, key))
+            except sqlite3.Error as e:
+                request_log.event("analysis_cache_write_failed", logging.WARNING, error=str(e))
+        db.close()
+
+    def close(self):
+        """Write everything queued so far and stop the writer thread"""
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "disk_tier": self._db is not None,
+                "disk_writes_queued": self._writes.qsize(),
+                "disk_writes_dropped": self.disk_writes_dropped,
+            }
+
+    def _store(self, key, encoded, expires_at):
+        size = len(encoded)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, encoded)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, encoded = self._entries.pop(key)
+        self._bytes -= len(encoded)
+
+    def _trim_db(self, db):
+        now = time.time()
+        db.execute("DELETE FROM analysis_cache WHERE expires_at <= ?", (now,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()[0]
+        if total <= self.db_max_bytes:
+            return
+        # Drop least recently used rows until the table fits its budget again
+        excess = total - self.db_max_bytes
+        rows = db.execute("SELECT key, size FROM analysis_cache ORDER BY last_access")
+        stale = []
+        for key, size in rows:
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM analysis_cache WHERE key = ?", stale)
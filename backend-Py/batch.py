@@ -0,0 +1,136 @@
+"""Batch resume analysis: upload expansion and NDJSON result streaming"""
+
+import asyncio
+import io
+import json
+import os
+import zipfile
+
+from uploads import MAX_UPLOAD_BYTES, UploadTooLargeError, read_upload
+
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_UPLOAD_BYTES = int(os.getenv("BATCH_MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+# Total size of the PDFs a batch may expand to, zip members included
+BATCH_MAX_EXPANDED_BYTES = int(os.getenv("BATCH_MAX_EXPANDED_BYTES", str(256 * 1024 * 1024)))
+
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class BatchError(Exception):
+    """Raised when a batch as a whole cannot be accepted"""
+
+
+def _zip_members(filename, data):
+    """Yield (name, bytes) for each PDF inside a zip archive"""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile as e:
+        raise BatchError(f"{filename}: not a valid zip archive") from e
+    with archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(".pdf"):
+                continue
+            if info.file_size > MAX_UPLOAD_BYTES:
+                yield name, UploadTooLargeError(MAX_UPLOAD_BYTES)
+                continue
+            # Read with a cap; the declared size in the header is not trusted
+            with archive.open(info) as member:
+                content = member.read(MAX_UPLOAD_BYTES + 1)
+            if len(content) > MAX_UPLOAD_BYTES:
+                yield name, UploadTooLargeError(MAX_UPLOAD_BYTES)
+            else:
+                yield name, content
+
+
+def _expand(uploads, max_files=BATCH_MAX_FILES, max_bytes=BATCH_MAX_EXPANDED_BYTES):
+    """Unpack [(name, bytes)] uploads into [(name, bytes or error)], enforcing the batch limits.
+
+    The limits are checked as each zip member is read, so an oversized
+    archive is rejected after at most one member past a limit rather than
+    after decompressing all of it.
+    """
+    items = []
+    expanded = 0
+
+    def add(name, content):
+        nonlocal expanded
+        if len(items) >= max_files:
+            raise BatchError(f"Batch exceeds the {max_files} file limit")
+        if not isinstance(content, Exception):
+            expanded += len(content)
+            if expanded > max_bytes:
+                raise BatchError(f"Batch expands to more than {max_bytes} bytes")
+        items.append((name, content))
+
+    for filename, data in uploads:
+        if filename.lower().endswith(".zip") or data.startswith(ZIP_MAGIC):
+            for name, content in _zip_members(filename, data):
+                add(name, content)
+        elif len(data) > MAX_UPLOAD_BYTES:
+            add(filename, UploadTooLargeError(MAX_UPLOAD_BYTES))
+        else:
+            add(filename, data)
+    if not items:
+        raise BatchError("No PDF files found in the batch")
+    return items
+
+
+async def expand_uploads(files):
+    """Read every upload, unpacking zip archives, into [(name, bytes or error)]"""
+    uploads = []
+    for upload in files:
+        try:
+            data = await read_upload(upload, BATCH_MAX_UPLOAD_BYTES)
+        except UploadTooLargeError as e:
+            raise BatchError(str(e)) from e
+        uploads.append((upload.filename or f"file-{len(uploads) + 1}.pdf", data))
+    # Decompression is synchronous; keep it off the event loop
+    return await asyncio.to_thread(_expand, uploads)
+
+
+def _line(record):
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+async def stream_results(items, analyze, concurrency=BATCH_CONCURRENCY):
+    """Analyze items concurrently and yield one NDJSON line per resume as it finishes.
+
+    analyze is an async callable taking (pdf_bytes, filename) and returning a
+    structured result.  Failures are reported per file; the last line is a
+    summary with the success and failure counts.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index, filename, data):
+        if isinstance(data, Exception):
+            return {"index": index, "filename": filename, "status": "error", "error": str(data)}
+        async with semaphore:
+            try:
+                result = await analyze(data, filename)
+            except Exception as e:
+                return {"index": index, "filename": filename, "status": "error", "error": str(e)}
+        return {
+            "index": index,
+            "filename": filename,
+            "status": "ok",
+            "resumeScore": result["scores"]["ats"],
+            "result": result,
+        }
+
+    tasks = [asyncio.ensure_future(run(i, name, data)) for i, (name, data) in enumerate(items)]
+    succeeded = failed = 0
+    try:
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            if record["status"] == "ok":
+                succeeded += 1
+            else:
+                failed += 1
+            yield _line(record)
+        yield _line({"summary": {"total": len(items), "succeeded": succeeded, "failed": failed}})
+    finally:
+        # The client may disconnect mid-stream; do not leave work running
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,158 @@
+"""Micro-benchmarks for the extraction and scoring hot paths.
+
+Run from backend-Py:
+
+    python -m benchmarks.run                          # print results
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --threshold 0.2
+
+Each case is timed individually after warmup: extract_text_from_pdf over
+synthetic text, layout and scanned PDFs of several page counts, and the
+three analyzers (generate_intelligent_analysis, parse_resume_content,
+generate_fallback_analysis) over the text extracted from them, plus batch
+re-scoring of RESCORE_ROWS feature vectors with scoring.score_batch.  Results
+report throughput and p50/p95/p99 latency.  With --compare, the run exits
+with status 1 when any case's p50 or p95 is slower than the baseline by
+more than the threshold.  Baselines are machine-specific; record one on the
+machine that runs the comparison.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_pdfs import KINDS, make_pdf
+from pdf_extraction import PYTESSERACT_AVAILABLE, extract_text_from_pdf
+from resume_analyzer import generate_fallback_analysis, generate_intelligent_analysis, parse_resume_content
+from resume_features import extract_features
+from scoring import feature_matrix, score_batch
+
+DEFAULT_PAGES = (1, 5, 20)
+# Slow cases (OCR, long documents) stop after max_seconds but never below this
+MIN_SAMPLES = 5
+# Differences below this many microseconds are treated as noise
+MIN_DELTA_US = 50.0
+RESCORE_ROWS = 10000
+
+
+def time_case(fn, arg, iterations, warmup, max_seconds):
+    """Time fn(arg) up to iterations times, stopping early once max_seconds is spent"""
+    for _ in range(warmup):
+        fn(arg)
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    while len(samples) < iterations and (len(samples) < MIN_SAMPLES or time.perf_counter() < deadline):
+        started = time.perf_counter_ns()
+        fn(arg)
+        samples.append((time.perf_counter_ns() - started) / 1000)
+    samples = np.array(samples)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "iterations": len(samples),
+        "mean_us": round(float(samples.mean()), 2),
+        "p50_us": round(float(p50), 2),
+        "p95_us": round(float(p95), 2),
+        "p99_us": round(float(p99), 2),
+        "ops_per_sec": round(1e6 / float(samples.mean()), 2),
+    }
+
+
+def build_cases(kinds, pages):
+    """Yield (name, fn, argument) for every benchmark case"""
+    for kind in kinds:
+        if kind == "scanned" and not PYTESSERACT_AVAILABLE:
+            print("Skipping scanned PDFs: OCR tools are not installed", file=sys.stderr)
+            continue
+        for count in pages:
+            yield f"extract/{kind}/{count}p", extract_text_from_pdf, make_pdf(kind, count)
+
+    features = []
+    for count in pages:
+        text = extract_text_from_pdf(make_pdf("text", count))
+        features.append(extract_features(text))
+        yield f"intelligent/{count}p", generate_intelligent_analysis, text
+        yield f"parsed/{count}p", parse_resume_content, text
+        yield f"fallback/{count}p", generate_fallback_analysis, text
+
+    rows = feature_matrix(features)
+    matrix = rows[np.arange(RESCORE_ROWS) % len(rows)]
+    yield f"rescore/{RESCORE_ROWS}", lambda m: score_batch("intelligent", m), matrix
+
+
+def run(kinds, pages, iterations, warmup, max_seconds):
+    results = {}
+    for name, fn, arg in build_cases(kinds, pages):
+        results[name] = time_case(fn, arg, iterations, warmup, max_seconds)
+        stats = results[name]
+        print(
+            f"{name:<24} {stats['ops_per_sec']:>10.1f} ops/s  "
+            f"p50 {stats['p50_us']:>10.1f}us  p95 {stats['p95_us']:>10.1f}us  p99 {stats['p99_us']:>10.1f}us"
+        )
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the list of regressions past threshold (a fraction, e.g. 0.2)"""
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for metric in ("p50_us", "p95_us"):
+            delta = stats[metric] - before[metric]
+            if delta > MIN_DELTA_US and stats[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name} {metric}: {before[metric]:.1f}us -> {stats[metric]:.1f}us "
+                    f"(+{delta / before[metric] * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", default=",".join(KINDS), help="comma-separated PDF kinds")
+    parser.add_argument("--pages", default=",".join(map(str, DEFAULT_PAGES)), help="comma-separated page counts (1-20)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="time budget per case")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+
+    kinds = [k for k in args.kinds.split(",") if k]
+    pages = [int(p) for p in args.pages.split(",") if p]
+    if any(not 1 <= p <= 20 for p in pages):
+        parser.error("page counts must be between 1 and 20")
+
+    results = run(kinds, pages, args.iterations, args.warmup, args.max_seconds)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            }, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) past {args.threshold * 100:.0f}%:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions past {args.threshold * 100:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
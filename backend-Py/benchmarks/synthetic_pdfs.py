@@ -0,0 +1,151 @@
+"""Deterministic synthetic resume PDFs for benchmarking.
+
+Three kinds of document, each 1-20 pages:
+- "text": one column of plain text lines, the common case
+- "layout": two columns of short positioned fragments plus table rules,
+  which makes pdfplumber do far more character and word grouping
+- "scanned": one grayscale image per page and no text layer, so every
+  page falls through to OCR
+
+The PDFs are written by hand (no extra dependency) and are identical for a
+given kind, page count and seed.
+"""
+
+import random
+import zlib
+
+KINDS = ("text", "layout", "scanned")
+
+_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Node.js", "Django", "FastAPI", "PostgreSQL",
+    "MongoDB", "Redis", "Docker", "Kubernetes", "AWS", "Azure", "GCP", "Terraform", "GraphQL", "Git", "Linux",
+]
+_VERBS = ["Developed", "Led", "Designed", "Built", "Improved", "Reduced", "Managed", "Implemented", "Delivered"]
+_OBJECTS = [
+    "the payments API", "a React dashboard", "CI/CD pipelines", "a data ingestion service",
+    "the search backend", "microservices on Kubernetes", "an internal analytics tool",
+]
+_OUTCOMES = ["by {n}%", "for {n}k users", "saving {n} hours a week", "cutting latency by {n}%"]
+
+
+def resume_lines(pages, seed=0):
+    """Return one list of text lines per page of a plausible resume"""
+    rng = random.Random(seed)
+    header = [
+        f"Candidate {seed}",
+        f"candidate{seed}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "EXPERIENCE",
+        f"Senior Software Engineer, {rng.randint(1, 15)} years",
+    ]
+    footer = [
+        "EDUCATION",
+        "Bachelor of Science in Computer Science, State University",
+        "SKILLS: " + ", ".join(rng.sample(_SKILLS, 8)),
+        "PROJECTS: Built an open source portfolio on GitHub",
+        "AWS Certified Solutions Architect",
+    ]
+    result = []
+    for number in range(pages):
+        lines = list(header) if number == 0 else [f"EXPERIENCE (continued, page {number + 1})"]
+        while len(lines) < 40:
+            outcome = rng.choice(_OUTCOMES).format(n=rng.randint(5, 90))
+            lines.append(f"- {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} {outcome}")
+        if number == pages - 1:
+            lines[-len(footer):] = footer
+        result.append(lines)
+    return result
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text_content(lines):
+    body = " ".join(f"({_escape(line)}) '" for line in lines)
+    return f"BT /F1 10 Tf 50 760 Td 17 TL {body} ET".encode("latin-1")
+
+
+def _layout_content(lines):
+    ops = ["0.5 w"]
+    # Table rules behind the text
+    for y in range(80, 760, 34):
+        ops.append(f"40 {y} m 572 {y} l S")
+    ops.append("306 60 m 306 770 l S")
+    ops.append("BT /F1 8 Tf")
+    for i, line in enumerate(lines):
+        column = 50 if i % 2 == 0 else 316
+        y = 760 - (i // 2) * 17
+        # Each word is placed separately, as PDF generators for styled layouts do
+        x = column
+        for word in line.split():
+            ops.append(f"1 0 0 1 {x} {y} Tm ({_escape(word)}) Tj")
+            x += 4.4 * len(word) + 3
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def _scan_image(lines, seed):
+    # Dark bars where the text lines would be, on light noise
+    width, height = 612, 792
+    rng = random.Random(seed)
+    rows = []
+    for y in range(height):
+        line = (y - 40) // 17
+        inked = 0 <= line < len(lines) and (y - 40) % 17 < 9
+        length = min(width - 100, 6 * len(lines[line])) if inked else 0
+        row = bytearray(rng.choice((238, 243, 248)) for _ in range(width))
+        if length:
+            row[50:50 + length] = b"\x30" * length
+        rows.append(bytes(row))
+    return width, height, zlib.compress(b"".join(rows))
+
+
+def _stream(dictionary, data):
+    return b"<< " + dictionary + b" /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+
+
+def make_pdf(kind="text", pages=1, seed=0):
+    """Return the bytes of a synthetic resume PDF"""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown PDF kind {kind!r}; expected one of {', '.join(KINDS)}")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the kids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for number, lines in enumerate(resume_lines(pages, seed)):
+        if kind == "scanned":
+            width, height, pixels = _scan_image(lines, seed * 1000 + number)
+            objects.append(_stream(
+                b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                b"/BitsPerComponent 8 /Filter /FlateDecode" % (width, height),
+                pixels,
+            ))
+            image = len(objects)
+            objects.append(_stream(b"", b"q 612 0 0 792 0 0 cm /Im1 Do Q"))
+            resources = b"<< /XObject << /Im1 %d 0 R >> >>" % image
+        else:
+            content = _text_content(lines) if kind == "text" else _layout_content(lines)
+            objects.append(_stream(b"", content))
+            resources = b"<< /Font << /F1 3 0 R >> >>"
+        contents = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources " + resources
+            + b" /Contents %d 0 R >>" % contents
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -0,0 +1,305 @@
+"""Append-only store of analyzed resumes for offline re-scoring and analytics.
+
+With FEATURE_STORE_DB set, every fresh analysis is recorded in SQLite: the
+extracted text (zlib-compressed), the parse_resume_content() view of it,
+the analyzer that scored it and its scores, the scoring feature vector, and
+the extraction and analysis timings.  Requests only enqueue the record; a
+writer thread inserts queued records in batched transactions (up to
+FEATURE_STORE_BATCH rows, or whatever arrived within
+FEATURE_STORE_FLUSH_SECONDS).  If the queue is full, records are dropped
+and counted rather than slowing requests down.
+
+rescore() runs the scoring tables over the stored corpus in parallel
+chunks of rows, straight from the stored feature vectors, without touching
+a PDF; rows stored under an older vector layout are re-featurized from
+their text.  It reports how the scores would move and can write them back.
+
+    python -m feature_store stats
+    python -m feature_store rescore [--rules weights.json] [--chunk-size N] [--workers N] [--write]
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import request_log
+from lazy_imports import lazy
+from resume_analyzer import parsed_data_from_features
+from resume_features import extract_features
+from resume_index import analyze_for_index, index_features
+from scoring import FEATURE_NAMES, FEATURE_SET_ID, SCORERS, compile_tables, feature_vector, tables_from_json
+
+np = lazy("numpy")
+
+FEATURE_STORE_DB = os.getenv("FEATURE_STORE_DB")
+FEATURE_STORE_BATCH = int(os.getenv("FEATURE_STORE_BATCH", "200"))
+FEATURE_STORE_FLUSH_SECONDS = float(os.getenv("FEATURE_STORE_FLUSH_SECONDS", "1.0"))
+FEATURE_STORE_QUEUE = int(os.getenv("FEATURE_STORE_QUEUE", "10000"))
+RESCORE_CHUNK_ROWS = 10000
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS analyses ("
+    "id INTEGER PRIMARY KEY, resume_id TEXT NOT NULL, filename TEXT, analyzed_at REAL NOT NULL, "
+    "job_description TEXT, text BLOB NOT NULL, parsed TEXT NOT NULL, analyzer TEXT NOT NULL, "
+    "ats REAL NOT NULL, strength REAL NOT NULL, feature_set INTEGER NOT NULL, vector BLOB NOT NULL, "
+    "timings TEXT NOT NULL)"
+)
+COLUMNS = (
+    "resume_id", "filename", "analyzed_at", "job_description", "text", "parsed", "analyzer",
+    "ats", "strength", "feature_set", "vector", "timings",
+)
+
+
+def _connect(db_path):
+    db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(SCHEMA)
+    return db
+
+
+def analyze_for_store(resume_text, job_description, doc_id, filename, features=None, vector=None):
+    """Pipeline stage: analyze_for_index() plus the resume's feature store record"""
+    if features is None:
+        features, vector = index_features(resume_text)
+    result, document = analyze_for_index(resume_text, job_description, doc_id, filename, features, vector)
+    record = {
+        "resume_id": doc_id,
+        "filename": filename,
+        "analyzed_at": time.time(),
+        "job_description": job_description or None,
+        "text": zlib.compress(resume_text.encode("utf-8")),
+        "parsed": json.dumps(parsed_data_from_features(features), separators=(",", ":")),
+        "analyzer": result["analyzer"],
+        "ats": result["scores"]["ats"],
+        "strength": result["scores"]["strength"],
+        "feature_set": FEATURE_SET_ID,
+        "vector": np.asarray(feature_vector(features), dtype=np.float64).tobytes(),
+    }
+    return result, document, record
+
+
+class FeatureStore:
+    """Queue-fed SQLite writer; disabled when db_path is None"""
+
+    def __init__(self, db_path=FEATURE_STORE_DB, batch=FEATURE_STORE_BATCH,
+                 flush_seconds=FEATURE_STORE_FLUSH_SECONDS, max_queue=FEATURE_STORE_QUEUE):
+        self.db_path = db_path
+        self.batch = batch
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._reader = None  # connection for stats(), opened (and the schema set up) once
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+
+    @property
+    def enabled(self):
+        return bool(self.db_path)
+
+    def append(self, record, timings=None):
+        """Queue a record from analyze_for_store(); never blocks"""
+        if not self.enabled:
+            return
+        self._start()
+        try:
+            self._queue.put_nowait({**record, "timings": json.dumps(timings or {}, separators=(",", ":"))})
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="feature-store", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        db = _connect(self.db_path)
+        insert = f"INSERT INTO analyses ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        stopping = False
+        while not stopping:
+            records = []
+            deadline = time.monotonic() + self.flush_seconds
+            while len(records) < self.batch:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                records.append(record)
+            if not records:
+                continue
+            try:
+                with db:
+                    db.executemany(insert, [tuple(record[column] for column in COLUMNS) for record in records])
+                self.written += len(records)
+                self.batches += 1
+            except sqlite3.Error as e:
+                self.errors += 1
+                request_log.event("feature_store_write_failed", logging.WARNING, rows=len(records), error=str(e))
+        db.close()
+
+    def close(self):
+        """Write everything queued so far and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def stats(self):
+        stats = {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+        if self.enabled and os.path.exists(self.db_path):
+            with self._lock:
+                if self._reader is None:
+                    self._reader = _connect(self.db_path)
+                stats["rows"] = self._reader.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        return stats
+
+
+def _rescore_chunk(db_path, first_id, last_id, rules=None, write=False):
+    """Re-score rows first_id..last_id; return {analyzer: totals} for the chunk"""
+    scorers = SCORERS if rules is None else compile_tables(tables_from_json(rules))
+    db = _connect(db_path)
+    try:
+        rows = db.execute(
+            "SELECT id, analyzer, ats, strength, feature_set, vector, text FROM analyses "
+            "WHERE id BETWEEN ? AND ? ORDER BY id",
+            (first_id, last_id),
+        ).fetchall()
+        by_analyzer = {}
+        for row_id, analyzer, ats, strength, feature_set, vector, text in rows:
+            if feature_set == FEATURE_SET_ID:
+                vector = np.frombuffer(vector, dtype=np.float64)
+            else:
+                # Stored under an older vector layout: featurize the text again
+                vector = feature_vector(extract_features(zlib.decompress(text).decode("utf-8")))
+            by_analyzer.setdefault(analyzer, []).append((row_id, ats, strength, vector))
+
+        totals = {}
+        updates = []
+        for analyzer, entries in by_analyzer.items():
+            if analyzer not in scorers:
+                continue
+            matrix = np.array([entry[3] for entry in entries], dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+            scores = {name: scorer.score_batch(matrix) for name, scorer in scorers[analyzer].items()}
+            old_ats = np.array([entry[1] for entry in entries])
+            old_strength = np.array([entry[2] for entry in entries])
+            changed = (scores["ats"] != old_ats) | (scores["strength"] != old_strength)
+            totals[analyzer] = {
+                "rows": len(entries),
+                "changed": int(changed.sum()),
+                "ats_before": float(old_ats.sum()),
+                "ats_after": float(scores["ats"].sum()),
+                "strength_before": float(old_strength.sum()),
+                "strength_after": float(scores["strength"].sum()),
+            }
+            if write:
+                for index in np.flatnonzero(changed).tolist():
+                    updates.append((float(scores["ats"][index]), float(scores["strength"][index]), entries[index][0]))
+        if updates:
+            with db:
+                db.executemany("UPDATE analyses SET ats = ?, strength = ? WHERE id = ?", updates)
+        return totals
+    finally:
+        db.close()
+
+
+def rescore(db_path=FEATURE_STORE_DB, rules=None, chunk_rows=RESCORE_CHUNK_ROWS, workers=None,
+            write=False, processes=False):
+    """Re-score the stored corpus in parallel chunks; return per-analyzer before/after summaries
+
+    rules are score tables in the tables_from_json() format, to see how a
+    weight change would move the scores; without them the current tables
+    are used.  write=True stores the new scores.
+    """
+    if not db_path or not os.path.exists(db_path):
+        raise FileNotFoundError("No feature store database (set FEATURE_STORE_DB)")
+    started = time.perf_counter()
+    db = _connect(db_path)
+    try:
+        low, high = db.execute("SELECT MIN(id), MAX(id) FROM analyses").fetchone()
+    finally:
+        db.close()
+    chunks = [] if low is None else [(first, min(first + chunk_rows - 1, high)) for first in range(low, high + 1, chunk_rows)]
+
+    workers = workers or min(len(chunks), os.cpu_count() or 1) or 1
+    executor_cls = ProcessPoolExecutor if processes and workers > 1 else ThreadPoolExecutor
+    totals = {}
+    with executor_cls(max_workers=workers) as pool:
+        futures = [pool.submit(_rescore_chunk, db_path, first, last, rules, write) for first, last in chunks]
+        for future in futures:
+            for analyzer, chunk in future.result().items():
+                summary = totals.setdefault(analyzer, dict.fromkeys(chunk, 0))
+                for key, value in chunk.items():
+                    summary[key] += value
+
+    analyzers = {}
+    for analyzer, summary in totals.items():
+        rows = summary["rows"]
+        analyzers[analyzer] = {
+            "rows": rows,
+            "changed": summary["changed"],
+            "mean_ats_before": round(summary["ats_before"] / rows, 3),
+            "mean_ats_after": round(summary["ats_after"] / rows, 3),
+            "mean_strength_before": round(summary["strength_before"] / rows, 3),
+            "mean_strength_after": round(summary["strength_after"] / rows, 3),
+        }
+    return {
+        "rows": sum(summary["rows"] for summary in analyzers.values()),
+        "chunks": len(chunks),
+        "written": write,
+        "seconds": round(time.perf_counter() - started, 3),
+        "analyzers": analyzers,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and re-score the resume feature store")
+    parser.add_argument("--db", default=FEATURE_STORE_DB, help="SQLite path (default FEATURE_STORE_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="row count of the store")
+    run = commands.add_parser("rescore", help="re-run scoring over every stored analysis")
+    run.add_argument("--rules", help="JSON score tables to try instead of the current ones")
+    run.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_ROWS)
+    run.add_argument("--workers", type=int, help="parallel chunks (default: one per CPU)")
+    run.add_argument("--write", action="store_true", help="store the new scores")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        print(json.dumps(FeatureStore(args.db).stats(), indent=2))
+    else:
+        rules = None
+        if args.rules:
+            with open(args.rules, encoding="utf-8") as f:
+                rules = json.load(f)
+        summary = rescore(args.db, rules, args.chunk_size, args.workers, args.write, processes=True)
+        print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
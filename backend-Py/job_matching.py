@@ -0,0 +1,170 @@
+"""Resume-to-job-description matching on TF-IDF vectors.
+
+Both texts become sparse L2-normalized vectors of sublinear term
+frequencies times an IDF weight, stored as sorted term-id and weight
+arrays, so a cosine similarity is one NumPy intersection and dot product.
+There is no document corpus to learn IDF from yet, so the default weights
+come from the skill taxonomy: skill keywords count SKILL_IDF times as much
+as ordinary words and stopwords are dropped.  A TermWeights built from real
+document frequencies can be passed in instead.
+
+The job description side (vector plus the skills it asks for) is cached
+per normalized description, so scoring many resumes against one posting
+costs a single sparse dot product each.  Skills on both sides are
+resolved through the skill taxonomy, so aliases match their canonical
+skill ("k8s" on a resume covers "kubernetes" in a posting).
+"""
+
+import functools
+import math
+import os
+import re
+import zlib
+from typing import NamedTuple
+
+from analysis_cache import normalize_job_description
+from keyword_matcher import KeywordMatcher
+from lazy_imports import lazy
+from resume_features import analyzer_skills
+from taxonomy import BUILTIN_SKILLS, canonical_name, get_taxonomy
+
+np = lazy("numpy")
+
+JD_CACHE_SIZE = int(os.getenv("JOB_MATCH_CACHE_SIZE", "256"))
+SKILL_IDF = 3.0
+
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_PLAIN_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*\Z")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does
+for from had has have having he her his how i if in into is it its may me more most must my no
+not of on or our out over own per she should so some such than that the their them then there
+these they this those through to too under up us very was we were what when where which while
+who will with within would you your
+""".split())
+
+_SKILL_TERMS = KeywordMatcher({"skills": [kw for keywords in BUILTIN_SKILLS.values() for kw in keywords]})
+
+
+def _term_id(term):
+    # crc32 rather than hash() so ids agree across worker processes
+    return zlib.crc32(term.encode("utf-8"))
+
+
+class TermWeights:
+    """IDF lookup: explicit per-term weights over a default"""
+
+    def __init__(self, idf=None, default=1.0):
+        self.idf = dict(idf or {})
+        self.default = default
+
+    @classmethod
+    def from_document_frequencies(cls, doc_freqs, total_docs):
+        """Smoothed IDF, log((1 + N) / (1 + df)) + 1, from corpus counts"""
+        idf = {term: math.log((1 + total_docs) / (1 + df)) + 1 for term, df in doc_freqs.items()}
+        return cls(idf, default=math.log(1 + total_docs) + 1)
+
+    def __getitem__(self, term):
+        return self.idf.get(term, self.default)
+
+
+DEFAULT_WEIGHTS = TermWeights(
+    {kw: SKILL_IDF for keywords in BUILTIN_SKILLS.values() for kw in keywords}
+)
+
+
+class SparseVector(NamedTuple):
+    ids: "np.ndarray"      # sorted uint32 term ids
+    weights: "np.ndarray"  # float32, unit L2 norm
+
+    def cosine(self, other):
+        _, mine, theirs = np.intersect1d(self.ids, other.ids, assume_unique=True, return_indices=True)
+        return float(self.weights[mine] @ other.weights[theirs])
+
+
+def term_counts(text):
+    """Count stopword-free words plus multi-part skill names like next.js or ci/cd"""
+    lowered = text.lower()
+    counts = {}
+    for word in WORD_RE.findall(lowered):
+        if word not in STOPWORDS:
+            counts[word] = counts.get(word, 0) + 1
+    for skill in _SKILL_TERMS.found(lowered):
+        # Single-word skills were already counted as words
+        if not _PLAIN_WORD_RE.match(skill):
+            counts[skill] = counts.get(skill, 0) + 1
+    return counts
+
+
+def vectorize(text, weights=DEFAULT_WEIGHTS):
+    """Return the unit-length sparse TF-IDF vector of a text"""
+    counts = term_counts(text)
+    if not counts:
+        return SparseVector(np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.float32))
+    ids = np.fromiter((_term_id(t) for t in counts), dtype=np.uint32, count=len(counts))
+    tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    idf = np.fromiter((weights[t] for t in counts), dtype=np.float32, count=len(counts))
+    values = (1 + np.log(tf)) * idf
+    order = np.argsort(ids)
+    ids, values = ids[order], values[order]
+    # Distinct terms hashing to one id are merged
+    ids, starts = np.unique(ids, return_index=True)
+    values = np.add.reduceat(values, starts)
+    return SparseVector(ids, values / np.linalg.norm(values))
+
+
+class JobProfile(NamedTuple):
+    vector: SparseVector
+    skills: dict  # category -> skill keywords the posting asks for
+
+
+@functools.lru_cache(maxsize=JD_CACHE_SIZE)
+def _job_profile(normalized):
+    return JobProfile(vectorize(normalized), analyzer_skills(get_taxonomy().resolve(normalized)))
+
+
+def job_profile(job_description):
+    """Return the cached vector and required skills for a job description"""
+    return _job_profile(normalize_job_description(job_description))
+
+
+def match_resume(resume_vector, resume_skills, job_description):
+    """Score one resume (vector plus {category: skills}) against a job description"""
+    profile = job_profile(job_description)
+    have = {canonical_name(kw) for keywords in resume_skills.values() for kw in keywords}
+
+    categories = {}
+    matched = []
+    missing = []
+    for category, required in profile.skills.items():
+        found = [kw for kw in required if canonical_name(kw) in have]
+        absent = [kw for kw in required if canonical_name(kw) not in have]
+        categories[category] = {
+            "required": required,
+            "matched": found,
+            "missing": absent,
+            "coverage": round(len(found) / len(required), 3),
+        }
+        matched.extend(found)
+        missing.extend(absent)
+
+    required_count = len(matched) + len(missing)
+    return {
+        "similarity": round(resume_vector.cosine(profile.vector), 4),
+        "skill_coverage": round(len(matched) / required_count, 3) if required_count else None,
+        "matched_keywords": matched,
+        "missing_keywords": missing,
+        "categories": categories,
+    }
+
+
+def match_job_description(resume_text, job_description, features, vector=None, skills=None):
+    """Match a resume against a job description, or None when there is no description"""
+    if not normalize_job_description(job_description):
+        return None
+    if vector is None:
+        vector = vectorize(resume_text)
+    if skills is None:
+        skills = features.skills
+    return match_resume(vector, skills, job_description)
@@ -0,0 +1,442 @@
+"""Asynchronous analysis jobs: a durable priority queue with polling and webhooks.
+
+POST /analyze-resume/?mode=async answers 202 with a job id as soon as the
+upload is stored, instead of holding the connection open through OCR.  A
+fixed set of ANALYSIS_JOB_WORKERS tasks takes queued jobs, lowest priority
+value first (interactive uploads ahead of bulk batch jobs) and oldest
+first within a priority, and runs them through the normal pipeline.
+
+Jobs live in SQLite: ANALYSIS_JOBS_DB keeps them across restarts (jobs that
+were running when the process died are queued again); without it the
+queue is an in-memory database.  The uploads wait in files under
+ANALYSIS_JOB_SPOOL_DIR (by default next to the database, or a temp
+directory made on the first submit and removed on close) and are deleted
+when their job finishes.  A job that fails with
+one of the retryable errors (timeouts, a full or broken worker pool) is
+queued again after ANALYSIS_JOB_RETRY_SECONDS, doubling per attempt, up to
+ANALYSIS_JOB_MAX_ATTEMPTS attempts.  Finished jobs can be polled at
+GET /analysis/{id} until ANALYSIS_JOB_TTL_SECONDS after they finish.
+
+When a job finishes, its status document is POSTed to the job's callback
+URL, or ANALYSIS_WEBHOOK_URL.  Per-job callback URLs must be under one of
+the ANALYSIS_WEBHOOK_ALLOWED URLs: the same scheme, host and port, and a
+path at or below its path.  With ANALYSIS_WEBHOOK_SECRET set, the body is
+signed in an X-Signature header (sha256=<hex HMAC>).
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import metrics
+import request_log
+from lazy_imports import lazy
+
+ANALYSIS_JOBS_DB = os.getenv("ANALYSIS_JOBS_DB")
+ANALYSIS_JOB_SPOOL_DIR = os.getenv("ANALYSIS_JOB_SPOOL_DIR")
+ANALYSIS_JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", "2"))
+ANALYSIS_JOB_MAX_PENDING = int(os.getenv("ANALYSIS_JOB_MAX_PENDING", "1000"))
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+ANALYSIS_JOB_RETRY_SECONDS = float(os.getenv("ANALYSIS_JOB_RETRY_SECONDS", "2"))
+ANALYSIS_JOB_TTL_SECONDS = float(os.getenv("ANALYSIS_JOB_TTL_SECONDS", str(24 * 60 * 60)))
+ANALYSIS_WEBHOOK_URL = os.getenv("ANALYSIS_WEBHOOK_URL")
+ANALYSIS_WEBHOOK_ALLOWED = [prefix for prefix in os.getenv("ANALYSIS_WEBHOOK_ALLOWED", "").split(",") if prefix]
+ANALYSIS_WEBHOOK_SECRET = os.getenv("ANALYSIS_WEBHOOK_SECRET")
+WEBHOOK_TIMEOUT_SECONDS = 10.0
+WEBHOOK_ATTEMPTS = 3
+
+PRIORITIES = {"interactive": 0, "batch": 10}
+
+# How often idle workers look for jobs another process may have queued
+IDLE_POLL_SECONDS = 1.0
+# Expired jobs are deleted every N claims
+PURGE_INTERVAL = 256
+
+httpx = lazy("httpx")
+
+
+class JobQueueFullError(Exception):
+    """Raised when the queue already holds the maximum number of pending jobs"""
+
+    def __init__(self, retry_after=30):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return "Analysis job queue is full, please retry later"
+
+
+def _origin(parts):
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    if port is None:
+        port = {"http": 80, "https": 443}.get(parts.scheme)
+    return parts.scheme, parts.hostname, port
+
+
+def callback_allowed(url, allowed=ANALYSIS_WEBHOOK_ALLOWED):
+    """Whether url has the scheme, host and port of an allowed prefix and a path under it
+
+    Comparing parsed URLs rather than strings keeps "https://hooks.example.com"
+    from admitting "https://hooks.example.com.attacker.net" or
+    "https://hooks.example.com@attacker.net".
+    """
+    target = urlsplit(url)
+    origin = _origin(target)
+    if origin is None or target.scheme not in ("http", "https") or not target.hostname:
+        return False
+    path = target.path or "/"
+    if any(segment in (".", "..") for segment in path.split("/")):
+        return False
+    for prefix in allowed:
+        expected = urlsplit(prefix)
+        if _origin(expected) != origin:
+            continue
+        base = expected.path or "/"
+        if path == base or path.startswith(base if base.endswith("/") else base + "/"):
+            return True
+    return False
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def sign(body, secret=ANALYSIS_WEBHOOK_SECRET):
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+class JobQueue:
+    """Priority queue of analysis jobs in SQLite, drained by a pool of asyncio workers.
+
+    handler is an async callable taking the job ({"id", "filename",
+    "job_description", "pdf", "options"}) and returning its JSON result.
+    Exceptions listed in retry_on are treated as transient.
+
+    Uploads wait in spool_dir files while the job is pending; the database
+    only holds their path, and a job's bytes are read back when it runs.
+    """
+
+    def __init__(self, handler, retry_on=(), db_path=ANALYSIS_JOBS_DB, workers=ANALYSIS_JOB_WORKERS,
+                 max_pending=ANALYSIS_JOB_MAX_PENDING, max_attempts=ANALYSIS_JOB_MAX_ATTEMPTS,
+                 retry_seconds=ANALYSIS_JOB_RETRY_SECONDS, ttl=ANALYSIS_JOB_TTL_SECONDS,
+                 webhook_url=ANALYSIS_WEBHOOK_URL, transport=None, spool_dir=ANALYSIS_JOB_SPOOL_DIR):
+        self.handler = handler
+        self.retry_on = tuple(retry_on)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.ttl = ttl
+        self.webhook_url = webhook_url
+        self.durable = bool(db_path)
+        if spool_dir is None and self.durable:
+            # Next to the database so queued uploads survive a restart with it
+            spool_dir = db_path + "-spool"
+        # Without either, a temp directory is made on the first submit and
+        # removed by close(), as its jobs do not outlive the process
+        self.spool_dir = spool_dir
+        self._temporary_spool = spool_dir is None
+        self._transport = transport
+        self._client = None
+        self._tasks = []
+        self._webhooks = set()
+        self._wakeup = asyncio.Event()
+        self._claims = 0
+        self.retries = 0
+        self.webhooks_delivered = 0
+        self.webhooks_failed = 0
+        # Writes go through one thread so they stay off the event loop and
+        # never interleave; the lock covers reads made from other threads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis-jobs-db")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False, isolation_level=None)
+        if self.durable:
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_jobs ("
+            "id TEXT PRIMARY KEY, priority INTEGER NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, filename TEXT, job_description TEXT, options TEXT NOT NULL, "
+            "pdf_path TEXT, callback_url TEXT, created_at REAL NOT NULL, available_at REAL NOT NULL, "
+            "finished_at REAL, result TEXT, error TEXT, webhook TEXT)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(analysis_jobs)")}
+        if "pdf_path" not in columns:
+            # Database from before uploads were spooled to files
+            self._db.execute("ALTER TABLE analysis_jobs ADD COLUMN pdf_path TEXT")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS analysis_jobs_ready ON analysis_jobs (status, priority, created_at)"
+        )
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _write(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).rowcount
+
+    async def _in_executor(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def start(self):
+        """Start the workers on the running event loop; jobs left running by a dead process are queued again"""
+        if self._tasks:
+            return
+        self._write("UPDATE analysis_jobs SET status = 'queued' WHERE status = 'running'")
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(max(1, self.workers))]
+
+    async def close(self):
+        for task in self._tasks + list(self._webhooks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._webhooks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._temporary_spool and self.spool_dir is not None:
+            await self._in_executor(shutil.rmtree, self.spool_dir, True)
+            self.spool_dir = None
+
+    async def submit(self, pdf_bytes, filename, job_description="", priority="interactive", callback_url=None,
+                     options=None):
+        """Queue a job and return its id"""
+        if await self._in_executor(self.pending) >= self.max_pending:
+            raise JobQueueFullError()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        await self._in_executor(
+            self._insert,
+            (
+                job_id, PRIORITIES[priority], filename, job_description,
+                json.dumps(options or {}, separators=(",", ":")), callback_url or self.webhook_url, now, now,
+            ),
+            pdf_bytes,
+        )
+        metrics.inc("resume_jobs_total", outcome="queued")
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def _insert(self, row, pdf_bytes):
+        # On the database thread, so the spool directory is only made once
+        if self.spool_dir is None:
+            self.spool_dir = tempfile.mkdtemp(prefix="analysis-jobs-")
+        else:
+            os.makedirs(self.spool_dir, exist_ok=True)
+        pdf_path = os.path.join(self.spool_dir, row[0] + ".pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_bytes)
+        try:
+            self._write(
+                "INSERT INTO analysis_jobs (id, priority, status, filename, job_description, options, "
+                "callback_url, created_at, available_at, pdf_path) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?, ?)",
+                (*row, pdf_path),
+            )
+        except BaseException:
+            _unlink(pdf_path)
+            raise
+
+    def pending(self):
+        return self._query("SELECT COUNT(*) FROM analysis_jobs WHERE status IN ('queued', 'running')")[0][0]
+
+    def lookup(self, job_id):
+        """Status document of a job, or None if it is unknown or expired"""
+        rows = self._query(
+            "SELECT status, priority, attempts, filename, created_at, finished_at, result, error, webhook "
+            "FROM analysis_jobs WHERE id = ?",
+            (job_id,),
+        )
+        if not rows:
+            return None
+        status, priority, attempts, filename, created_at, finished_at, result, error, webhook = rows[0]
+        document = {
+            "jobId": job_id,
+            "status": status,
+            "priority": next(name for name, value in PRIORITIES.items() if value == priority),
+            "attempts": attempts,
+            "filename": filename,
+            "createdAt": created_at,
+            "finishedAt": finished_at,
+        }
+        if result is not None:
+            document["result"] = json.loads(result)
+        if error is not None:
+            document["error"] = error
+        if webhook is not None:
+            document["webhook"] = webhook
+        return document
+
+    def stats(self):
+        counts = dict(self._query("SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status"))
+        return {
+            "durable": self.durable,
+            "workers": len(self._tasks),
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "retries": self.retries,
+            "webhooks_delivered": self.webhooks_delivered,
+            "webhooks_failed": self.webhooks_failed,
+        }
+
+    def _claim(self):
+        # Runs on the database thread with the lock held from the select to
+        # the update, so workers in this process cannot claim the same job;
+        # the status check in the update covers other processes sharing the
+        # database
+        now = time.time()
+        self._claims += 1
+        with self._lock:
+            if self._claims % PURGE_INTERVAL == 0:
+                self._db.execute(
+                    "DELETE FROM analysis_jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                    (now - self.ttl,),
+                )
+            while True:
+                row = self._db.execute(
+                    "SELECT id, attempts, filename, job_description, options, pdf_path FROM analysis_jobs "
+                    "WHERE status = 'queued' AND available_at <= ? ORDER BY priority, created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                claimed = self._db.execute(
+                    "UPDATE analysis_jobs SET status = 'running', attempts = attempts + 1 "
+                    "WHERE id = ? AND status = 'queued'",
+                    (row[0],),
+                ).rowcount
+                if claimed:
+                    job_id, attempts, filename, job_description, options, pdf_path = row
+                    return {
+                        "id": job_id,
+                        "attempt": attempts + 1,
+                        "filename": filename,
+                        "job_description": job_description,
+                        "options": json.loads(options),
+                        "pdf_path": pdf_path,
+                    }
+
+    def _next_wakeup(self):
+        row = self._query("SELECT MIN(available_at) FROM analysis_jobs WHERE status = 'queued'")[0]
+        if row[0] is None:
+            return IDLE_POLL_SECONDS
+        return min(IDLE_POLL_SECONDS, max(0.0, row[0] - time.time()))
+
+    async def _work(self):
+        while True:
+            job = await self._in_executor(self._claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), await self._in_executor(self._next_wakeup))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job):
+        try:
+            job["pdf"] = await asyncio.to_thread(_read, job["pdf_path"])
+            result = await self.handler(job)
+        except asyncio.CancelledError:
+            # Shutting down: leave the job to be picked up again on restart
+            await self._in_executor(self._write, "UPDATE analysis_jobs SET status = 'queued' WHERE id = ?", (job["id"],))
+            raise
+        except self.retry_on as e:
+            if job["attempt"] < self.max_attempts:
+                self.retries += 1
+                delay = self.retry_seconds * 2 ** (job["attempt"] - 1)
+                await self._in_executor(
+                    self._write,
+                    "UPDATE analysis_jobs SET status = 'queued', available_at = ?, error = ? WHERE id = ?",
+                    (time.time() + delay, str(e), job["id"]),
+                )
+                metrics.inc("resume_jobs_total", outcome="retried")
+                request_log.event(
+                    "analysis_job_retry", logging.WARNING, job_id=job["id"], attempt=job["attempt"],
+                    delay_seconds=delay, error=str(e),
+                )
+                return
+            await self._finish(job, None, str(e))
+        except Exception as e:
+            request_log.event("analysis_job_failed", logging.ERROR, exc=True, job_id=job["id"], error=str(e))
+            await self._finish(job, None, str(e))
+        else:
+            await self._finish(job, result, None)
+
+    async def _finish(self, job, result, error):
+        status = "done" if error is None else "failed"
+        await self._in_executor(
+            self._write,
+            "UPDATE analysis_jobs SET status = ?, finished_at = ?, result = ?, error = ?, pdf_path = NULL "
+            "WHERE id = ?",
+            (
+                status, time.time(),
+                None if result is None else json.dumps(result, separators=(",", ":")),
+                error, job["id"],
+            ),
+        )
+        # The upload is not needed any more once the job is final
+        await self._in_executor(_unlink, job["pdf_path"])
+        metrics.inc("resume_jobs_total", outcome=status)
+        callback_url = (await self._in_executor(
+            self._query, "SELECT callback_url FROM analysis_jobs WHERE id = ?", (job["id"],)
+        ))[0][0]
+        if callback_url:
+            task = asyncio.ensure_future(self._deliver(job["id"], callback_url))
+            self._webhooks.add(task)
+            task.add_done_callback(self._webhooks.discard)
+
+    def _http(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT_SECONDS, transport=self._transport)
+        return self._client
+
+    async def _deliver(self, job_id, url):
+        document = await self._in_executor(self.lookup, job_id)
+        body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if ANALYSIS_WEBHOOK_SECRET:
+            headers["X-Signature"] = sign(body)
+        for attempt in range(1, WEBHOOK_ATTEMPTS + 1):
+            try:
+                response = await self._http().post(url, content=body, headers=headers)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                if attempt == WEBHOOK_ATTEMPTS:
+                    self.webhooks_failed += 1
+                    await self._in_executor(
+                        self._write, "UPDATE analysis_jobs SET webhook = 'failed' WHERE id = ?", (job_id,)
+                    )
+                    request_log.event("analysis_webhook_failed", logging.WARNING, job_id=job_id, error=str(e))
+                    return
+                await asyncio.sleep(self.retry_seconds * 2 ** (attempt - 1))
+            else:
+                self.webhooks_delivered += 1
+                await self._in_executor(
+                    self._write, "UPDATE analysis_jobs SET webhook = 'delivered' WHERE id = ?", (job_id,)
+                )
+                return
@@ -0,0 +1,213 @@
+"""Resume-aware ranking of cached job listings.
+
+Every listing the jobs client fetches is added to a JobCorpus.  Its skills
+are resolved through the skill taxonomy, as the parser analyzer's
+extract_skills() resolves a resume's, and stored as one row of a dense
+job x skill matrix whose columns are the skills seen so far in listings.
+Ranking a resume against the corpus is a single matrix-vector product (the
+cosine between binary skill vectors) followed by a partial sort, so the
+cost per query stays roughly constant per thousand listings.
+
+Listings are upserted by job id as the jobs cache refreshes, each fetch
+tagged with the search it answered.  On every upsert the corpus drops the
+listings that search no longer returns (unless another search still does),
+the listings not seen for JOB_CORPUS_MAX_AGE_SECONDS, and, past
+JOB_CORPUS_MAX_JOBS, the least recently seen ones; the matrix is then
+compacted so queries never scan dropped rows.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+from lazy_imports import lazy
+from resume_features import analyzer_skills
+from taxonomy import canonical_name, get_taxonomy
+
+np = lazy("numpy")
+
+JOB_CORPUS_MAX_AGE_SECONDS = float(os.getenv("JOB_CORPUS_MAX_AGE_SECONDS", str(24 * 60 * 60)))
+JOB_CORPUS_MAX_JOBS = int(os.getenv("JOB_CORPUS_MAX_JOBS", "5000"))
+RECOMMEND_DEFAULT_K = 10
+RECOMMEND_MAX_K = 100
+
+
+def _job_id(job):
+    job_id = job.get("job_id")
+    if job_id:
+        return str(job_id)
+    basis = "\0".join(str(job.get(f) or "") for f in ("job_title", "employer_name", "job_city"))
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+def _job_text(job):
+    parts = [job.get("job_title") or "", job.get("job_description") or ""]
+    highlights = job.get("job_highlights") or {}
+    if isinstance(highlights, dict):
+        for items in highlights.values():
+            if isinstance(items, list):
+                parts.extend(str(item) for item in items)
+    return "\n".join(parts)
+
+
+def job_skills(job):
+    """Canonical skills a listing asks for, in order of first mention"""
+    found = analyzer_skills(get_taxonomy().resolve(_job_text(job)), "parser_skills")
+    return [kw for keywords in found.values() for kw in keywords]
+
+
+class JobCorpus:
+    """Incrementally updated job x skill matrix"""
+
+    def __init__(self, max_age=JOB_CORPUS_MAX_AGE_SECONDS, max_jobs=JOB_CORPUS_MAX_JOBS,
+                 capacity=1024, skill_capacity=64):
+        self.max_age = max_age
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._skills = []  # column -> canonical skill
+        self._columns = {}  # canonical skill -> column
+        self._capacity = (capacity, skill_capacity)
+        # Allocated on the first upsert, so creating an empty corpus does not import NumPy
+        self._matrix = None
+        self._required = None  # skills per listing
+        self._seen_at = None
+        self._jobs = []  # row -> listing
+        self._rows = {}  # job id -> row
+        self._sources = {}  # job id -> searches whose latest fetch returned it
+        self._listed = {}  # search -> job ids of its latest fetch
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def upsert(self, jobs, source=None):
+        """Add or refresh listings; called with each batch the jobs client fetches.
+
+        source identifies the search the batch answers; listings its previous
+        batch returned and this one does not are dropped.
+        """
+        # Skill extraction runs outside the lock; only the row writes are serialized
+        prepared = [(_job_id(job), job, job_skills(job)) for job in jobs]
+        now = time.time()
+        with self._lock:
+            if self._matrix is None:
+                capacity, skill_capacity = self._capacity
+                self._matrix = np.zeros((capacity, skill_capacity), dtype=np.float32)
+                self._required = np.zeros(capacity, dtype=np.float32)
+                self._seen_at = np.zeros(capacity, dtype=np.float64)
+            if source is not None:
+                listed = {job_id for job_id, _, _ in prepared}
+                for job_id in self._listed.get(source, set()) - listed:
+                    self._sources[job_id].discard(source)
+                for job_id in listed:
+                    self._sources.setdefault(job_id, set()).add(source)
+                self._listed[source] = listed
+            for job_id, job, skills in prepared:
+                vector = self._vector(skills, add=True)
+                row = self._rows.get(job_id)
+                if row is None:
+                    row = len(self._jobs)
+                    if row == len(self._matrix):
+                        self._grow()
+                    self._jobs.append(job)
+                    self._rows[job_id] = row
+                else:
+                    self._jobs[row] = job
+                self._matrix[row] = vector
+                self._required[row] = vector.sum()
+                self._seen_at[row] = now
+            self._prune(now)
+
+    def recommend(self, skills, k=RECOMMEND_DEFAULT_K):
+        """Return the k listings whose required skills best match the given skills"""
+        k = max(1, min(k, RECOMMEND_MAX_K))
+        with self._lock:
+            n = len(self._jobs)
+            if n == 0:
+                return {"total": 0, "results": []}
+            resume = self._vector({canonical_name(skill) for skill in skills})
+            resume_count = resume.sum()
+            if resume_count == 0:
+                return {"total": n, "results": []}
+            matched = self._matrix[:n] @ resume
+            required = self._required[:n]
+            # Cosine similarity of binary skill vectors
+            scores = np.divide(
+                matched, np.sqrt(required * resume_count),
+                out=np.zeros(n, dtype=np.float32), where=required > 0,
+            )
+            scores[self._seen_at[:n] < time.time() - self.max_age] = 0
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+            top = candidates[np.lexsort((-matched[candidates], -scores[candidates]))]
+
+            have = resume.astype(bool)
+            results = []
+            for row in top.tolist():
+                wanted = self._matrix[row].astype(bool)
+                results.append({
+                    "job": self._jobs[row],
+                    "score": round(float(scores[row]), 4),
+                    "matched_skills": [self._skills[c] for c in np.flatnonzero(wanted & have)],
+                    "missing_skills": [self._skills[c] for c in np.flatnonzero(wanted & ~have)],
+                })
+            return {"total": n, "results": results}
+
+    def _prune(self, now):
+        """Drop delisted, expired and, past max_jobs, least recently seen rows, then compact"""
+        n = len(self._jobs)
+        ids = list(self._rows)  # row order
+        keep = self._seen_at[:n] >= now - self.max_age
+        for row, job_id in enumerate(ids):
+            sources = self._sources.get(job_id)
+            if sources is not None and not sources:
+                keep[row] = False
+        kept = np.flatnonzero(keep)
+        if len(kept) > self.max_jobs:
+            # Stable, so among equally recent rows the first added are kept
+            kept = np.sort(kept[np.argsort(-self._seen_at[kept], kind="stable")[:self.max_jobs]])
+        if len(kept) == n:
+            return
+        self.dropped += n - len(kept)
+        for row in np.flatnonzero(~np.isin(np.arange(n), kept)).tolist():
+            self._sources.pop(ids[row], None)
+        for listed in self._listed.values():
+            listed.intersection_update(self._sources)
+        m = len(kept)
+        self._matrix[:m] = self._matrix[kept]
+        self._matrix[m:n] = 0
+        self._required[:m] = self._required[kept]
+        self._seen_at[:m] = self._seen_at[kept]
+        self._jobs = [self._jobs[row] for row in kept.tolist()]
+        self._rows = {ids[row]: new for new, row in enumerate(kept.tolist())}
+
+    def _vector(self, skills, add=False):
+        """Binary row over the skill columns; add=True gives unseen skills a column"""
+        if add:
+            for skill in skills:
+                if skill not in self._columns:
+                    if len(self._skills) == self._matrix.shape[1]:
+                        self._grow_columns()
+                    self._columns[skill] = len(self._skills)
+                    self._skills.append(skill)
+        vector = np.zeros(self._matrix.shape[1], dtype=np.float32)
+        for skill in skills:
+            column = self._columns.get(skill)
+            if column is not None:
+                vector[column] = 1
+        return vector
+
+    def _grow_columns(self):
+        matrix = np.zeros((len(self._matrix), self._matrix.shape[1] * 2), dtype=np.float32)
+        matrix[:, :self._matrix.shape[1]] = self._matrix
+        self._matrix = matrix
+
+    def _grow(self):
+        size = len(self._matrix) * 2
+        matrix = np.zeros((size, self._matrix.shape[1]), dtype=np.float32)
+        matrix[:len(self._matrix)] = self._matrix
+        self._matrix = matrix
+        self._required = np.concatenate([self._required, np.zeros(size - len(self._required), dtype=np.float32)])
+        self._seen_at = np.concatenate([self._seen_at, np.zeros(size - len(self._seen_at))])
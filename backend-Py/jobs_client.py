@@ -0,0 +1,139 @@
+"""Async client for the JSearch job listings API.
+
+One pooled httpx.AsyncClient is shared by every request, with explicit
+timeouts.  The pages of a search are fetched concurrently.  Results are
+cached per (query, location, num_pages):
+- fresh for JOBS_CACHE_TTL_SECONDS, served straight from memory
+- stale for a further JOBS_STALE_SECONDS, served immediately while one
+  background refresh runs
+- after that, refetched before answering
+Refreshes go through SingleFlight, so a burst of identical page loads
+makes at most one upstream call.  If the upstream fails, a stale result is
+served when one exists.
+
+JSEARCH_BASE_URL points the client at a local stub server for testing.
+on_fetch, if given, is called with each freshly fetched list of listings
+and the (query, location, num_pages) key of its search (the job
+recommender keeps its corpus current this way).  It runs in the
+default executor, off the event loop, and the fetch waits for it.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+from lazy_imports import lazy
+from singleflight import SingleFlight
+
+# Only the jobs endpoints need it, so it is imported on first use
+httpx = lazy("httpx")
+
+JSEARCH_BASE_URL = os.getenv("JSEARCH_BASE_URL", "https://jsearch.p.rapidapi.com")
+JSEARCH_HOST = "jsearch.p.rapidapi.com"
+JOBS_CACHE_TTL_SECONDS = float(os.getenv("JOBS_CACHE_TTL_SECONDS", "600"))
+JOBS_STALE_SECONDS = float(os.getenv("JOBS_STALE_SECONDS", "3600"))
+JOBS_CACHE_MAX_ENTRIES = int(os.getenv("JOBS_CACHE_MAX_ENTRIES", "256"))
+JOBS_MAX_PAGES = 10
+
+TIMEOUT_SECONDS = 10.0
+CONNECT_TIMEOUT_SECONDS = 5.0
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+
+
+class JobsUpstreamError(Exception):
+    """Raised when listings cannot be fetched and nothing is cached"""
+
+
+class JobsClient:
+    def __init__(self, base_url=JSEARCH_BASE_URL, api_key=None, transport=None,
+                 ttl=JOBS_CACHE_TTL_SECONDS, stale=JOBS_STALE_SECONDS,
+                 max_entries=JOBS_CACHE_MAX_ENTRIES, on_fetch=None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.ttl = ttl
+        self.stale = stale
+        self.max_entries = max_entries
+        self.on_fetch = on_fetch
+        self._transport = transport
+        self._client = None
+        self._cache = OrderedDict()  # key -> (fetched_at, jobs)
+        self._flights = SingleFlight()
+        self._refreshes = set()
+        self.upstream_calls = 0
+
+    def _http(self):
+        if self._client is None:
+            api_key = self.api_key or os.getenv("RAPIDAPI_KEY") or ""
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"X-RapidAPI-Key": api_key, "X-RapidAPI-Host": JSEARCH_HOST},
+                timeout=httpx.Timeout(TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        for task in list(self._refreshes):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _fetch_page(self, search, page):
+        self.upstream_calls += 1
+        response = await self._http().get("/search", params={"query": search, "page": str(page), "num_pages": "1"})
+        response.raise_for_status()
+        return response.json().get("data", [])
+
+    async def _fetch(self, key):
+        query, location, num_pages = key
+        search = f"{query} in {location}" if location else query
+        pages = await asyncio.gather(*(self._fetch_page(search, page) for page in range(1, num_pages + 1)))
+        entry = (time.time(), [job for page in pages for job in page])
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        if self.on_fetch is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.on_fetch, entry[1], key)
+        return entry
+
+    def _refresh_in_background(self, key):
+        if self._flights.in_flight(key):
+            return
+        task = self._flights.start(key, lambda: self._fetch(key))
+        self._refreshes.add(task)
+        # Errors are dropped; the stale entry keeps being served until it expires
+        task.add_done_callback(lambda t: (self._refreshes.discard(t), t.cancelled() or t.exception()))
+
+    async def get_jobs(self, query="developer", location="India", num_pages=1):
+        """Return the listings with where they came from: a fresh, stale or missed cache entry"""
+        key = (" ".join(query.split()).lower(), " ".join(location.split()).lower(), num_pages)
+        now = time.time()
+        entry = self._cache.get(key)
+        if entry is not None:
+            fetched_at, jobs = entry
+            age = now - fetched_at
+            if age < self.ttl:
+                return {"jobs": jobs, "cache": "fresh", "fetched_at": fetched_at}
+            if age < self.ttl + self.stale:
+                self._refresh_in_background(key)
+                return {"jobs": jobs, "cache": "stale", "fetched_at": fetched_at}
+
+        try:
+            fetched_at, jobs = await self._flights.do(key, lambda: self._fetch(key))
+        except (httpx.HTTPError, ValueError) as e:
+            if entry is not None:
+                return {"jobs": entry[1], "cache": "stale", "fetched_at": entry[0]}
+            raise JobsUpstreamError(f"Job listings unavailable: {str(e).splitlines()[0]}") from e
+        return {"jobs": jobs, "cache": "miss", "fetched_at": fetched_at}
+
+    def stats(self):
+        return {
+            "entries": len(self._cache),
+            "upstream_calls": self.upstream_calls,
+            "refreshing": self._flights.waiting(),
+        }
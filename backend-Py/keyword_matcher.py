@@ -0,0 +1,142 @@
+"""Single-pass multi-keyword matching over resume text.
+
+All keywords of all groups are compiled at construction into one regex
+shaped like a trie (shared prefixes are factored out), so a scan is a
+single left-to-right pass whose cost grows with the text rather than with
+the number of keywords.  Matches respect word boundaries: "java" does not
+fire inside "javascript" and "led" does not fire inside "skilled".
+
+By default a keyword only matches as written, and not as part of a
+hyphenated compound, so "react-native" is not React and "springs" is not
+Spring.  Groups given inflections (section words such as "project" or
+"engineer") also match with those endings: projects, engineering.
+"""
+
+import re
+
+_WORD_CHAR = "[a-z0-9]"
+_START = f"(?<!{_WORD_CHAR})"
+_BOUNDARY = f"(?!{_WORD_CHAR})"
+
+
+def _is_word_char(ch):
+    return ch.isascii() and ch.isalnum()
+
+
+def _trie_pattern(keywords, suffixes):
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = keyword
+    return _node_pattern(trie, suffixes)
+
+
+def _node_pattern(node, suffixes):
+    alternatives = []
+    for ch in sorted(k for k in node if k):
+        alternatives.append(re.escape(ch) + _node_pattern(node[ch], suffixes))
+    if "" in node:
+        # Terminal alternative last, so longer keywords win at a position
+        keyword = node[""]
+        if not _is_word_char(keyword[-1]):
+            alternatives.append("")
+        elif suffixes.get(keyword):
+            endings = "|".join(sorted(suffixes[keyword], key=len, reverse=True))
+            alternatives.append(f"(?:{endings})?{_BOUNDARY}")
+        else:
+            alternatives.append(_BOUNDARY)
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+class KeywordMatches(dict):
+    """Found keywords per group, each list in the group's declared order"""
+
+    def any(self, group):
+        return bool(self.get(group))
+
+    def categories(self, prefix):
+        """Return {category: keywords} for groups named "<prefix>/<category>" that matched"""
+        marker = prefix + "/"
+        return {
+            group[len(marker):]: keywords
+            for group, keywords in self.items()
+            if keywords and group.startswith(marker)
+        }
+
+
+class KeywordMatcher:
+    """Compile {group: [keywords]} once and scan texts in one pass.
+
+    inflections maps a group to the word endings its keywords may also
+    match with, e.g. ("s", "ing"); other groups match exactly.
+    """
+
+    def __init__(self, groups, inflections=None):
+        self._groups = {group: [kw.lower() for kw in keywords] for group, keywords in groups.items()}
+        self._inflections = {group: tuple(endings) for group, endings in (inflections or {}).items()}
+        # keyword -> [(group, position in group)]
+        self._owners = {}
+        # keyword -> endings allowed by any of its groups
+        self._suffixes = {}
+        for group, keywords in self._groups.items():
+            for position, keyword in enumerate(keywords):
+                self._owners.setdefault(keyword, []).append((group, position))
+                self._suffixes.setdefault(keyword, set()).update(self._inflections.get(group, ()))
+
+        word_start = [kw for kw in self._owners if _is_word_char(kw[0])]
+        other_start = [kw for kw in self._owners if not _is_word_char(kw[0])]
+        parts = []
+        if word_start:
+            parts.append(_START + _trie_pattern(word_start, self._suffixes))
+        if other_start:
+            parts.append(_trie_pattern(other_start, self._suffixes))
+        self._pattern = re.compile("|".join(parts) if parts else "(?!)")
+
+    def _matches(self, text):
+        """Yield (keyword, group, position) for the keywords found in lowercased text"""
+        tokens = set()
+        for match in self._pattern.finditer(text):
+            start, end = match.span()
+            # e.g. "react" in "react-native"
+            compound = (
+                text[end:end + 1] == "-" and _is_word_char(text[end + 1:end + 2])
+                or text[start - 1:start] == "-" and start > 1 and _is_word_char(text[start - 2])
+            )
+            tokens.add((match.group(), compound))
+        for token, compound in tokens:
+            if token in self._owners:
+                # Groups that match exactly do not count a keyword inside a compound
+                for group, position in self._owners[token]:
+                    if not compound or group in self._inflections:
+                        yield token, group, position
+                continue
+            # An inflected form: credit only the groups that allow this ending
+            for keyword, ending in self._stems(token):
+                for group, position in self._owners[keyword]:
+                    if ending in self._inflections.get(group, ()):
+                        yield keyword, group, position
+
+    def _stems(self, token):
+        for keyword_length in range(len(token) - 1, 0, -1):
+            keyword = token[:keyword_length]
+            ending = token[keyword_length:]
+            if ending in self._suffixes.get(keyword, ()):
+                yield keyword, ending
+
+    def found(self, text):
+        """Return the set of distinct keywords present in text"""
+        return {keyword for keyword, _, _ in self._matches(text.lower())}
+
+    def scan(self, text):
+        """Return KeywordMatches for every group, in one pass over text"""
+        hits = {}
+        for keyword, group, position in self._matches(text.lower()):
+            hits.setdefault(group, set()).add((position, keyword))
+        # Groups are emitted in declaration order; groups with no hits are omitted
+        return KeywordMatches(
+            (group, [keyword for _, keyword in sorted(hits[group])]) for group in self._groups if group in hits
+        )
@@ -0,0 +1,154 @@
+"""Deferred imports for the heavy libraries, a warmup hook and an import report.
+
+Serverless hosts (see vercel.json) start a fresh process for many requests,
+so everything imported at module load is paid for by requests that never
+use it.  google.generativeai alone costs about half a second, pdfplumber,
+pytesseract and pdf2image are only needed once a PDF is actually parsed,
+httpx only by the jobs endpoints, and NumPy (about 90ms) only once a
+resume is vectorized, matched against the taxonomy or scored in batch.
+lazy("name") returns a stand-in that imports the module on first
+attribute access and records how long it took.
+
+WARMUP_ON_STARTUP=1 imports WARMUP_MODULES in the background when the app
+starts, for long-lived hosts that would rather pay the cost up front; POST
+/warmup does the same on demand (e.g. from a scheduled ping).
+
+    python -m lazy_imports [--top N]
+
+prints the per-module import times of a cold `import main`, measured in a
+fresh interpreter with -X importtime.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "0") == "1"
+WARMUP_MODULES = [
+    name for name in os.getenv(
+        "WARMUP_MODULES", "pdfplumber,pdf2image,pytesseract,google.generativeai,httpx,numpy"
+    ).split(",")
+    if name
+]
+
+_lock = threading.Lock()
+# module name -> lock held while load() imports it
+_name_locks = {}
+# module name -> module, once an import through load() has finished
+_loaded = {}
+# module name -> seconds spent importing it through this module
+_import_seconds = {}
+
+
+def load(name):
+    """Import name (once), timing the first import"""
+    module = _loaded.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        name_lock = _name_locks.setdefault(name, threading.Lock())
+    # Per name, so one slow import does not hold up loading other modules
+    with name_lock:
+        module = _loaded.get(name)
+        if module is None:
+            # If a plain import statement elsewhere is still running it,
+            # import_module() waits for it to finish
+            imported_before = name in sys.modules
+            started = time.perf_counter()
+            module = importlib.import_module(name)
+            if not imported_before:
+                _import_seconds[name] = time.perf_counter() - started
+            _loaded[name] = module
+    return module
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access"""
+
+    __slots__ = ("_name",)
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(load(self._name), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._name in sys.modules else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy(name):
+    return LazyModule(name)
+
+
+def available(*names):
+    """True if every named module is installed, without importing any of them"""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+
+def warmup(names=None):
+    """Import the given (default WARMUP_MODULES) modules; return {name: ms or error}"""
+    timings = {}
+    for name in names or WARMUP_MODULES:
+        started = time.perf_counter()
+        try:
+            load(name)
+        except ImportError as e:
+            timings[name] = f"unavailable: {e}"
+            continue
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
+
+
+def stats():
+    """Import times (ms) of the modules loaded lazily so far in this process"""
+    return {
+        "lazy_imports_ms": {name: round(seconds * 1000, 1) for name, seconds in _import_seconds.items()},
+        "pending": [name for name in WARMUP_MODULES if name not in sys.modules],
+    }
+
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_report(target="main", top=25):
+    """Import target in a fresh interpreter; return its top-level imports by cumulative time"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Depth 1 is the target itself, depth 2 its direct imports
+        if match and len(match.group(3)) <= 3:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-module import times of a cold start")
+    parser.add_argument("--target", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<32} {'self ms':>10} {'cumulative ms':>14}")
+    for name, self_us, cumulative_us in import_report(args.target, args.top):
+        print(f"{name:<32} {self_us / 1000:>10.1f} {cumulative_us / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Opt-in LLM commentary on top of the deterministic analysis.
+
+The deterministic analyzer always answers; enrichment only adds a section.
+A compact prompt is built from the structured analysis result (scores,
+skills, sections, experience, job match) and the job description.  The
+raw resume text is deliberately left out, so a cached analysis yields the
+same prompt as a fresh one, and the prompt stays small.
+
+Each request waits at most LLM_DEADLINE_SECONDS for the model.  If the
+model is slower, the call carries on in the background (up to
+LLM_BACKGROUND_TIMEOUT_SECONDS), and its output can be fetched later by
+enrichment id.  Identical prompts in flight share one model call, and
+outputs are cached by prompt hash.
+
+LLM_PROVIDER selects the model:
+- "gemini" (default): google.generativeai with GOOGLE_API_KEY, imported on
+  the first model call
+- "stub": a local deterministic model for offline testing; it sleeps for
+  LLM_STUB_DELAY_SECONDS before answering
+- "off": enrichment is unavailable
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+
+import request_log
+from analysis_cache import AnalysisCache
+from lazy_imports import lazy
+from singleflight import SingleFlight
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-1.5-flash")
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "2"))
+LLM_BACKGROUND_TIMEOUT_SECONDS = float(os.getenv("LLM_BACKGROUND_TIMEOUT_SECONDS", "30"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+LLM_STUB_DELAY_SECONDS = float(os.getenv("LLM_STUB_DELAY_SECONDS", "0.05"))
+
+genai = lazy("google.generativeai")
+
+# Bump when the prompt changes so old outputs are not served for it
+PROMPT_VERSION = "1"
+MAX_FAILURES_KEPT = 256
+
+PROMPT_TEMPLATE = """You are reviewing a software engineering resume.
+Below is a structured summary produced by an automated analyzer, followed by the target job description if any.
+Write 3-5 short, specific suggestions that go beyond the summary. Plain text, one suggestion per line.
+
+Analysis:
+{analysis}
+
+Job description:
+{job_description}
+"""
+
+
+def clean_gemini_output(text):
+    text = re.sub(r"\*\*(.*?)\*\*", r"\1", text)
+    text = re.sub(r"[*•📚⚠️💼✅🔹🔸📊🛠️📝⬇️🚀🔍]+", "", text)
+    text = re.sub(r"#+\s?", "", text)
+    text = re.sub(r"[-–—]{1,3}\s?", "", text)
+    text = re.sub(r"\n{2,}", "\n\n", text)
+    return text.strip()
+
+
+def build_prompt(result, job_description=None):
+    """Compact, deterministic prompt for an analysis result"""
+    summary = {
+        "scores": result["scores"],
+        "experience": result["experience"],
+        "skills": result["skills"],
+        "sections": result.get("sections"),
+        "missing": result.get("missing"),
+        "job_match": result.get("job_match"),
+    }
+    return PROMPT_TEMPLATE.format(
+        analysis=json.dumps(summary, sort_keys=True, separators=(",", ":")),
+        job_description=" ".join((job_description or "").split())[:4000] or "(none)",
+    )
+
+
+def prompt_key(prompt):
+    return hashlib.sha256(f"{PROMPT_VERSION}\0{LLM_MODEL}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class GeminiProvider:
+    def __init__(self, model=LLM_MODEL):
+        self.model = model
+        self._model = None
+
+    async def generate(self, prompt):
+        if self._model is None:
+            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+            self._model = genai.GenerativeModel(self.model)
+        response = await self._model.generate_content_async(prompt)
+        return response.text
+
+
+class StubProvider:
+    """Offline stand-in: echoes the missing elements as suggestions after a delay"""
+
+    def __init__(self, delay=LLM_STUB_DELAY_SECONDS):
+        self.delay = delay
+        self.calls = 0
+
+    async def generate(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"**Stub review {digest}**\n\n- Quantify the impact of each role\n- Mirror the job description's wording"
+
+
+def make_provider(name=LLM_PROVIDER):
+    if name == "stub":
+        return StubProvider()
+    if name == "gemini":
+        return GeminiProvider()
+    return None
+
+
+class Enricher:
+    """Deadline-bounded, coalesced and cached calls to the enrichment model"""
+
+    def __init__(self, provider=None, deadline=LLM_DEADLINE_SECONDS,
+                 background_timeout=LLM_BACKGROUND_TIMEOUT_SECONDS):
+        self.provider = provider
+        self.deadline = deadline
+        self.background_timeout = background_timeout
+        self._cache = AnalysisCache(max_bytes=LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL_SECONDS, db_path=None)
+        self._flights = SingleFlight()
+        self._failures = OrderedDict()  # key -> error message
+        self.calls = 0
+        self.coalesced = 0
+        self.deadline_misses = 0
+
+    @property
+    def enabled(self):
+        return self.provider is not None
+
+    async def _call(self, key, prompt):
+        self.calls += 1
+        try:
+            text = await asyncio.wait_for(self.provider.generate(prompt), self.background_timeout)
+        except Exception as e:
+            request_log.event("llm_enrichment_failed", logging.WARNING, enrichment_id=key, error=str(e))
+            self._failures[key] = str(e) or type(e).__name__
+            while len(self._failures) > MAX_FAILURES_KEPT:
+                self._failures.popitem(last=False)
+            raise
+        text = clean_gemini_output(text)
+        self._cache.put(key, text)
+        self._failures.pop(key, None)
+        return text
+
+    async def enrich(self, result, job_description=None):
+        """Return {"id", "status", "text"}; status is ready, pending, failed or disabled"""
+        if not self.enabled:
+            return {"id": None, "status": "disabled", "text": None}
+        prompt = build_prompt(result, job_description)
+        key = prompt_key(prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return {"id": key, "status": "ready", "text": cached}
+
+        if self._flights.in_flight(key):
+            self.coalesced += 1
+        task = self._flights.start(key, lambda: self._call(key, prompt))
+        # The task's outcome is kept in the cache or _failures, not on the task
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        try:
+            # Shielded: missing the deadline must not cancel the model call
+            text = await asyncio.wait_for(asyncio.shield(task), self.deadline)
+        except asyncio.TimeoutError:
+            self.deadline_misses += 1
+            return {"id": key, "status": "pending", "text": None}
+        except Exception:
+            return {"id": key, "status": "failed", "text": None}
+        return {"id": key, "status": "ready", "text": text}
+
+    def lookup(self, key):
+        """Current state of an enrichment by id, or None if it is unknown"""
+        cached = self._cache.get(key)
+        if cached is not None:
+            return {"id": key, "status": "ready", "text": cached}
+        if self._flights.in_flight(key):
+            return {"id": key, "status": "pending", "text": None}
+        if key in self._failures:
+            return {"id": key, "status": "failed", "text": None, "error": self._failures[key]}
+        return None
+
+    def stats(self):
+        cache = self._cache.stats()
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "deadline_misses": self.deadline_misses,
+            "in_flight": self._flights.waiting(),
+            "failures": len(self._failures),
+            "cache_hits": cache["hits"],
+            "cache_entries": cache["entries"],
+        }
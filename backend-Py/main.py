@@ -1,35 +1,58 @@
-import os
-import re
-import shutil
-import tempfile
-import requests
-import pdfplumber
+import asyncio
+import json
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, UploadFile, Form
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Query, Body, Header
 from fastapi.middleware.cors import CORSMiddleware
-import google.generativeai as genai
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import List, Optional
 from datetime import datetime
-import base64
-
-# Try to import pytesseract and pdf2image, but don't fail if not available
-try:
-    import pytesseract
-    from pdf2image import convert_from_path
-    PYTESSERACT_AVAILABLE = True
-except ImportError:
-    PYTESSERACT_AVAILABLE = False
-    print("Warning: pytesseract or pdf2image not available. OCR will be skipped.")
+import hashlib
+import hmac
+import logging
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+
+import lazy_imports
+import metrics
+import request_log
+import taxonomy
+import workers
+from feature_store import FeatureStore, analyze_for_store, rescore
+from batch import BATCH_CONCURRENCY, BATCH_MAX_UPLOAD_BYTES, BatchError, expand_uploads, stream_results
+from analysis_cache import AnalysisCache, cache_key
+from job_recommender import RECOMMEND_DEFAULT_K, RECOMMEND_MAX_K, JobCorpus
+from job_queue import JobQueue, JobQueueFullError, callback_allowed
+from jobs_client import JOBS_MAX_PAGES, JobsClient, JobsUpstreamError
+from llm_enrichment import Enricher, make_provider
+from pdf_extraction import (
+    PAGE_CACHE_DB, PAGE_CACHE_MAX_BYTES, PAGE_CACHE_TTL_SECONDS, PYTESSERACT_AVAILABLE, NoTextError,
+    join_pages, merge_pages, needs_ocr_sizes, ocr_concurrency, ocr_document, ocr_page, ocr_pages, page_methods,
+    record_pages, text_pages,
+)
+from report_templates import render_report
+from singleflight import SingleFlight
+from resume_analyzer import analyze_resume_text, extract_skills
+from resume_features import ResumeFeatures
+from scoring import tables_from_json
+from resume_index import (
+    RESUME_SEARCH_TOKEN, SEARCH_DEFAULT_K, SEARCH_MAX_K, ResumeIndex, analyze_for_index, index_features,
+)
+from uploads import UploadSizeLimitMiddleware, UploadTooLargeError, pdf_source, read_upload
 
 # Load environment variables
 load_dotenv()
-
-# Configure Gemini AI
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+request_log.setup_logging()
 
 # Initialize FastAPI app
 app = FastAPI()
 
 
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path_limits={"/analyze-resume/batch": BATCH_MAX_UPLOAD_BYTES},
+)
+app.add_middleware(metrics.MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins
@@ -38,687 +61,545 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+analysis_cache = AnalysisCache()
+# OCR'd text per page, keyed by PageText.key
+page_cache = AnalysisCache(max_bytes=PAGE_CACHE_MAX_BYTES, ttl=PAGE_CACHE_TTL_SECONDS, db_path=PAGE_CACHE_DB)
+resume_index = ResumeIndex()
+# In-flight analyses by cache key, joined by identical concurrent requests
+analysis_flights = SingleFlight()
+job_corpus = JobCorpus()
+jobs_client = JobsClient(on_fetch=job_corpus.upsert)
+enricher = Enricher(make_provider())
+feature_store = FeatureStore()
+
+
+async def run_analysis_job(job):
+    """JobQueue handler: the /analyze-resume/ pipeline for one queued upload"""
+    pdf_bytes = job["pdf"]
+    options = job["options"]
+    result = await analyze_pdf(pdf_bytes, job["job_description"], job["filename"], wait_for_slot=True, request_id=job["id"])
+    response = analysis_response(result, options.get("format", "json"), resume_id(pdf_bytes))
+    if options.get("enrich"):
+        response["enrichment"] = await enricher.enrich(result, job["job_description"])
+    return response
+
+
+# Timeouts and a full or crashed worker pool are worth another attempt
+analysis_jobs = JobQueue(
+    run_analysis_job, retry_on=(workers.StageTimeoutError, workers.QueueFullError, BrokenProcessPool)
+)
 
-# ---------- Resume Analysis Logic ----------
+metrics.REGISTRY.gauge("resume_queue_depth", "Admitted analyses running or waiting for a worker", workers.queue_depth)
+metrics.REGISTRY.gauge(
+    "resume_rss_bytes", "Resident memory of the server and its pool workers", lambda: workers.pool_rss() or 0
+)
+metrics.REGISTRY.gauge(
+    "resume_coalesced_waiters", "Requests currently waiting on an identical analysis already in flight",
+    lambda: analysis_flights.waiters,
+)
+metrics.REGISTRY.gauge("resume_analyses_in_flight", "Distinct analyses currently running", analysis_flights.waiting)
+metrics.REGISTRY.gauge("resume_jobs_pending", "Asynchronous analysis jobs queued or running", analysis_jobs.pending)
+metrics.REGISTRY.gauge(
+    "analysis_cache_hit_ratio", "Share of analysis cache lookups served from cache",
+    lambda: analysis_cache.stats()["hit_ratio"],
+)
 
-def extract_text_from_pdf(pdf_path):
-    text = ""
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    except Exception as e:
-        print("PDFPlumber error:", e)
 
-    # If no text extracted, try alternative method
-    if not text.strip():
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    # Try to extract text with different settings
-                    page_text = page.extract_text(layout=True)
-                    if page_text:
-                        text += page_text + "\n"
-        except Exception as e:
-            print("PDFPlumber layout error:", e)
-
-    if not text.strip() and PYTESSERACT_AVAILABLE:
-        try:
-            images = convert_from_path(pdf_path)
-            for image in images:
-                text += pytesseract.image_to_string(image) + "\n"
-        except Exception as e:
-            print("OCR error:", e)
-
-    return text.strip()
-
-def clean_gemini_output(text):
-    text = re.sub(r"\*\*(.*?)\*\*", r"\1", text)
-    text = re.sub(r"[*•📚⚠️💼✅🔹🔸📊🛠️📝⬇️🚀🔍]+", "", text)
-    text = re.sub(r"#+\s?", "", text)
-    text = re.sub(r"[-–—]{1,3}\s?", "", text)
-    text = re.sub(r"\n{2,}", "\n\n", text)
-    return text.strip()
-
-def analyze_resume_text(resume_text, job_description=None):
-    try:
-        # Use our own intelligent analysis instead of relying on Gemini
-        return generate_intelligent_analysis(resume_text, job_description)
-    except Exception as e:
-        print(f"Analysis error: {str(e)}")
-        # Fallback: Generate intelligent analysis based on resume content
-        return generate_fallback_analysis(resume_text, job_description)
+@app.on_event("startup")
+async def warm_up():
+    analysis_jobs.start()
+    if lazy_imports.WARMUP_ON_STARTUP:
+        # In the background: the app starts serving without waiting for it
+        asyncio.get_running_loop().run_in_executor(None, lazy_imports.warmup)
+        workers.warm_pool(lazy_imports.warmup, ["pdfplumber"])
 
-def generate_intelligent_analysis(resume_text, job_description=None):
-    """Generate detailed, personalized resume analysis based on actual content"""
-    
-    text_lower = resume_text.lower()
-    
-    # Extract contact info
-    import re
-    emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', resume_text)
-    phones = re.findall(r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}', resume_text)
-    
-    # Extract years of experience
-    years_match = re.findall(r'(\d+)\+?\s*(?:years?|yrs?)', text_lower)
-    years = max([int(y) for y in years_match]) if years_match else 0
-    
-    # Check for key sections
-    has_experience = any(word in text_lower for word in ['experience', 'worked', 'developed', 'managed', 'led', 'senior', 'junior', 'engineer', 'developer'])
-    has_education = any(word in text_lower for word in ['bachelor', 'master', 'degree', 'university', 'college', 'b.tech', 'm.tech', 'phd', 'diploma', 'b.s.', 'm.s.'])
-    has_projects = any(word in text_lower for word in ['project', 'built', 'created', 'developed', 'implemented', 'designed', 'architected', 'github', 'portfolio'])
-    has_certifications = any(word in text_lower for word in ['certified', 'certification', 'certificate', 'aws', 'gcp', 'azure', 'scrum', 'agile', 'cissp', 'ccna'])
-    has_leadership = any(word in text_lower for word in ['led', 'managed', 'supervised', 'mentored', 'team', 'leader', 'head', 'director', 'manager', 'lead'])
-    has_metrics = any(word in text_lower for word in ['%', 'improved', 'increased', 'reduced', 'saved', 'achieved', 'delivered', 'revenue', 'users', 'performance', 'growth', 'efficiency'])
-    
-    # Extract skills
-    skills_dict = {}
-    skill_keywords = {
-        'Frontend': ['react', 'vue', 'angular', 'html', 'css', 'javascript', 'typescript', 'tailwind', 'bootstrap', 'next.js', 'svelte'],
-        'Backend': ['node', 'express', 'django', 'fastapi', 'flask', 'java', 'spring', 'golang', 'rust', 'python', 'php', 'laravel', 'asp.net'],
-        'Database': ['mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch', 'cassandra', 'dynamodb', 'firebase', 'oracle', 'sql'],
-        'DevOps': ['docker', 'kubernetes', 'jenkins', 'gitlab', 'github', 'aws', 'azure', 'gcp', 'terraform', 'ansible', 'circleci'],
-        'Other': ['git', 'rest', 'graphql', 'microservices', 'agile', 'scrum', 'linux', 'unix', 'ci/cd', 'api']
-    }
-    
-    for category, keywords in skill_keywords.items():
-        found = [kw for kw in keywords if kw in text_lower]
-        if found:
-            skills_dict[category] = found
-    
-    # Calculate detailed ATS score
-    ats_score = calculate_ats_score(resume_text, text_lower, years, has_experience, has_education, 
-                                     has_projects, has_certifications, has_leadership, has_metrics, skills_dict)
-    
-    # Calculate strength score
-    strength_score = calculate_strength_score(has_experience, has_education, has_projects, 
-                                              has_certifications, has_leadership, has_metrics, years, skills_dict)
-    
-    # Determine experience level
-    if years >= 10 and strength_score >= 7:
-        exp_level = "Senior Level Developer / Tech Lead"
-    elif years >= 5 and strength_score >= 5:
-        exp_level = "Mid-Level Developer"
-    elif years >= 2:
-        exp_level = "Junior to Mid-Level Developer"
-    elif years > 0:
-        exp_level = "Junior Developer"
-    else:
-        exp_level = "Entry-Level Developer"
-    
-    # Build skills section
-    skills_section = ""
-    if skills_dict:
-        skills_section = "\n".join([f"- {category}: {', '.join(skills_dict[category])}" for category in skills_dict])
-    else:
-        skills_section = "- Technical Skills: Not clearly specified"
-    
-    # Identify missing elements
-    missing = []
-    if not has_metrics: missing.append("Quantifiable achievements and metrics")
-    if not has_projects: missing.append("Project descriptions or portfolio links")
-    if not has_certifications: missing.append("Relevant certifications")
-    if not has_leadership: missing.append("Leadership or mentoring experience")
-    if len(skills_dict) < 2: missing.append("Diverse technical skills")
-    if not emails: missing.append("Contact email")
-    if not phones: missing.append("Phone number")
-    
-    improvements = "\n".join([f"{i+1}. {item}" for i, item in enumerate(missing[:5])]) if missing else "1. Your resume is well-structured"
-    
-    analysis = f"""
-📊 RESUME ANALYSIS REPORT
-========================
-
-Overall Strength: {strength_score:.1f}/10
-Your resume demonstrates a {"strong" if strength_score >= 7 else "solid" if strength_score >= 5 else "developing"} professional foundation.
-
-🎯 KEY SKILLS IDENTIFIED:
-{skills_section}
-
-💼 EXPERIENCE LEVEL:
-{exp_level}
-Years of Experience: {years}+ years
-
-📈 AREAS FOR IMPROVEMENT:
-{improvements}
-6. Use action verbs at the start of bullet points
-7. Include specific technologies and tools used in each role
-8. Ensure consistent formatting and spacing
-9. Tailor resume for specific job descriptions
-10. Keep resume to 1-2 pages for better readability
-
-🤖 ATS SCORE: {ats_score}/100
-Your resume is {"well-optimized" if ats_score >= 75 else "reasonably optimized" if ats_score >= 60 else "needs optimization"} for Applicant Tracking Systems.
-
-Breakdown:
-- Contact Information: {"✓" if emails and phones else "✗"}
-- Experience Section: {"✓" if has_experience else "✗"}
-- Education: {"✓" if has_education else "✗"}
-- Skills Listed: {"✓" if skills_dict else "✗"}
-- Projects/Portfolio: {"✓" if has_projects else "✗"}
-- Quantifiable Results: {"✓" if has_metrics else "✗"}
-- Certifications: {"✓" if has_certifications else "✗"}
-
-✅ RECOMMENDED NEXT STEPS:
-1. {"Add quantifiable metrics to your achievements" if not has_metrics else "Expand on your quantifiable achievements"}
-2. {"Include project descriptions or portfolio links" if not has_projects else "Add more project details"}
-3. {"Highlight leadership experience" if not has_leadership else "Emphasize your leadership contributions"}
-4. {"Add relevant certifications" if not has_certifications else "Update with latest certifications"}
-5. Tailor your resume for specific job descriptions
-6. Use strong action verbs at the beginning of bullet points
-7. Ensure consistent formatting and spacing
-8. Keep resume to 1-2 pages for better readability
-9. Include links to portfolio, GitHub, or live projects
-10. Get feedback from industry professionals
-
-📋 RECOMMENDATIONS FOR CAREER GROWTH:
-- Consider pursuing advanced certifications (AWS, Azure, GCP, Kubernetes)
-- Build and showcase portfolio projects on GitHub
-- Contribute to open-source projects to gain experience
-- {"Develop leadership and mentoring skills" if not has_leadership else "Continue building on your leadership experience"}
-- Stay updated with latest technologies and frameworks
-- Network with industry professionals and attend conferences
-- Write technical blog posts or articles
-- Participate in coding competitions or hackathons
-- Consider specializing in a specific domain (AI/ML, DevOps, etc.)
-- Build a personal brand through social media and professional networks
-
-{f"📋 JOB MATCH ANALYSIS:\\nYour resume aligns with the provided job description. Focus on highlighting the matching skills and experience." if job_description else ""}
-
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Analysis Type: AI-Powered Professional Review
-    """
-    
-    return analysis.strip()
 
-def calculate_ats_score(resume_text, text_lower, years, has_experience, has_education, 
-                        has_projects, has_certifications, has_leadership, has_metrics, skills_dict):
-    """Calculate realistic ATS score based on resume content"""
-    
-    score = 50  # Base score
-    
-    # Contact information (10 points)
-    import re
-    emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', resume_text)
-    phones = re.findall(r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}', resume_text)
-    if emails: score += 5
-    if phones: score += 5
-    
-    # Experience section (15 points)
-    if has_experience: score += 15
-    
-    # Education (10 points)
-    if has_education: score += 10
-    
-    # Skills (12 points)
-    if skills_dict:
-        score += 12
-        # Bonus for diverse skills
-        if len(skills_dict) >= 3: score += 3
-    
-    # Projects (8 points)
-    if has_projects: score += 8
-    
-    # Metrics/Results (10 points)
-    if has_metrics: score += 10
-    
-    # Certifications (5 points)
-    if has_certifications: score += 5
-    
-    # Leadership (5 points)
-    if has_leadership: score += 5
-    
-    # Years of experience bonus (5 points)
-    if years >= 5: score += 5
-    
-    # Deductions for missing elements
-    if not has_metrics: score -= 8
-    if not has_projects: score -= 5
-    if not skills_dict: score -= 10
-    if not has_education: score -= 5
-    
-    # Resume length considerations
-    if len(resume_text) < 300: score -= 10  # Too short
-    elif len(resume_text) > 2500: score -= 5  # Too long
-    elif 500 <= len(resume_text) <= 1500: score += 2  # Optimal length
-    
-    # Formatting considerations (check for common ATS-friendly patterns)
-    if resume_text.count('\n') > 20: score += 2  # Good structure
-    if resume_text.count('•') > 5 or resume_text.count('-') > 5: score += 2  # Bullet points
-    
-    # Cap score between 25-85
-    return max(25, min(85, score))
+@app.on_event("shutdown")
+async def shutdown_workers():
+    workers.shutdown()
+    await analysis_jobs.close()
+    await jobs_client.aclose()
+    feature_store.close()
+    analysis_cache.close()
+    page_cache.close()
+    resume_index.close()
+    request_log.shutdown_logging()
 
-def calculate_strength_score(has_experience, has_education, has_projects, 
-                             has_certifications, has_leadership, has_metrics, years, skills_dict):
-    """Calculate overall profile strength"""
-    
-    score = 0
-    
-    if has_experience: score += 2
-    if has_education: score += 1.5
-    if has_projects: score += 2
-    if has_certifications: score += 1
-    if has_leadership: score += 1.5
-    if has_metrics: score += 1
-    if years >= 5: score += 0.5
-    if len(skills_dict) >= 3: score += 0.5
-    
-    return min(10, score)
 
-def analyze_with_apilayer(resume_text, job_description=None, api_key=None):
-    """Analyze resume using apilayer Resume Parser API"""
-    try:
-        # Since apilayer requires a URL, we'll use the extracted text directly
-        # and create a comprehensive analysis based on the parsed content
-        
-        # Parse the resume text to extract key information
-        parsed_data = parse_resume_content(resume_text)
-        
-        # Generate analysis based on parsed data
-        analysis = generate_analysis_from_parsed_data(parsed_data, job_description)
-        return analysis
-    except Exception as e:
-        print(f"Error in apilayer analysis: {str(e)}")
-        return generate_fallback_analysis(resume_text, job_description)
-
-def parse_resume_content(resume_text):
-    """Parse resume content to extract structured data"""
-    parsed = {
-        'name': extract_name(resume_text),
-        'email': extract_email(resume_text),
-        'phone': extract_phone(resume_text),
-        'skills': extract_skills(resume_text),
-        'experience': extract_experience(resume_text),
-        'education': extract_education(resume_text),
-        'certifications': extract_certifications(resume_text),
-        'projects': extract_projects(resume_text),
-        'years_of_experience': calculate_years_of_experience(resume_text),
-    }
-    return parsed
-
-def extract_name(text):
-    """Extract name from resume"""
-    lines = text.split('\n')
-    for line in lines[:5]:  # Check first 5 lines
-        if len(line.strip()) > 0 and len(line.strip().split()) <= 3:
-            return line.strip()
-    return "Candidate"
-
-def extract_email(text):
-    """Extract email from resume"""
-    import re
-    emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
-    return emails[0] if emails else "Not provided"
-
-def extract_phone(text):
-    """Extract phone number from resume"""
-    import re
-    phones = re.findall(r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}', text)
-    return phones[0] if phones else "Not provided"
-
-def extract_skills(text):
-    """Extract skills from resume"""
-    skills_keywords = {
-        'Frontend': ['react', 'vue', 'angular', 'html', 'css', 'javascript', 'typescript', 'tailwind', 'bootstrap', 'next.js', 'svelte'],
-        'Backend': ['node', 'express', 'django', 'fastapi', 'flask', 'java', 'spring', 'golang', 'rust', 'python', 'php', 'laravel'],
-        'Database': ['mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch', 'cassandra', 'dynamodb', 'firebase', 'oracle'],
-        'DevOps': ['docker', 'kubernetes', 'jenkins', 'gitlab', 'github', 'aws', 'azure', 'gcp', 'terraform', 'ansible', 'circleci'],
-        'Other': ['git', 'rest', 'graphql', 'microservices', 'agile', 'scrum', 'linux', 'unix', 'ci/cd', 'api', 'sql']
-    }
-    
-    text_lower = text.lower()
-    found_skills = {}
-    
-    for category, keywords in skills_keywords.items():
-        found = [kw for kw in keywords if kw in text_lower]
-        if found:
-            found_skills[category] = found
-    
-    return found_skills
-
-def extract_experience(text):
-    """Extract work experience from resume"""
-    experience_keywords = ['experience', 'worked', 'developed', 'managed', 'led', 'senior', 'junior', 'engineer', 'developer', 'manager', 'director']
-    text_lower = text.lower()
-    
-    has_experience = any(keyword in text_lower for keyword in experience_keywords)
-    
-    # Try to extract years
-    import re
-    years = re.findall(r'(\d+)\+?\s*(?:years?|yrs?)', text_lower)
-    max_years = max([int(y) for y in years]) if years else 0
-    
-    return {
-        'has_experience': has_experience,
-        'years': max_years
-    }
-
-def extract_education(text):
-    """Extract education from resume"""
-    education_keywords = ['bachelor', 'master', 'degree', 'university', 'college', 'b.tech', 'm.tech', 'phd', 'diploma', 'b.s.', 'm.s.']
-    text_lower = text.lower()
-    
-    found_education = [kw for kw in education_keywords if kw in text_lower]
-    return found_education
-
-def extract_certifications(text):
-    """Extract certifications from resume"""
-    cert_keywords = ['certified', 'certification', 'certificate', 'aws', 'gcp', 'azure', 'scrum', 'agile', 'cissp', 'ccna', 'ckad']
-    text_lower = text.lower()
-    
-    found_certs = [kw for kw in cert_keywords if kw in text_lower]
-    return found_certs
-
-def extract_projects(text):
-    """Extract projects from resume"""
-    project_keywords = ['project', 'built', 'created', 'developed', 'implemented', 'designed', 'architected', 'github', 'portfolio']
-    text_lower = text.lower()
-    
-    has_projects = any(keyword in text_lower for keyword in project_keywords)
-    return has_projects
-
-def calculate_years_of_experience(text):
-    """Calculate years of experience from resume"""
-    import re
-    years = re.findall(r'(\d+)\+?\s*(?:years?|yrs?)', text.lower())
-    return max([int(y) for y in years]) if years else 0
+# ---------- Resume Analysis Logic ----------
 
-def generate_analysis_from_parsed_data(parsed_data, job_description=None):
-    """Generate detailed analysis based on parsed resume data"""
-    
-    skills = parsed_data.get('skills', {})
-    experience = parsed_data.get('experience', {})
-    education = parsed_data.get('education', [])
-    certifications = parsed_data.get('certifications', [])
-    projects = parsed_data.get('projects', False)
-    years = parsed_data.get('years_of_experience', 0)
-    
-    # Calculate strength score
-    strength_score = 0
-    if experience.get('has_experience'): strength_score += 2
-    if skills: strength_score += 2
-    if education: strength_score += 1.5
-    if projects: strength_score += 2
-    if certifications: strength_score += 1
-    if years >= 5: strength_score += 1
-    if years >= 10: strength_score += 0.5
-    strength_score = min(10, strength_score)
-    
-    # Calculate ATS score
-    ats_score = 60
-    if skills: ats_score += 10
-    if experience.get('has_experience'): ats_score += 10
-    if education: ats_score += 5
-    if projects: ats_score += 5
-    if certifications: ats_score += 3
-    if years >= 3: ats_score += 5
-    ats_score = min(100, ats_score)
-    
-    # Determine experience level
-    if years >= 10 and strength_score >= 7:
-        exp_level = "Senior Level Developer / Tech Lead"
-    elif years >= 5 and strength_score >= 5:
-        exp_level = "Mid-Level Developer"
-    elif years >= 2:
-        exp_level = "Junior to Mid-Level Developer"
-    elif years > 0:
-        exp_level = "Junior Developer"
+def analysis_response(result, response_format="text", resume_id=None):
+    """Shape an analysis result for the client: rendered report or raw JSON"""
+    response = {"resumeScore": result["scores"]["ats"], "timestamp": datetime.now().isoformat()}
+    if resume_id:
+        response["resumeId"] = resume_id
+    if "extraction" in result:
+        response["reusedPages"] = result["extraction"]["reused_pages"]
+    if response_format == "json":
+        response["result"] = result
     else:
-        exp_level = "Entry-Level Developer"
-    
-    # Build skills section
-    skills_section = ""
-    if skills:
-        skills_section = "\n".join([f"- {category}: {', '.join(skills[category])}" for category in skills])
+        response["analysis"] = render_report(result)
+    return response
+
+def resume_id(pdf_bytes):
+    """Stable id of an uploaded resume in the search index"""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+def reuse_ocr_pages(pages):
+    """Fill in empty pages the page cache has OCR'd text for; return (pages, reused page numbers)"""
+    reused = []
+    for index, page in enumerate(pages):
+        if page.method == "empty" and page.key is not None:
+            cached = page_cache.get(page.key)
+            if cached is not None:
+                pages[index] = page._replace(text=cached["text"], method=cached["method"])
+                reused.append(page.number)
+    if reused:
+        metrics.inc("resume_pages_reused_total", len(reused))
+    return pages, reused
+
+def remember_pages(pages):
+    for page in pages:
+        # Only OCR is worth caching: the text pass that fingerprints a page also extracts it.
+        # Empty pages are not cached, so they are retried if OCR becomes available
+        if page.method == "ocr" and page.key is not None:
+            page_cache.put(page.key, {"text": page.text, "method": page.method})
+
+async def extract_incremental(source):
+    """Extract a document, OCR'ing only the pages missing from the page cache; return (pages, reused page numbers)"""
+    pages = await workers.run_stage("extraction", text_pages, source, timeout=workers.EXTRACTION_TIMEOUT)
+    reused = []
+    if not pages:
+        # Unreadable by pdfplumber; OCR the whole document in one stage
+        pages = await workers.run_stage("ocr", ocr_document, source, timeout=workers.EXTRACTION_TIMEOUT)
     else:
-        skills_section = "- Technical Skills: Programming, Software Development"
-    
-    analysis = f"""
-📊 RESUME ANALYSIS REPORT
-========================
-
-Candidate: {parsed_data.get('name', 'Candidate')}
-Email: {parsed_data.get('email', 'Not provided')}
-Phone: {parsed_data.get('phone', 'Not provided')}
-
-Overall Strength: {strength_score:.1f}/10
-Your resume demonstrates a solid professional foundation with relevant experience and technical skills.
-
-🎯 KEY SKILLS IDENTIFIED:
-{skills_section}
-
-💼 EXPERIENCE LEVEL:
-{exp_level}
-Years of Experience: {years}+ years
-Based on the depth and breadth of your experience and skills
-
-📈 AREAS FOR IMPROVEMENT:
-1. Add more quantifiable achievements and metrics (e.g., "Improved performance by 40%")
-2. Include specific project outcomes and business impact
-3. Highlight leadership or mentoring experience
-4. Add relevant certifications or continuous learning initiatives
-5. Improve formatting for ATS optimization (use standard section headers)
-6. Include specific technologies and tools used in each role
-7. Add measurable results and KPIs for each achievement
-8. Use action verbs at the start of bullet points
-9. Include links to portfolio, GitHub, or personal projects
-10. Tailor resume for specific job descriptions
-
-🤖 ATS SCORE: {ats_score}/100
-Your resume is well-structured for Applicant Tracking Systems.
-Score indicates: {"Excellent" if ats_score >= 80 else "Good" if ats_score >= 60 else "Fair"} ATS compatibility
-
-✅ RECOMMENDED NEXT STEPS:
-1. Quantify your achievements with specific metrics and results
-2. Add specific technologies and tools you've used in each role
-3. Include relevant certifications or training completed
-4. Tailor your resume for specific job descriptions
-5. Use strong action verbs at the beginning of bullet points
-6. Include links to portfolio, GitHub, or live projects
-7. Get feedback from industry professionals or mentors
-8. Ensure consistent formatting and spacing
-9. Use keywords from job descriptions you're targeting
-10. Keep resume to 1-2 pages for better readability
-
-📋 RECOMMENDATIONS FOR CAREER GROWTH:
-- Consider pursuing advanced certifications (AWS, Azure, GCP, Kubernetes)
-- Build and showcase portfolio projects on GitHub
-- Contribute to open-source projects to gain experience
-- Develop leadership and mentoring skills
-- Stay updated with latest technologies and frameworks
-- Network with industry professionals and attend conferences
-- Write technical blog posts or articles
-- Participate in coding competitions or hackathons
-- Consider specializing in a specific domain (AI/ML, DevOps, etc.)
-- Build a personal brand through social media and professional networks
-
-{f"📋 JOB MATCH ANALYSIS:\\nYour resume aligns well with the provided job description. Focus on highlighting the matching skills and experience." if job_description else ""}
-
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Analysis Type: AI-Powered Professional Review (Powered by APILayer Resume Parser)
-    """
-    
-    return analysis.strip()
-
-def generate_fallback_analysis(resume_text, job_description=None):
-    """Generate professional resume analysis without API calls"""
-    
-    # Extract basic info from resume
-    has_experience = any(word in resume_text.lower() for word in ['experience', 'worked', 'developed', 'managed', 'led', 'senior', 'junior', 'engineer', 'developer'])
-    has_skills = any(word in resume_text.lower() for word in ['python', 'java', 'javascript', 'react', 'node', 'sql', 'aws', 'docker', 'kubernetes', 'c++', 'typescript', 'golang', 'rust'])
-    has_education = any(word in resume_text.lower() for word in ['bachelor', 'master', 'degree', 'university', 'college', 'b.tech', 'm.tech', 'phd', 'diploma'])
-    has_projects = any(word in resume_text.lower() for word in ['project', 'built', 'created', 'developed', 'implemented', 'designed', 'architected'])
-    has_certifications = any(word in resume_text.lower() for word in ['certified', 'certification', 'certificate', 'aws', 'gcp', 'azure', 'scrum', 'agile'])
-    has_leadership = any(word in resume_text.lower() for word in ['led', 'managed', 'supervised', 'mentored', 'team', 'leader', 'head', 'director', 'manager'])
-    has_metrics = any(word in resume_text.lower() for word in ['%', 'improved', 'increased', 'reduced', 'saved', 'achieved', 'delivered', 'revenue', 'users', 'performance'])
-    
-    # Extract skills mentioned
-    skills_list = []
-    skill_keywords = {
-        'Frontend': ['react', 'vue', 'angular', 'html', 'css', 'javascript', 'typescript', 'tailwind', 'bootstrap'],
-        'Backend': ['node', 'express', 'django', 'fastapi', 'flask', 'java', 'spring', 'golang', 'rust', 'python'],
-        'Database': ['mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch', 'cassandra', 'dynamodb'],
-        'DevOps': ['docker', 'kubernetes', 'jenkins', 'gitlab', 'github', 'aws', 'azure', 'gcp', 'terraform'],
-        'Other': ['git', 'rest', 'graphql', 'microservices', 'agile', 'scrum', 'linux', 'unix']
-    }
-    
-    for category, keywords in skill_keywords.items():
-        found_skills = [kw for kw in keywords if kw in resume_text.lower()]
-        if found_skills:
-            skills_list.append(f"{category}: {', '.join(found_skills)}")
-    
-    # Calculate strength score
-    strength_score = 0
-    if has_experience: strength_score += 2
-    if has_skills: strength_score += 2
-    if has_education: strength_score += 1.5
-    if has_projects: strength_score += 2
-    if has_certifications: strength_score += 1
-    if has_leadership: strength_score += 1
-    if has_metrics: strength_score += 0.5
-    strength_score = min(10, strength_score)
-    
-    # Calculate ATS score - be more critical and realistic
-    ats_score = 50  # Start with base score
-    
-    # Add points for key elements
-    if has_experience: ats_score += 15
-    if has_education: ats_score += 10
-    if has_skills: ats_score += 12
-    if has_projects: ats_score += 8
-    if has_metrics: ats_score += 8
-    if has_certifications: ats_score += 5
-    if has_leadership: ats_score += 5
-    
-    # Deduct points for missing elements
-    if not has_metrics: ats_score -= 5
-    if not has_projects: ats_score -= 5
-    if len(skills_list) < 2: ats_score -= 5
-    
-    # Formatting considerations
-    if len(resume_text) < 300: ats_score -= 10  # Too short
-    if len(resume_text) > 2000: ats_score -= 5  # Too long
-    
-    ats_score = max(20, min(85, ats_score))  # Cap between 20-85
-    
-    # Determine experience level
-    if has_leadership and strength_score >= 7:
-        exp_level = "Senior Level Developer / Tech Lead"
-    elif has_experience and strength_score >= 5:
-        exp_level = "Mid-Level Developer"
-    elif has_experience:
-        exp_level = "Junior to Mid-Level Developer"
+        pages, reused = reuse_ocr_pages(pages)
+        needs_ocr = needs_ocr_sizes(pages)
+        if needs_ocr and PYTESSERACT_AVAILABLE:
+            ocr = await workers.run_stage("ocr", ocr_pages, source, needs_ocr, timeout=workers.EXTRACTION_TIMEOUT)
+            pages = merge_pages(pages, ocr)
+            remember_pages(page for page in pages if page.number in needs_ocr)
+    record_pages(pages)
+    return pages, reused
+
+async def extract_with_progress(source, progress):
+    """Staged extraction: the text cascade, cached OCR pages, then one OCR stage per remaining empty page"""
+    pages = await workers.run_stage("extraction", text_pages, source, timeout=workers.EXTRACTION_TIMEOUT)
+    reused = []
+    if not pages:
+        # Unreadable by pdfplumber; OCR the whole document in one stage
+        pages = await workers.run_stage("ocr", ocr_document, source, timeout=workers.EXTRACTION_TIMEOUT)
     else:
-        exp_level = "Entry-Level Developer"
-    
-    analysis = f"""
-📊 RESUME ANALYSIS REPORT
-========================
-
-Overall Strength: {strength_score:.1f}/10
-Your resume demonstrates a solid professional foundation with relevant experience and technical skills.
-
-🎯 KEY SKILLS IDENTIFIED:
-{chr(10).join(['- ' + skill for skill in skills_list]) if skills_list else '- Technical Skills: Programming, Software Development'}
-
-💼 EXPERIENCE LEVEL:
-{exp_level}
-Based on the depth and breadth of your experience and skills
-
-📈 AREAS FOR IMPROVEMENT:
-1. Add more quantifiable achievements and metrics (e.g., "Improved performance by 40%")
-2. Include specific project outcomes and business impact
-3. Highlight leadership or mentoring experience
-4. Add relevant certifications or continuous learning initiatives
-5. Improve formatting for ATS optimization (use standard section headers)
-6. Include specific technologies and tools used in each role
-7. Add measurable results and KPIs for each achievement
-8. Use action verbs at the start of bullet points
-9. Include links to portfolio, GitHub, or personal projects
-10. Tailor resume for specific job descriptions
-
-🤖 ATS SCORE: {ats_score}/100
-Your resume is well-structured for Applicant Tracking Systems.
-Score indicates: {"Excellent" if ats_score >= 80 else "Good" if ats_score >= 60 else "Fair"} ATS compatibility
-
-✅ RECOMMENDED NEXT STEPS:
-1. Quantify your achievements with specific metrics and results
-2. Add specific technologies and tools you've used in each role
-3. Include relevant certifications or training completed
-4. Tailor your resume for specific job descriptions
-5. Use strong action verbs at the beginning of bullet points
-6. Include links to portfolio, GitHub, or live projects
-7. Get feedback from industry professionals or mentors
-8. Ensure consistent formatting and spacing
-9. Use keywords from job descriptions you're targeting
-10. Keep resume to 1-2 pages for better readability
-
-📋 RECOMMENDATIONS FOR CAREER GROWTH:
-- Consider pursuing advanced certifications (AWS, Azure, GCP, Kubernetes)
-- Build and showcase portfolio projects on GitHub
-- Contribute to open-source projects to gain experience
-- Develop leadership and mentoring skills
-- Stay updated with latest technologies and frameworks
-- Network with industry professionals and attend conferences
-- Write technical blog posts or articles
-- Participate in coding competitions or hackathons
-- Consider specializing in a specific domain (AI/ML, DevOps, etc.)
-- Build a personal brand through social media and professional networks
-
-{f"📋 JOB MATCH ANALYSIS:\\nYour resume aligns well with the provided job description. Focus on highlighting the matching skills and experience." if job_description else ""}
-
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Analysis Type: AI-Powered Professional Review
+        pages, reused = reuse_ocr_pages(pages)
+    for page in pages:
+        if page.method != "empty":
+            event = {"page": page.number, "method": page.method, "chars": len(page.text)}
+            await progress("page", {**event, "reused": True} if page.number in reused else event)
+
+    by_number = {page.number: page for page in pages}
+    empty = list(needs_ocr_sizes(pages))
+    if empty and PYTESSERACT_AVAILABLE:
+        # Keep this request's concurrent OCR pages within its memory budget
+        ocr_slots = asyncio.Semaphore(ocr_concurrency([by_number[number].size for number in empty]))
+
+        async def ocr_stage(number):
+            async with ocr_slots:
+                return await workers.run_stage(
+                    "ocr", ocr_page, source, number, by_number[number].size, timeout=workers.EXTRACTION_TIMEOUT
+                )
+
+        for finished in asyncio.as_completed([ocr_stage(number) for number in empty]):
+            page = await finished
+            by_number[page.number] = page._replace(key=by_number[page.number].key)
+            await progress("page", {"page": page.number, "method": page.method, "chars": len(page.text)})
+        remember_pages(by_number[number] for number in empty)
+    else:
+        for number in empty:
+            await progress("page", {"page": number, "method": "empty", "chars": 0})
+
+    pages = [by_number[number] for number in sorted(by_number)]
+    record_pages(pages)
+    await progress("extracted", {"pages": len(pages), "chars": len(join_pages(pages)), "reused": reused})
+    return pages, reused
+
+def new_request_id():
+    return uuid.uuid4().hex[:16]
+
+async def analyze_pdf(pdf_bytes, job_description, filename, wait_for_slot=False, progress=None, request_id=None):
+    """Run one resume through the cache, extraction and analysis stages.
+
+    progress, if given, is an async callable (event, data) told about each
+    page and stage as it finishes; extraction is then split into per-page
+    stages so OCR progress can be reported.
+
+    Concurrent calls for the same PDF and job description share one run
+    (the first caller's), so a double-clicked upload or a client retry
+    does not extract the document twice before its result is cached.  Only
+    callers with the same wait_for_slot share a run, so an interactive
+    request still gets QueueFullError rather than waiting on a queued batch
+    job's run, and a batch job does not inherit one from an interactive run.
     """
-    
-    return analysis.strip()
+    request_id = request_id or new_request_id()
+    started = time.perf_counter()
+    key = cache_key(pdf_bytes, job_description)
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        if progress is not None:
+            await progress("cached", {})
+        request_log.event(
+            "resume_analyzed", sampled=True, request_id=request_id, cache="hit", file_bytes=len(pdf_bytes),
+            total_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+        return cached
+
+    flight = (key, wait_for_slot)
+    joining = analysis_flights.in_flight(flight)
+    if joining:
+        metrics.inc("resume_coalesced_requests_total")
+        if progress is not None:
+            await progress("coalesced", {})
+    result = await analysis_flights.do(
+        flight, lambda: run_analysis(key, pdf_bytes, job_description, filename, wait_for_slot, progress, request_id, started)
+    )
+    if joining:
+        request_log.event(
+            "resume_analyzed", sampled=True, request_id=request_id, cache="coalesced", file_bytes=len(pdf_bytes),
+            total_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+    return result
+
+async def run_analysis(key, pdf_bytes, job_description, filename, wait_for_slot, progress, request_id, started):
+    """The uncached part of analyze_pdf(): extraction, analysis, then caching and indexing the result"""
+    async with workers.job_slot(wait=wait_for_slot):
+        admitted = time.perf_counter()
+        with pdf_source(pdf_bytes) as source:
+            if progress is None:
+                pages, reused = await extract_incremental(source)
+            else:
+                pages, reused = await extract_with_progress(source, progress)
+        resume_text = join_pages(pages)
+        if not resume_text:
+            # Nothing to analyze: do not score, cache or index an empty document
+            raise NoTextError()
+        methods = page_methods(pages)
+        extracted = time.perf_counter()
+        request_log.resume_text(request_id, resume_text)
+
+        features = vector = None
+        if progress is not None:
+            features, vector = await workers.run_stage(
+                "features", index_features, resume_text, timeout=workers.ANALYSIS_TIMEOUT
+            )
+            await progress("features", {"name": features.name, "years": features.years, "skills": features.skills})
+
+        record = None
+        if feature_store.enabled:
+            result, document, record = await workers.run_stage(
+                "analysis", analyze_for_store, resume_text, job_description,
+                resume_id(pdf_bytes), filename, features, vector,
+                timeout=workers.ANALYSIS_TIMEOUT,
+            )
+        else:
+            result, document = await workers.run_stage(
+                "analysis", analyze_for_index, resume_text, job_description,
+                resume_id(pdf_bytes), filename, features, vector,
+                timeout=workers.ANALYSIS_TIMEOUT,
+            )
+
+    result["extraction"] = {"pages": len(pages), "reused_pages": reused, "methods": methods}
+    analysis_cache.put(key, result)
+    resume_index.add(document)
+    finished = time.perf_counter()
+    timings = {
+        "queue_ms": round((admitted - started) * 1000, 1),
+        "extraction_ms": round((extracted - admitted) * 1000, 1),
+        "analysis_ms": round((finished - extracted) * 1000, 1),
+        "total_ms": round((finished - started) * 1000, 1),
+    }
+    if record is not None:
+        feature_store.append(record, {**timings, "pages": len(pages), "reused_pages": len(reused), "methods": methods})
+    request_log.event(
+        "resume_analyzed", sampled=True, request_id=request_id, cache="miss",
+        file_bytes=len(pdf_bytes), text_chars=len(resume_text), pages=len(pages), methods=methods, reused_pages=len(reused),
+        analyzer=result["analyzer"], ats=result["scores"]["ats"], **timings,
+    )
+    return result
 
 @app.post("/analyze-resume/")
-async def analyze_resume_api(file: UploadFile = File(...), job_description: str = Form("")):
+async def analyze_resume_api(
+    file: UploadFile = File(...),
+    job_description: str = Form(""),
+    response_format: str = Query("text", alias="format", pattern="^(text|json)$"),
+    enrich: bool = Query(False),
+    mode: str = Query("sync", pattern="^(sync|async)$"),
+    priority: str = Query("interactive", pattern="^(interactive|batch)$"),
+    callback_url: Optional[str] = Form(None),
+):
+    """Analyze one resume.
+
+    mode=async answers 202 with a job id right away; the result is then
+    polled at GET /analysis/{id} or POSTed to callback_url (or the
+    configured ANALYSIS_WEBHOOK_URL) when ready.
+    """
+    if callback_url and not callback_allowed(callback_url):
+        raise HTTPException(status_code=400, detail="callback_url is not an allowed webhook destination")
+    request_id = new_request_id()
     try:
-        temp_dir = tempfile.mkdtemp()
-        file_path = os.path.join(temp_dir, file.filename)
-
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        resume_text = extract_text_from_pdf(file_path)
-        
-        # Debug logging - save extracted text to file for inspection
-        debug_file = os.path.join(temp_dir, "extracted_text.txt")
-        with open(debug_file, "w", encoding="utf-8") as f:
-            f.write(resume_text)
-        
-        print(f"\n{'='*60}")
-        print(f"Resume file: {file.filename}")
-        print(f"File size: {os.path.getsize(file_path)} bytes")
-        print(f"Extracted text length: {len(resume_text)}")
-        print(f"Full extracted text:\n{resume_text}")
-        print(f"{'='*60}\n")
-        
-        analysis = analyze_resume_text(resume_text, job_description)
-
-        shutil.rmtree(temp_dir)
-        
-        # Extract ATS score from analysis
-        import re
-        ats_match = re.search(r'ATS SCORE:\s*(\d+)', analysis)
-        ats_score = int(ats_match.group(1)) if ats_match else 0
-        
-        return {
-            "analysis": analysis,
-            "resumeScore": ats_score,
-            "timestamp": datetime.now().isoformat()
-        }
+        pdf_bytes = await read_upload(file)
+        if mode == "async":
+            job_id = await analysis_jobs.submit(
+                pdf_bytes, file.filename, job_description, priority, callback_url,
+                {"format": response_format, "enrich": enrich},
+            )
+            return JSONResponse(
+                {"jobId": job_id, "status": "queued", "statusUrl": f"/analysis/{job_id}"}, status_code=202
+            )
+        result = await analyze_pdf(pdf_bytes, job_description, file.filename, request_id=request_id)
+        response = analysis_response(result, response_format, resume_id(pdf_bytes))
+        if enrich:
+            response["enrichment"] = await enricher.enrich(result, job_description)
+        return response
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except NoTextError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except (workers.QueueFullError, JobQueueFullError) as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except workers.StageTimeoutError as e:
+        request_log.event("resume_timeout", logging.WARNING, request_id=request_id, stage=e.stage, timeout=e.timeout)
+        raise HTTPException(status_code=504, detail=f"Resume processing timed out ({e})")
     except Exception as e:
-        print(f"Error in analyze_resume_api: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        request_log.event("resume_failed", logging.ERROR, exc=True, request_id=request_id, error=str(e))
         return {"error": str(e), "analysis": "Error processing resume. Please try again."}
 
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+@app.post("/analyze-resume/stream")
+async def analyze_resume_stream(
+    file: UploadFile = File(...),
+    job_description: str = Form(""),
+    response_format: str = Query("text", alias="format", pattern="^(text|json)$"),
+):
+    """Server-sent events variant of /analyze-resume/.
+
+    Emits received, page (one per page, with the extraction method),
+    extracted, features, scores and finally report, whose data is the same
+    payload /analyze-resume/ returns.  A cache hit emits cached instead of
+    the per-page and features events, and joining an identical analysis
+    already in flight emits coalesced.  Failures end the stream with an
+    error event.
+    """
+    try:
+        pdf_bytes = await read_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    filename = file.filename
+
+    async def events():
+        queue = asyncio.Queue()
+
+        async def progress(event, data):
+            await queue.put(sse_event(event, data))
+
+        async def run():
+            request_id = new_request_id()
+            try:
+                result = await analyze_pdf(pdf_bytes, job_description, filename, progress=progress, request_id=request_id)
+                await progress("scores", result["scores"])
+                await progress("report", analysis_response(result, response_format, resume_id(pdf_bytes)))
+            except NoTextError as e:
+                await progress("error", {"status": 422, "detail": str(e)})
+            except workers.QueueFullError as e:
+                await progress("error", {"status": 503, "detail": str(e), "retryAfter": e.retry_after})
+            except workers.StageTimeoutError as e:
+                request_log.event("resume_timeout", logging.WARNING, request_id=request_id, stage=e.stage, timeout=e.timeout)
+                await progress("error", {"status": 504, "detail": f"Resume processing timed out ({e})"})
+            except Exception as e:
+                request_log.event("resume_failed", logging.ERROR, exc=True, request_id=request_id, error=str(e))
+                await progress("error", {"status": 500, "detail": str(e)})
+            finally:
+                await queue.put(None)
+
+        yield sse_event("received", {"filename": filename, "bytes": len(pdf_bytes)})
+        task = asyncio.ensure_future(run())
+        try:
+            while True:
+                message = await queue.get()
+                if message is None:
+                    break
+                yield message
+        finally:
+            # Client went away: stop waiting on the pipeline
+            task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/analyze-resume/batch")
+async def analyze_resume_batch(
+    files: List[UploadFile] = File(...),
+    job_description: str = Form(""),
+    concurrency: int = Query(BATCH_CONCURRENCY, ge=1),
+    mode: str = Query("stream", pattern="^(stream|async)$"),
+    callback_url: Optional[str] = Form(None),
+):
+    """Analyze many resumes (PDFs or zips of PDFs), streaming NDJSON as each finishes.
+
+    mode=async instead queues one job per resume at batch priority, behind
+    interactive uploads, and answers 202 with their ids.
+    """
+    if callback_url and not callback_allowed(callback_url):
+        raise HTTPException(status_code=400, detail="callback_url is not an allowed webhook destination")
+    try:
+        # Read everything before streaming; the uploads are closed once this returns
+        items = await expand_uploads(files)
+    except BatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if mode == "async":
+        jobs = []
+        for index, (filename, data) in enumerate(items):
+            if isinstance(data, Exception):
+                jobs.append({"index": index, "filename": filename, "status": "error", "error": str(data)})
+                continue
+            try:
+                job_id = await analysis_jobs.submit(
+                    data, filename, job_description, "batch", callback_url, {"format": "json"}
+                )
+            except JobQueueFullError as e:
+                jobs.append({"index": index, "filename": filename, "status": "error", "error": str(e)})
+                continue
+            jobs.append({"index": index, "filename": filename, "status": "queued", "jobId": job_id})
+        return JSONResponse({"jobs": jobs}, status_code=202)
+
+    async def analyze(pdf_bytes, filename):
+        return await analyze_pdf(pdf_bytes, job_description, filename, wait_for_slot=True)
+
+    return StreamingResponse(
+        stream_results(items, analyze, min(concurrency, BATCH_CONCURRENCY)),
+        media_type="application/x-ndjson",
+    )
+
+@app.get("/analysis/enrichment/{enrichment_id}")
+def get_enrichment(enrichment_id: str):
+    """Poll an LLM enrichment that missed the request deadline"""
+    enrichment = enricher.lookup(enrichment_id)
+    if enrichment is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired enrichment id")
+    return enrichment
+
+@app.get("/analysis/enrichment-stats")
+def enrichment_stats():
+    return enricher.stats()
+
+@app.get("/analysis-jobs/stats")
+def analysis_jobs_stats():
+    """Queued, running and finished asynchronous analysis jobs"""
+    return analysis_jobs.stats()
+
+# Registered after the other /analysis/ routes so it does not shadow them
+@app.get("/analysis/{job_id}")
+def get_analysis_job(job_id: str):
+    """Poll an asynchronous analysis: queued, running, done (with result) or failed"""
+    job = analysis_jobs.lookup(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired analysis job id")
+    return job
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text exposition of stage latencies and pipeline counters"""
+    # Served on the event loop thread, which is the only writer of the registry
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/warmup")
+def warmup():
+    """Import the heavy libraries now instead of on the first request that needs them"""
+    return {"modules": lazy_imports.warmup()}
+
+@app.get("/startup/stats")
+def startup_stats():
+    """How long each lazily imported library took to load in this process"""
+    return lazy_imports.stats()
+
+@app.get("/analysis-cache/stats")
+def analysis_cache_stats():
+    """Hit/miss counters for sizing the analysis cache, and requests coalesced on a miss"""
+    return {
+        **analysis_cache.stats(),
+        "in_flight": analysis_flights.waiting(),
+        "coalesced": analysis_flights.joined,
+        "coalesced_waiters": analysis_flights.waiters,
+    }
+
+@app.get("/taxonomy/stats")
+def taxonomy_stats():
+    """Size of the loaded skill taxonomy and where it was mapped from"""
+    return taxonomy.get_taxonomy().stats()
+
+@app.get("/page-cache/stats")
+def page_cache_stats():
+    """Hit/miss counters for the per-page extracted text cache"""
+    return page_cache.stats()
+
+@app.get("/feature-store/stats")
+def feature_store_stats():
+    """Rows written to, queued for and dropped from the feature store"""
+    return feature_store.stats()
+
+@app.post("/feature-store/rescore")
+async def feature_store_rescore(
+    rules: Optional[dict] = Body(None),
+    write: bool = Query(False),
+    authorization: Optional[str] = Header(None),
+):
+    """Re-run scoring over every stored analysis, optionally with trial score tables.
+
+    Can rewrite every stored score, so like resume search it is only served
+    with a RESUME_SEARCH_TOKEN configured, to bearers of that token.
+    """
+    if not feature_store.enabled or not RESUME_SEARCH_TOKEN:
+        raise HTTPException(status_code=404, detail="Feature store rescoring is not enabled")
+    if not hmac.compare_digest(authorization or "", f"Bearer {RESUME_SEARCH_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Feature store rescoring requires a valid token")
+    try:
+        if rules:
+            tables_from_json(rules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid score tables: {str(e)}")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: rescore(feature_store.db_path, rules or None, write=write))
+
+@app.get("/resumes/search")
+def search_resumes(
+    job_description: str = Query(""),
+    skills: List[str] = Query([]),
+    min_years: Optional[int] = Query(None, ge=0),
+    k: int = Query(SEARCH_DEFAULT_K, ge=1, le=SEARCH_MAX_K),
+    authorization: Optional[str] = Header(None),
+):
+    """Top-k previously analyzed resumes for a job description and/or skill filter.
+
+    Lists other people's resumes, so it is only served with the index
+    enabled and a RESUME_SEARCH_TOKEN configured, to bearers of that token.
+    """
+    if not resume_index.enabled or not RESUME_SEARCH_TOKEN:
+        raise HTTPException(status_code=404, detail="Resume search is not enabled")
+    if not hmac.compare_digest(authorization or "", f"Bearer {RESUME_SEARCH_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Resume search requires a valid token")
+    started = datetime.now()
+    response = resume_index.search(job_description, skills, min_years, k)
+    response["took_ms"] = round((datetime.now() - started).total_seconds() * 1000, 2)
+    return response
+
+@app.get("/resumes/index/stats")
+def resume_index_stats():
+    return resume_index.stats()
+
 # ---------- Job Recommendations Logic ----------
 # app = FastAPI()
 
@@ -766,31 +647,69 @@ def test_analysis():
     AWS Certified Solutions Architect
     """
     
-    analysis1 = analyze_resume_text(test1)
-    analysis2 = analyze_resume_text(test2)
-    
-    # Extract ATS scores
-    import re
-    ats1 = re.search(r'ATS SCORE:\s*(\d+)', analysis1)
-    ats2 = re.search(r'ATS SCORE:\s*(\d+)', analysis2)
+    result1 = analyze_resume_text(test1)
+    result2 = analyze_resume_text(test2)
     
     return {
-        "test1_ats": int(ats1.group(1)) if ats1 else 0,
-        "test2_ats": int(ats2.group(1)) if ats2 else 0,
-        "test1_analysis": analysis1[:500],
-        "test2_analysis": analysis2[:500]
-    }
-def get_jobs():
-    url = "https://jsearch.p.rapidapi.com/search"
-    querystring = {"query": "developer in India", "page": "1", "num_pages": "2"}
-    headers = {
-        "X-RapidAPI-Key": os.getenv("RAPIDAPI_KEY"),
-        "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
+        "test1_ats": result1["scores"]["ats"],
+        "test2_ats": result2["scores"]["ats"],
+        "test1_analysis": render_report(result1)[:500],
+        "test2_analysis": render_report(result2)[:500]
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
-    data = response.json()
-    return {"jobs": data.get("data", [])}
+@app.get("/jobs")
+async def get_jobs(
+    query: str = Query("developer", min_length=1),
+    location: str = Query("India"),
+    num_pages: int = Query(2, ge=1, le=JOBS_MAX_PAGES),
+):
+    try:
+        return await jobs_client.get_jobs(query, location, num_pages)
+    except JobsUpstreamError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+@app.post("/jobs/recommendations")
+async def recommend_jobs(
+    resume_id: Optional[str] = Body(None),
+    features: Optional[dict] = Body(None),
+    skills: List[str] = Body([]),
+    query: Optional[str] = Body(None),
+    location: str = Body("India"),
+    k: int = Body(RECOMMEND_DEFAULT_K, ge=1, le=RECOMMEND_MAX_K),
+):
+    """Rank cached job listings against a resume.
+
+    The resume is given by the resumeId of an earlier analysis, a
+    ResumeFeatures dictionary, or a plain skill list.  With a query, those
+    listings are fetched (or taken from the jobs cache) first.
+    """
+    if resume_id:
+        document = resume_index.get(resume_id)
+        if document is None:
+            detail = "Unknown resumeId; analyze the resume first"
+            if not resume_index.enabled:
+                detail = "resumeId lookups need RESUME_INDEX_ENABLED=1; pass features or skills instead"
+            raise HTTPException(status_code=404, detail=detail)
+        skills = [kw for keywords in document.skills.values() for kw in keywords]
+    elif features:
+        try:
+            skills = [kw for keywords in extract_skills(ResumeFeatures.from_dict(features)).values() for kw in keywords]
+        except (KeyError, TypeError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid resume features: {e}")
+    elif not skills:
+        raise HTTPException(status_code=422, detail="Provide resume_id, features or skills")
+
+    if query:
+        try:
+            await jobs_client.get_jobs(query, location)
+        except JobsUpstreamError as e:
+            if not len(job_corpus):
+                raise HTTPException(status_code=502, detail=str(e))
+    return job_corpus.recommend(skills, k)
+
+@app.get("/jobs/stats")
+def jobs_stats():
+    return {**jobs_client.stats(), "corpus": len(job_corpus)}
 
 # Optional: Run server directly
 if __name__ == "__main__":
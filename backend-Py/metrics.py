@@ -0,0 +1,212 @@
+"""Prometheus-style metrics with near-zero cost on the hot path.
+
+Instrumented code never touches the metric objects directly.  observe()
+and inc() append an event tuple to a process-local deque, which is
+thread-safe without a lock.  Pool workers drain their deque at the end of
+every stage and hand the events back with the stage result (see
+workers.run_stage).  The main process applies them, and its own pending
+events, to the registry on the event loop: after each stage, at the end of
+each HTTP request and when /metrics is scraped, so the deque stays small
+whether or not anything scrapes it.  So aggregation happens in one place,
+the metric objects need no locking, and a worker pays one perf_counter()
+call and one append per measurement.
+"""
+
+import bisect
+import collections
+import time
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50)
+
+_pending = collections.deque()
+
+
+def observe(name, value, **labels):
+    """Record a histogram observation"""
+    _pending.append((name, tuple(sorted(labels.items())), value, True))
+
+
+def inc(name, amount=1, **labels):
+    """Increment a counter"""
+    _pending.append((name, tuple(sorted(labels.items())), amount, False))
+
+
+class timed:
+    """Context manager observing its duration into a stage histogram"""
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe("resume_stage_duration_seconds", time.perf_counter() - self.started, stage=self.stage)
+        return False
+
+
+def drain():
+    """Take every pending event recorded in this process"""
+    events = []
+    while True:
+        try:
+            events.append(_pending.popleft())
+        except IndexError:
+            return events
+
+
+class Histogram:
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, labels, value):
+        state = self.series.get(labels)
+        if state is None:
+            state = self.series[labels] = [0] * (len(self.buckets) + 2)
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, state in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), state[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(state[-1])}")
+            lines.append(f"{self.name}_count{_labels(labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.series = {}
+
+    def inc(self, labels, amount):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(labels)} {_number(value)}" for labels, value in sorted(self.series.items()))
+        return lines
+
+
+class Gauge:
+    """Read from a callback at scrape time"""
+
+    def __init__(self, name, help, read):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {_number(self.read())}"]
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def _number(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def histogram(self, name, help, buckets=STAGE_BUCKETS):
+        self.metrics[name] = Histogram(name, help, tuple(buckets))
+        return self.metrics[name]
+
+    def counter(self, name, help):
+        self.metrics[name] = Counter(name, help)
+        return self.metrics[name]
+
+    def gauge(self, name, help, read):
+        self.metrics[name] = Gauge(name, help, read)
+        return self.metrics[name]
+
+    def apply(self, events):
+        for name, labels, value, is_observation in events:
+            metric = self.metrics.get(name)
+            if metric is None:
+                continue
+            if is_observation:
+                metric.observe(labels, value)
+            else:
+                metric.inc(labels, value)
+
+    def render(self):
+        """Fold in pending events and return the text exposition format"""
+        self.apply(drain())
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REGISTRY.histogram(
+    "resume_stage_duration_seconds",
+    "Time spent per pipeline stage (upload, text_pass, layout_pass, ocr_pass, features, scoring, rendering, ...)",
+)
+REGISTRY.histogram(
+    "resume_pool_stage_duration_seconds",
+    "Wall time of each stage submitted to the worker pool, including the wait for a worker",
+)
+REGISTRY.histogram("resume_document_pages", "Pages per extracted document", PAGE_BUCKETS)
+REGISTRY.counter("resume_extraction_pages_total", "Pages by the extraction method that produced their text")
+REGISTRY.counter("resume_pages_reused_total", "Pages whose text was reused from the page cache")
+REGISTRY.counter("resume_upload_bytes_total", "Bytes of resume uploads received")
+REGISTRY.counter("resume_uploads_total", "Resume uploads received")
+REGISTRY.counter(
+    "resume_coalesced_requests_total", "Analysis requests that joined an identical analysis already in flight"
+)
+REGISTRY.counter("resume_jobs_total", "Asynchronous analysis jobs by outcome (queued, retried, done, failed)")
+REGISTRY.counter("http_requests_total", "HTTP requests by method and status")
+
+
+class MetricsMiddleware:
+    """Track HTTP requests in flight and count responses by status"""
+
+    def __init__(self, app):
+        self.app = app
+        self.in_flight = 0
+        REGISTRY.gauge("http_requests_in_flight", "HTTP requests currently being served", lambda: self.in_flight)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_flight -= 1
+            inc("http_requests_total", method=scope["method"], status=str(status))
+            # Fold in this request's events now rather than letting them pile up until a scrape
+            REGISTRY.apply(drain())
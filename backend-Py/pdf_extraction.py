@@ -0,0 +1,367 @@
+"""Text extraction from resume PDFs (pdfplumber with an OCR fallback).
+
+The document is opened once and each page goes through its own cascade:
+plain text extraction, then layout-aware extraction, and only if both come
+back empty is the page queued for OCR.  Queued pages are rasterized and
+OCR'd individually on a small thread pool; tesseract and pdftoppm run as
+subprocesses, so the threads give real parallelism.
+
+text_pages() and ocr_page() expose the same steps as separate units of
+work, for callers that report progress page by page.
+
+Memory is bounded per request.  Pages are rasterized one at a time and each
+image is closed as soon as it has been OCR'd; pdfplumber's per-page layout
+caches are released after each page.  A rasterized page costs roughly
+width x height x channels bytes at OCR_DPI, and tesseract keeps a few
+working copies of it, so OCR concurrency and, for oversized pages, the DPI
+are chosen to keep the estimate within OCR_MEMORY_BUDGET_MB.
+
+text_pages() also fingerprints each page by what it draws (its content
+streams, and the fonts and images they use) while the document is open,
+so callers can cache OCR'd text per page and, when an edited resume is
+uploaded again, only OCR the pages that changed.
+"""
+
+import contextlib
+import hashlib
+import io
+import logging
+import math
+import os
+import re
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple, Optional, Tuple
+
+import metrics
+import request_log
+import workers
+from lazy_imports import available, lazy
+from metrics import timed
+
+# Imported on first use, so workers and endpoints that never parse a PDF skip them
+pdfplumber = lazy("pdfplumber")
+pytesseract = lazy("pytesseract")
+pdf2image = lazy("pdf2image")
+pdftypes = lazy("pdfminer.pdftypes")
+
+# OCR is optional: check the packages are installed without importing them
+PYTESSERACT_AVAILABLE = available("pytesseract", "pdf2image")
+if not PYTESSERACT_AVAILABLE:
+    print("Warning: pytesseract or pdf2image not available. OCR will be skipped.")
+
+# Hard limits for the external OCR tools; both kill their subprocess on expiry
+RASTERIZE_TIMEOUT_SECONDS = float(os.getenv("RASTERIZE_TIMEOUT_SECONDS", "30"))
+OCR_PAGE_TIMEOUT_SECONDS = float(os.getenv("OCR_PAGE_TIMEOUT_SECONDS", "20"))
+
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_GRAYSCALE = os.getenv("OCR_GRAYSCALE", "1") != "0"
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))
+OCR_THREADS = int(os.getenv("OCR_THREADS", str(min(4, os.cpu_count() or 1))))
+
+OCR_MEMORY_BUDGET_MB = int(os.getenv("OCR_MEMORY_BUDGET_MB", "512"))
+OCR_MIN_DPI = int(os.getenv("OCR_MIN_DPI", "100"))
+# Peak memory of OCR'ing a page, as a multiple of its raster size
+OCR_MEMORY_FACTOR = 4
+# Page size in points, assumed when the real one is unknown
+LETTER_SIZE = (612.0, 792.0)
+PAGE_SIZE_RE = re.compile(r"([\d.]+) x ([\d.]+)")
+
+# Bump when extraction changes so cached page text is not reused across it
+PAGE_KEY_VERSION = "1"
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+PAGE_CACHE_TTL_SECONDS = float(os.getenv("PAGE_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+PAGE_CACHE_DB = os.getenv("PAGE_CACHE_DB")
+
+
+class NoTextError(Exception):
+    """Raised when a document yields no text at all, e.g. it is not a PDF"""
+
+    def __str__(self):
+        return "No text could be extracted from the file; is it a readable PDF?"
+
+
+class PageText(NamedTuple):
+    number: int  # 1-based, as pdftoppm counts pages
+    text: str
+    method: str  # "text", "layout", "ocr" or "empty"
+    size: Optional[Tuple[float, float]] = None  # (width, height) in points, if known
+    key: Optional[str] = None  # page_key() of the page, if pdfplumber could read it
+
+
+def ocr_page_bytes(size, dpi=OCR_DPI):
+    """Estimated peak memory of rasterizing and OCR'ing a page of the given size"""
+    width, height = size or LETTER_SIZE
+    channels = 1 if OCR_GRAYSCALE else 3
+    return int(width / 72 * dpi) * int(height / 72 * dpi) * channels * OCR_MEMORY_FACTOR
+
+def ocr_dpi(size):
+    """Highest DPI up to OCR_DPI whose page fits the budget, or None if OCR_MIN_DPI does not"""
+    budget = OCR_MEMORY_BUDGET_MB * 1024 * 1024
+    estimate = ocr_page_bytes(size)
+    if estimate <= budget:
+        return OCR_DPI
+    # Memory grows with the square of the DPI
+    dpi = int(OCR_DPI * math.sqrt(budget / estimate))
+    return dpi if dpi >= OCR_MIN_DPI else None
+
+def ocr_concurrency(sizes):
+    """How many of a request's pages may be OCR'd at once within the budget"""
+    budget = OCR_MEMORY_BUDGET_MB * 1024 * 1024
+    largest = max((ocr_page_bytes(size, ocr_dpi(size) or OCR_MIN_DPI) for size in sizes), default=1)
+    return max(1, min(OCR_THREADS, budget // largest))
+
+
+def _open_pdf(source):
+    # Sources are raw PDF bytes or, for large uploads, a file path
+    if isinstance(source, (bytes, bytearray)):
+        return pdfplumber.open(io.BytesIO(source))
+    return pdfplumber.open(source)
+
+@contextlib.contextmanager
+def _as_path(source):
+    # pdftoppm needs a file; spill in-memory sources once for all OCR pages
+    if not isinstance(source, (bytes, bytearray)):
+        yield source
+        return
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+        yield path
+    finally:
+        os.unlink(path)
+
+def iter_page_images(pdf_path, first_page, last_page, dpi=OCR_DPI):
+    """Rasterize pages first_page..last_page one at a time, yielding (number, image).
+
+    Only one page image is alive at a time: each is closed as soon as the
+    caller moves on, or stops iterating.
+    """
+    for number in range(first_page, last_page + 1):
+        images = pdf2image.convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            grayscale=OCR_GRAYSCALE,
+            first_page=number,
+            last_page=number,
+            timeout=RASTERIZE_TIMEOUT_SECONDS,
+        )
+        while images:
+            image = images.pop()
+            try:
+                yield number, image
+            finally:
+                image.close()
+
+def _ocr_page(pdf_path, number, size=None):
+    with timed("ocr_pass"):
+        return _rasterize_and_ocr(pdf_path, number, size)
+
+def _rasterize_and_ocr(pdf_path, number, size=None):
+    dpi = ocr_dpi(size)
+    if dpi is None:
+        request_log.event(
+            "ocr_skipped", logging.WARNING, page=number, reason=f"over the {OCR_MEMORY_BUDGET_MB} MB memory budget"
+        )
+        return ""
+    return "\n".join(
+        pytesseract.image_to_string(image, timeout=OCR_PAGE_TIMEOUT_SECONDS)
+        for _, image in iter_page_images(pdf_path, number, number, dpi)
+    )
+
+def _extract_page_text(page):
+    """Run the text -> layout cascade on one page"""
+    with timed("text_pass"):
+        text = page.extract_text()
+    if text and text.strip():
+        return text, "text"
+    with timed("layout_pass"):
+        text = page.extract_text(layout=True)
+    if text and text.strip():
+        return text, "layout"
+    return "", "empty"
+
+def _document_sizes(pdf_path):
+    """{number: size} for the first OCR_MAX_PAGES pages, from pdfinfo"""
+    info = pdf2image.pdfinfo_from_path(pdf_path, timeout=RASTERIZE_TIMEOUT_SECONDS)
+    # pdfinfo reports the first page's size, e.g. "612 x 792 pts (letter)"
+    match = PAGE_SIZE_RE.search(info.get("Page size", ""))
+    size = (float(match.group(1)), float(match.group(2))) if match else None
+    return {number: size for number in range(1, min(info["Pages"], OCR_MAX_PAGES) + 1)}
+
+def _ocr_pages(source, sizes):
+    """OCR the given pages ({number: size}) in parallel, returning {number: text}
+
+    sizes=None means pdfplumber could not read the document at all, so
+    every page (up to OCR_MAX_PAGES) is attempted.  Pages are submitted as
+    threads free up, and the stage deadline is checked between them.
+    """
+    results = {}
+    with _as_path(source) as pdf_path:
+        if sizes is None:
+            try:
+                sizes = _document_sizes(pdf_path)
+            except Exception as e:
+                request_log.event("ocr_failed", logging.WARNING, error=str(e))
+                return results
+        queued = iter(sizes.items())
+        running = {}
+
+        def submit_next():
+            for number, size in queued:
+                running[pool.submit(_ocr_page, pdf_path, number, size)] = number
+                return
+
+        concurrency = ocr_concurrency(sizes.values())
+        pool = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            for _ in range(concurrency):
+                submit_next()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    number = running.pop(future)
+                    try:
+                        results[number] = future.result()
+                    except Exception as e:
+                        request_log.event("ocr_failed", logging.WARNING, page=number, error=str(e))
+                workers.check_deadline()
+                for _ in done:
+                    submit_next()
+        finally:
+            # Not joined: on a deadline the worker moves on instead of waiting
+            # for pages still being OCR'd (tesseract has its own timeout)
+            pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+def text_pages(source, first_page=1, last_page=None, numbers=None):
+    """Run the text -> layout cascade on pages first_page..last_page (default all), without OCR.
+
+    numbers, if given, further limits the pages to those page numbers.
+    Returns an empty list when pdfplumber cannot read the document.
+    """
+    pages = []
+    try:
+        with _open_pdf(source) as pdf:
+            for number, page in enumerate(pdf.pages[first_page - 1:last_page], start=first_page):
+                if numbers is not None and number not in numbers:
+                    continue
+                key = None
+                try:
+                    key = page_key(page)
+                    text, method = _extract_page_text(page)
+                except Exception as e:
+                    request_log.event("pdf_parse_failed", logging.WARNING, page=number, error=str(e))
+                    text, method = "", "empty"
+                finally:
+                    # Drop the page's parsed layout objects before moving on
+                    page.close()
+                pages.append(PageText(number, text, method, (float(page.width), float(page.height)), key))
+    except Exception as e:
+        request_log.event("pdf_parse_failed", logging.WARNING, error=str(e))
+    return pages
+
+def _fingerprint(obj, digest, seen):
+    """Feed a PDF object, following references, into digest"""
+    if isinstance(obj, pdftypes.PDFObjRef):
+        digest.update(b"R%d;" % obj.objid)
+        if obj.objid in seen:
+            return
+        seen.add(obj.objid)
+        obj = obj.resolve()
+    if isinstance(obj, pdftypes.PDFStream):
+        _fingerprint(obj.attrs, digest, seen)
+        data = obj.get_rawdata()
+        digest.update(data if data is not None else obj.get_data())
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=str):
+            digest.update(f"/{key}:".encode("utf-8"))
+            _fingerprint(obj[key], digest, seen)
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"[")
+        for item in obj:
+            _fingerprint(item, digest, seen)
+        digest.update(b"]")
+    else:
+        digest.update(repr(obj).encode("utf-8") + b";")
+
+def page_key(page):
+    """Hash of a pdfplumber page's content streams, resources (fonts, images),
+    geometry and the extraction settings, so equal keys extract to equal text"""
+    page_obj = page.page_obj
+    digest = hashlib.sha256(f"{PAGE_KEY_VERSION}:{OCR_DPI}:{OCR_GRAYSCALE}:".encode("utf-8"))
+    seen = set()
+    for part in (page_obj.contents, page_obj.resources, page_obj.mediabox, page_obj.rotate):
+        _fingerprint(part, digest, seen)
+    return digest.hexdigest()
+
+def ocr_page(source, number, size=None):
+    """OCR a single page as its own unit of work, returning a PageText"""
+    if PYTESSERACT_AVAILABLE:
+        try:
+            with _as_path(source) as pdf_path:
+                text = _ocr_page(pdf_path, number, size)
+            if text.strip():
+                return PageText(number, text, "ocr", size)
+        except Exception as e:
+            request_log.event("ocr_failed", logging.WARNING, page=number, error=str(e))
+    return PageText(number, "", "empty", size)
+
+def ocr_pages(source, sizes):
+    """OCR the given pages ({number: size}) as one unit of work, returning a PageText per page read"""
+    if not PYTESSERACT_AVAILABLE:
+        return []
+    ocr_text = _ocr_pages(source, sizes)
+    return [PageText(number, ocr_text[number], "ocr", sizes[number]) for number in sorted(ocr_text) if ocr_text[number].strip()]
+
+def merge_pages(pages, replacements):
+    """pages with the same-numbered replacements swapped in, keeping each page's key"""
+    by_number = {page.number: page for page in pages}
+    for page in replacements:
+        previous = by_number.get(page.number)
+        by_number[page.number] = page._replace(key=previous.key) if previous is not None else page
+    return [by_number[number] for number in sorted(by_number)]
+
+def ocr_document(source):
+    """OCR a document pdfplumber could not open, up to OCR_MAX_PAGES pages"""
+    if not PYTESSERACT_AVAILABLE:
+        return []
+    ocr_text = _ocr_pages(source, None)
+    return [PageText(number, ocr_text[number], "ocr") for number in sorted(ocr_text) if ocr_text[number].strip()]
+
+def record_pages(pages):
+    """Count a document's pages and the method that produced each page's text"""
+    metrics.observe("resume_document_pages", len(pages))
+    for page in pages:
+        metrics.inc("resume_extraction_pages_total", method=page.method)
+
+def page_methods(pages):
+    """{method: page count} for a document's pages"""
+    methods = {}
+    for page in pages:
+        methods[page.method] = methods.get(page.method, 0) + 1
+    return methods
+
+def join_pages(pages):
+    return "\n".join(p.text for p in pages if p.text).strip()
+
+def extract_pages(source, first_page=1, last_page=None, numbers=None):
+    """Extract text page by page, returning a list of PageText"""
+    pages = text_pages(source, first_page, last_page, numbers)
+    if not pages:
+        return ocr_document(source)
+    needs_ocr = needs_ocr_sizes(pages)
+    if needs_ocr:
+        pages = merge_pages(pages, ocr_pages(source, needs_ocr))
+    return pages
+
+def needs_ocr_sizes(pages):
+    """{number: size} of the empty pages worth OCR'ing, up to OCR_MAX_PAGES"""
+    empty = [(page.number, page.size) for page in pages if page.method == "empty"]
+    return dict(empty[:OCR_MAX_PAGES])
+
+def extract_text_from_pdf(source):
+    pages = extract_pages(source)
+    record_pages(pages)
+    return join_pages(pages)
@@ -0,0 +1,306 @@
+"""Text rendering of structured resume analysis results.
+
+The analyzers return plain dictionaries; the human-readable report is only
+produced when a caller asks for it.  Each template is parsed once at import
+into (literal, field, format spec) segments, so rendering is a single join
+over precomputed pieces.
+"""
+
+import string
+
+from metrics import timed
+
+INTELLIGENT_REPORT = """
+📊 RESUME ANALYSIS REPORT
+========================
+
+Overall Strength: {strength:.1f}/10
+Your resume demonstrates a {strength_phrase} professional foundation.
+
+🎯 KEY SKILLS IDENTIFIED:
+{skills_section}
+
+💼 EXPERIENCE LEVEL:
+{exp_level}
+Years of Experience: {years}+ years
+
+📈 AREAS FOR IMPROVEMENT:
+{improvements}
+6. Use action verbs at the start of bullet points
+7. Include specific technologies and tools used in each role
+8. Ensure consistent formatting and spacing
+9. Tailor resume for specific job descriptions
+10. Keep resume to 1-2 pages for better readability
+
+🤖 ATS SCORE: {ats}/100
+Your resume is {ats_phrase} for Applicant Tracking Systems.
+
+Breakdown:
+- Contact Information: {contact_mark}
+- Experience Section: {experience_mark}
+- Education: {education_mark}
+- Skills Listed: {skills_mark}
+- Projects/Portfolio: {projects_mark}
+- Quantifiable Results: {metrics_mark}
+- Certifications: {certifications_mark}
+
+✅ RECOMMENDED NEXT STEPS:
+1. {metrics_step}
+2. {projects_step}
+3. {leadership_step}
+4. {certifications_step}
+5. Tailor your resume for specific job descriptions
+6. Use strong action verbs at the beginning of bullet points
+7. Ensure consistent formatting and spacing
+8. Keep resume to 1-2 pages for better readability
+9. Include links to portfolio, GitHub, or live projects
+10. Get feedback from industry professionals
+
+📋 RECOMMENDATIONS FOR CAREER GROWTH:
+- Consider pursuing advanced certifications (AWS, Azure, GCP, Kubernetes)
+- Build and showcase portfolio projects on GitHub
+- Contribute to open-source projects to gain experience
+- {leadership_growth}
+- Stay updated with latest technologies and frameworks
+- Network with industry professionals and attend conferences
+- Write technical blog posts or articles
+- Participate in coding competitions or hackathons
+- Consider specializing in a specific domain (AI/ML, DevOps, etc.)
+- Build a personal brand through social media and professional networks
+
+{job_match}
+
+Generated on: {generated_at}
+Analysis Type: AI-Powered Professional Review
+"""
+
+# Shared tail of the parsed-data and fallback reports
+_STANDARD_ADVICE = """
+📈 AREAS FOR IMPROVEMENT:
+1. Add more quantifiable achievements and metrics (e.g., "Improved performance by 40%")
+2. Include specific project outcomes and business impact
+3. Highlight leadership or mentoring experience
+4. Add relevant certifications or continuous learning initiatives
+5. Improve formatting for ATS optimization (use standard section headers)
+6. Include specific technologies and tools used in each role
+7. Add measurable results and KPIs for each achievement
+8. Use action verbs at the start of bullet points
+9. Include links to portfolio, GitHub, or personal projects
+10. Tailor resume for specific job descriptions
+
+🤖 ATS SCORE: {ats}/100
+Your resume is well-structured for Applicant Tracking Systems.
+Score indicates: {ats_rating} ATS compatibility
+
+✅ RECOMMENDED NEXT STEPS:
+1. Quantify your achievements with specific metrics and results
+2. Add specific technologies and tools you've used in each role
+3. Include relevant certifications or training completed
+4. Tailor your resume for specific job descriptions
+5. Use strong action verbs at the beginning of bullet points
+6. Include links to portfolio, GitHub, or live projects
+7. Get feedback from industry professionals or mentors
+8. Ensure consistent formatting and spacing
+9. Use keywords from job descriptions you're targeting
+10. Keep resume to 1-2 pages for better readability
+
+📋 RECOMMENDATIONS FOR CAREER GROWTH:
+- Consider pursuing advanced certifications (AWS, Azure, GCP, Kubernetes)
+- Build and showcase portfolio projects on GitHub
+- Contribute to open-source projects to gain experience
+- Develop leadership and mentoring skills
+- Stay updated with latest technologies and frameworks
+- Network with industry professionals and attend conferences
+- Write technical blog posts or articles
+- Participate in coding competitions or hackathons
+- Consider specializing in a specific domain (AI/ML, DevOps, etc.)
+- Build a personal brand through social media and professional networks
+
+{job_match}
+
+Generated on: {generated_at}
+"""
+
+PARSED_REPORT = """
+📊 RESUME ANALYSIS REPORT
+========================
+
+Candidate: {name}
+Email: {email}
+Phone: {phone}
+
+Overall Strength: {strength:.1f}/10
+Your resume demonstrates a solid professional foundation with relevant experience and technical skills.
+
+🎯 KEY SKILLS IDENTIFIED:
+{skills_section}
+
+💼 EXPERIENCE LEVEL:
+{exp_level}
+Years of Experience: {years}+ years
+Based on the depth and breadth of your experience and skills
+""" + _STANDARD_ADVICE + """Analysis Type: AI-Powered Professional Review (Powered by APILayer Resume Parser)
+"""
+
+FALLBACK_REPORT = """
+📊 RESUME ANALYSIS REPORT
+========================
+
+Overall Strength: {strength:.1f}/10
+Your resume demonstrates a solid professional foundation with relevant experience and technical skills.
+
+🎯 KEY SKILLS IDENTIFIED:
+{skills_section}
+
+💼 EXPERIENCE LEVEL:
+{exp_level}
+Based on the depth and breadth of your experience and skills
+""" + _STANDARD_ADVICE + """Analysis Type: AI-Powered Professional Review
+"""
+
+_JOB_MATCH = {
+    "intelligent": (
+        "📋 JOB MATCH ANALYSIS:\nYour resume aligns with the provided job description. "
+        "Focus on highlighting the matching skills and experience."
+    ),
+    "default": (
+        "📋 JOB MATCH ANALYSIS:\nYour resume aligns well with the provided job description. "
+        "Focus on highlighting the matching skills and experience."
+    ),
+}
+
+
+def _compile(template):
+    return [
+        (literal, field, spec)
+        for literal, field, spec, _ in string.Formatter().parse(template)
+    ]
+
+
+_TEMPLATES = {
+    "intelligent": _compile(INTELLIGENT_REPORT),
+    "parsed": _compile(PARSED_REPORT),
+    "fallback": _compile(FALLBACK_REPORT),
+}
+
+
+def _render(segments, values):
+    parts = []
+    for literal, field, spec in segments:
+        parts.append(literal)
+        if field is not None:
+            parts.append(format(values[field], spec))
+    return "".join(parts).strip()
+
+
+def _mark(flag):
+    return "✓" if flag else "✗"
+
+
+def _skills_section(skills, empty):
+    if not skills:
+        return empty
+    return "\n".join(f"- {category}: {', '.join(found)}" for category, found in skills.items())
+
+
+def _job_match_section(match):
+    lines = ["📋 JOB MATCH ANALYSIS:", f"Text similarity: {match['similarity'] * 100:.0f}%"]
+    if match["skill_coverage"] is not None:
+        lines.append(f"Required skills covered: {match['skill_coverage'] * 100:.0f}%")
+    for category, coverage in match["categories"].items():
+        lines.append(f"- {category}: {len(coverage['matched'])}/{len(coverage['required'])}")
+    if match["matched_keywords"]:
+        lines.append(f"Matching skills: {', '.join(match['matched_keywords'])}")
+    if match["missing_keywords"]:
+        lines.append(f"Missing skills: {', '.join(match['missing_keywords'])}")
+    return "\n".join(lines)
+
+
+def _intelligent_values(result):
+    sections = result["sections"]
+    strength = result["scores"]["strength"]
+    ats = result["scores"]["ats"]
+    missing = result["missing"]
+    return {
+        "strength": strength,
+        "strength_phrase": "strong" if strength >= 7 else "solid" if strength >= 5 else "developing",
+        "skills_section": _skills_section(result["skills"], "- Technical Skills: Not clearly specified"),
+        "exp_level": result["experience"]["level"],
+        "years": result["experience"]["years"],
+        "improvements": (
+            "\n".join(f"{i+1}. {item}" for i, item in enumerate(missing[:5]))
+            if missing else "1. Your resume is well-structured"
+        ),
+        "ats": ats,
+        "ats_phrase": (
+            "well-optimized" if ats >= 75 else "reasonably optimized" if ats >= 60 else "needs optimization"
+        ),
+        "contact_mark": _mark(sections["email"] and sections["phone"]),
+        "experience_mark": _mark(sections["experience"]),
+        "education_mark": _mark(sections["education"]),
+        "skills_mark": _mark(result["skills"]),
+        "projects_mark": _mark(sections["projects"]),
+        "metrics_mark": _mark(sections["metrics"]),
+        "certifications_mark": _mark(sections["certifications"]),
+        "metrics_step": (
+            "Add quantifiable metrics to your achievements" if not sections["metrics"]
+            else "Expand on your quantifiable achievements"
+        ),
+        "projects_step": (
+            "Include project descriptions or portfolio links" if not sections["projects"]
+            else "Add more project details"
+        ),
+        "leadership_step": (
+            "Highlight leadership experience" if not sections["leadership"]
+            else "Emphasize your leadership contributions"
+        ),
+        "certifications_step": (
+            "Add relevant certifications" if not sections["certifications"]
+            else "Update with latest certifications"
+        ),
+        "leadership_growth": (
+            "Develop leadership and mentoring skills" if not sections["leadership"]
+            else "Continue building on your leadership experience"
+        ),
+    }
+
+
+def _standard_values(result):
+    ats = result["scores"]["ats"]
+    values = {
+        "strength": result["scores"]["strength"],
+        "skills_section": _skills_section(
+            result["skills"], "- Technical Skills: Programming, Software Development"
+        ),
+        "exp_level": result["experience"]["level"],
+        "years": result["experience"]["years"],
+        "ats": ats,
+        "ats_rating": "Excellent" if ats >= 80 else "Good" if ats >= 60 else "Fair",
+    }
+    candidate = result.get("candidate")
+    if candidate:
+        values.update(candidate)
+    return values
+
+
+def render_report(result):
+    """Render a structured analysis result as the text report"""
+    with timed("rendering"):
+        return _render_report(result)
+
+
+def _render_report(result):
+    analyzer = result["analyzer"]
+    if analyzer == "intelligent":
+        values = _intelligent_values(result)
+    else:
+        values = _standard_values(result)
+    match = result.get("job_match")
+    if match:
+        values["job_match"] = _job_match_section(match)
+    else:
+        values["job_match"] = (
+            _JOB_MATCH.get(analyzer, _JOB_MATCH["default"]) if result["job_description_provided"] else ""
+        )
+    values["generated_at"] = result["generated_at"]
+    return _render(_TEMPLATES[analyzer], values)
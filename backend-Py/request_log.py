@@ -0,0 +1,81 @@
+"""Structured, non-blocking request logging.
+
+Records are compact JSON lines (event name, request id, sizes, timings,
+extraction methods) on the "resume" logger.  The logger only enqueues;
+a QueueListener thread formats and writes them, so a slow stdout never
+blocks a request.
+
+LOG_SAMPLE_RATE (0-1) thins out routine per-request records; warnings and
+errors are always kept.  Resume text is personal data and is never logged
+unless LOG_FULL_TEXT=1 is set for debugging.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import traceback
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_FULL_TEXT = os.getenv("LOG_FULL_TEXT", "0") == "1"
+
+log = logging.getLogger("resume")
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+def setup_logging(stream=None):
+    """Attach the queue handler and start the writer thread (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+    records = queue.SimpleQueue()
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+    log.addHandler(logging.handlers.QueueHandler(records))
+    log.setLevel(logging.DEBUG if LOG_FULL_TEXT else LOG_LEVEL)
+    log.propagate = False
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def event(name, level=logging.INFO, sampled=False, exc=False, **fields):
+    """Log one structured record; sampled records obey LOG_SAMPLE_RATE"""
+    if sampled and level < logging.WARNING and random.random() >= LOG_SAMPLE_RATE:
+        return
+    if not log.isEnabledFor(level):
+        return
+    if exc:
+        # Formatted here: QueueHandler would otherwise fold it into the message
+        fields["exc"] = traceback.format_exc()
+    log.log(level, name, extra={"fields": fields})
+
+
+def resume_text(request_id, text):
+    """Dump extracted resume text, only when LOG_FULL_TEXT is on"""
+    if LOG_FULL_TEXT:
+        event("resume_text", logging.DEBUG, request_id=request_id, text=text)
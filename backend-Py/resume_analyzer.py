@@ -0,0 +1,275 @@
+"""Deterministic resume analysis: section detection, skill extraction and scoring.
+
+Analyzers return structured result dictionaries (scores, skills per
+category, detected sections, missing elements, experience level).  Their
+scores come from the rule tables in scoring.py.
+analyze_resume_text() adds a job_match block when a job description is
+given; use report_templates.render_report() for the text report.
+"""
+
+import logging
+from datetime import datetime
+
+import request_log
+from job_matching import match_job_description
+from metrics import timed
+from resume_features import extract_features
+from scoring import SCORERS, feature_vector, score
+
+
+def analyze_resume_text(resume_text, job_description=None, features=None, vector=None, skills=None):
+    if features is None:
+        features = extract_features(resume_text)
+    with timed("scoring"):
+        try:
+            # Use our own intelligent analysis instead of relying on Gemini
+            result = generate_intelligent_analysis(resume_text, job_description, features)
+        except Exception as e:
+            request_log.event("analysis_failed", logging.WARNING, exc=True, analyzer="intelligent", error=str(e))
+            # Fallback: Generate intelligent analysis based on resume content
+            result = generate_fallback_analysis(resume_text, job_description, features)
+    with timed("job_match"):
+        result['job_match'] = match_job_description(resume_text, job_description, features, vector, skills)
+    return result
+
+def generate_intelligent_analysis(resume_text, job_description=None, features=None):
+    """Generate detailed, personalized resume analysis based on actual content"""
+    
+    if features is None:
+        features = extract_features(resume_text)
+    
+    emails = features.emails
+    phones = features.phones
+    years = features.years
+    has_experience = features.has_experience
+    has_education = features.has_education
+    has_projects = features.has_projects
+    has_certifications = features.has_certifications
+    has_leadership = features.has_leadership
+    has_metrics = features.has_metrics
+    skills_dict = features.skills
+    
+    scores = score('intelligent', features)
+    ats_score = scores['ats']
+    strength_score = scores['strength']
+    
+    # Determine experience level
+    if years >= 10 and strength_score >= 7:
+        exp_level = "Senior Level Developer / Tech Lead"
+    elif years >= 5 and strength_score >= 5:
+        exp_level = "Mid-Level Developer"
+    elif years >= 2:
+        exp_level = "Junior to Mid-Level Developer"
+    elif years > 0:
+        exp_level = "Junior Developer"
+    else:
+        exp_level = "Entry-Level Developer"
+    
+    return {
+        'analyzer': 'intelligent',
+        'scores': {'ats': ats_score, 'strength': strength_score},
+        'experience': {'level': exp_level, 'years': years},
+        'skills': skills_dict,
+        'sections': {
+            'email': bool(emails),
+            'phone': bool(phones),
+            'experience': has_experience,
+            'education': has_education,
+            'projects': has_projects,
+            'certifications': has_certifications,
+            'leadership': has_leadership,
+            'metrics': has_metrics,
+        },
+        'missing': missing_elements(features),
+        'job_description_provided': bool(job_description),
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+def missing_elements(features):
+    """List the resume elements worth adding, most impactful first"""
+    missing = []
+    if not features.has_metrics: missing.append("Quantifiable achievements and metrics")
+    if not features.has_projects: missing.append("Project descriptions or portfolio links")
+    if not features.has_certifications: missing.append("Relevant certifications")
+    if not features.has_leadership: missing.append("Leadership or mentoring experience")
+    if len(features.skills) < 2: missing.append("Diverse technical skills")
+    if not features.emails: missing.append("Contact email")
+    if not features.phones: missing.append("Phone number")
+    return missing
+
+def calculate_ats_score(features):
+    """Calculate realistic ATS score based on resume content"""
+    return SCORERS['intelligent']['ats'].score(feature_vector(features))
+
+def calculate_strength_score(features):
+    """Calculate overall profile strength"""
+    return SCORERS['intelligent']['strength'].score(feature_vector(features))
+
+def analyze_with_apilayer(resume_text, job_description=None, api_key=None):
+    """Analyze resume using apilayer Resume Parser API"""
+    try:
+        # Since apilayer requires a URL, we'll use the extracted text directly
+        # and create a comprehensive analysis based on the parsed content
+        
+        # Extract key information from the resume text
+        features = extract_features(resume_text)
+        
+        # Generate analysis based on parsed data
+        analysis = generate_analysis_from_parsed_data(features, job_description)
+        return analysis
+    except Exception as e:
+        request_log.event("analysis_failed", logging.WARNING, exc=True, analyzer="parsed", error=str(e))
+        return generate_fallback_analysis(resume_text, job_description)
+
+def parse_resume_content(resume_text):
+    """Parse resume content to extract structured data"""
+    return parsed_data_from_features(extract_features(resume_text))
+
+def parsed_data_from_features(features):
+    """Shape a ResumeFeatures record as the parsed-resume dictionary"""
+    parsed = {
+        'name': features.name,
+        'email': extract_email(features),
+        'phone': extract_phone(features),
+        'skills': extract_skills(features),
+        'experience': extract_experience(features),
+        'education': extract_education(features),
+        'certifications': extract_certifications(features),
+        'projects': extract_projects(features),
+        'years_of_experience': features.years,
+    }
+    return parsed
+
+def extract_email(features):
+    """Extract email from resume"""
+    return features.emails[0] if features.emails else "Not provided"
+
+def extract_phone(features):
+    """Extract phone number from resume"""
+    return features.phones[0] if features.phones else "Not provided"
+
+def extract_skills(features):
+    """Extract skills from resume"""
+    return features.skills_for('parser_skills')
+
+def extract_experience(features):
+    """Extract work experience from resume"""
+    return {
+        'has_experience': features.keywords.any('parser_experience'),
+        'years': features.years
+    }
+
+def extract_education(features):
+    """Extract education from resume"""
+    return features.keywords.get('education', [])
+
+def extract_certifications(features):
+    """Extract certifications from resume"""
+    return features.keywords.get('parser_certifications', [])
+
+def extract_projects(features):
+    """Extract projects from resume"""
+    return features.keywords.any('projects')
+
+def generate_analysis_from_parsed_data(features, job_description=None):
+    """Generate detailed analysis based on parsed resume data"""
+    
+    parsed_data = parsed_data_from_features(features)
+    skills = parsed_data.get('skills', {})
+    experience = parsed_data.get('experience', {})
+    education = parsed_data.get('education', [])
+    certifications = parsed_data.get('certifications', [])
+    projects = parsed_data.get('projects', False)
+    years = parsed_data.get('years_of_experience', 0)
+    
+    scores = score('parsed', features)
+    ats_score = scores['ats']
+    strength_score = scores['strength']
+    
+    # Determine experience level
+    if years >= 10 and strength_score >= 7:
+        exp_level = "Senior Level Developer / Tech Lead"
+    elif years >= 5 and strength_score >= 5:
+        exp_level = "Mid-Level Developer"
+    elif years >= 2:
+        exp_level = "Junior to Mid-Level Developer"
+    elif years > 0:
+        exp_level = "Junior Developer"
+    else:
+        exp_level = "Entry-Level Developer"
+    
+    return {
+        'analyzer': 'parsed',
+        'candidate': {
+            'name': parsed_data.get('name', 'Candidate'),
+            'email': parsed_data.get('email', 'Not provided'),
+            'phone': parsed_data.get('phone', 'Not provided'),
+        },
+        'scores': {'ats': ats_score, 'strength': strength_score},
+        'experience': {'level': exp_level, 'years': years},
+        'skills': skills,
+        'sections': {
+            'email': bool(features.emails),
+            'phone': bool(features.phones),
+            'experience': bool(experience.get('has_experience')),
+            'education': bool(education),
+            'projects': bool(projects),
+            'certifications': bool(certifications),
+        },
+        'missing': missing_elements(features),
+        'job_description_provided': bool(job_description),
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+def generate_fallback_analysis(resume_text, job_description=None, features=None):
+    """Generate professional resume analysis without API calls"""
+    
+    # Extract basic info from resume
+    if features is None:
+        features = extract_features(resume_text)
+    matches = features.keywords
+    has_experience = matches.any('experience')
+    has_skills = matches.any('fallback_skill_terms')
+    has_education = matches.any('fallback_education')
+    has_projects = matches.any('fallback_projects')
+    has_certifications = matches.any('fallback_certifications')
+    has_leadership = matches.any('fallback_leadership')
+    has_metrics = matches.any('fallback_metrics')
+    
+    # Extract skills mentioned
+    skills = features.skills_for('fallback_skills')
+    
+    scores = score('fallback', features)
+    ats_score = scores['ats']
+    strength_score = scores['strength']
+    
+    # Determine experience level
+    if has_leadership and strength_score >= 7:
+        exp_level = "Senior Level Developer / Tech Lead"
+    elif has_experience and strength_score >= 5:
+        exp_level = "Mid-Level Developer"
+    elif has_experience:
+        exp_level = "Junior to Mid-Level Developer"
+    else:
+        exp_level = "Entry-Level Developer"
+    
+    return {
+        'analyzer': 'fallback',
+        'scores': {'ats': ats_score, 'strength': strength_score},
+        'experience': {'level': exp_level, 'years': features.years},
+        'skills': skills,
+        'sections': {
+            'email': bool(features.emails),
+            'phone': bool(features.phones),
+            'experience': has_experience,
+            'skills': has_skills,
+            'education': has_education,
+            'projects': has_projects,
+            'certifications': has_certifications,
+            'leadership': has_leadership,
+            'metrics': has_metrics,
+        },
+        'missing': missing_elements(features),
+        'job_description_provided': bool(job_description),
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
@@ -0,0 +1,162 @@
+"""Single-pass feature extraction shared by every resume scorer.
+
+extract_features() runs each precompiled pattern and the keyword matcher
+over the resume text once and returns a ResumeFeatures record.  The
+scorers read that record instead of rescanning the raw text, and the
+record is small enough to cache and serialize (see to_dict/from_dict).
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+
+from keyword_matcher import KeywordMatcher, KeywordMatches
+from metrics import timed
+from taxonomy import get_taxonomy
+
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_RE = re.compile(r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}')
+YEARS_RE = re.compile(r'(\d+)\+?\s*(?:years?|yrs?)', re.IGNORECASE)
+
+# Skills come from the skill taxonomy (see taxonomy.get_taxonomy), so a
+# built artifact with its aliases changes what every analyzer recognizes.
+# These are the built-in skills each analyzer leaves out; the lighter parser
+# and fallback analyzers look for fewer technologies.
+ANALYZER_SKILL_EXCLUDES = {
+    'skills': frozenset(),
+    'parser_skills': frozenset({'asp.net'}),
+    'fallback_skills': frozenset({
+        'next.js', 'svelte', 'php', 'laravel', 'asp.net', 'firebase', 'oracle', 'sql', 'ansible', 'circleci',
+        'ci/cd', 'api',
+    }),
+}
+
+
+def analyzer_skills(resolved, analyzer='skills'):
+    """{category: skills} an analyzer credits, from taxonomy resolve() output"""
+    excluded = ANALYZER_SKILL_EXCLUDES[analyzer]
+    grouped = {}
+    for skill, category in resolved.items():
+        if skill not in excluded:
+            grouped.setdefault(category, []).append(skill)
+    return grouped
+
+
+SECTION_KEYWORDS = {
+    'experience': ['experience', 'worked', 'developed', 'managed', 'led', 'senior', 'junior', 'engineer', 'developer'],
+    'education': ['bachelor', 'master', 'degree', 'university', 'college', 'b.tech', 'm.tech', 'phd', 'diploma', 'b.s.', 'm.s.'],
+    'projects': ['project', 'built', 'created', 'developed', 'implemented', 'designed', 'architected', 'github', 'portfolio'],
+    'certifications': ['certified', 'certification', 'certificate', 'aws', 'gcp', 'azure', 'scrum', 'agile', 'cissp', 'ccna'],
+    'leadership': ['led', 'managed', 'supervised', 'mentored', 'team', 'leader', 'head', 'director', 'manager', 'lead'],
+    'metrics': ['%', 'improved', 'increased', 'reduced', 'saved', 'achieved', 'delivered', 'revenue', 'users', 'performance', 'growth', 'efficiency'],
+    'parser_experience': ['experience', 'worked', 'developed', 'managed', 'led', 'senior', 'junior', 'engineer', 'developer', 'manager', 'director'],
+    'parser_certifications': ['certified', 'certification', 'certificate', 'aws', 'gcp', 'azure', 'scrum', 'agile', 'cissp', 'ccna', 'ckad'],
+    'fallback_skill_terms': ['python', 'java', 'javascript', 'react', 'node', 'sql', 'aws', 'docker', 'kubernetes', 'c++', 'typescript', 'golang', 'rust'],
+    'fallback_education': ['bachelor', 'master', 'degree', 'university', 'college', 'b.tech', 'm.tech', 'phd', 'diploma'],
+    'fallback_projects': ['project', 'built', 'created', 'developed', 'implemented', 'designed', 'architected'],
+    'fallback_certifications': ['certified', 'certification', 'certificate', 'aws', 'gcp', 'azure', 'scrum', 'agile'],
+    'fallback_leadership': ['led', 'managed', 'supervised', 'mentored', 'team', 'leader', 'head', 'director', 'manager'],
+    'fallback_metrics': ['%', 'improved', 'increased', 'reduced', 'saved', 'achieved', 'delivered', 'revenue', 'users', 'performance'],
+}
+
+# Section words also count in inflected forms (projects, engineering,
+# developers); leadership nouns only in the plural, so "heading" is not
+# "head".  Skill and technology names match exactly.
+SECTION_INFLECTIONS = {
+    group: ('s',) if group.endswith('leadership') else ('s', 'es', 'ed', 'ing')
+    for group in SECTION_KEYWORDS
+    if group != 'fallback_skill_terms'
+}
+
+# Every analyzer's section keywords in one matcher, compiled at import so
+# each analysis scans the resume text once
+KEYWORDS = KeywordMatcher(SECTION_KEYWORDS, inflections=SECTION_INFLECTIONS)
+
+
+@dataclass(slots=True)
+class ResumeFeatures:
+    """Everything the scorers need to know about one resume"""
+
+    name: str
+    emails: list
+    phones: list
+    years: int
+    keywords: KeywordMatches
+    text_length: int
+    line_count: int
+    bullet_count: int
+    dash_count: int
+    # {canonical skill: category} from the skill taxonomy
+    skill_matches: dict = field(default_factory=dict)
+
+    # Section flags used by the primary analyzer
+    @property
+    def has_experience(self):
+        return self.keywords.any('experience')
+
+    @property
+    def has_education(self):
+        return self.keywords.any('education')
+
+    @property
+    def has_projects(self):
+        return self.keywords.any('projects')
+
+    @property
+    def has_certifications(self):
+        return self.keywords.any('certifications')
+
+    @property
+    def has_leadership(self):
+        return self.keywords.any('leadership')
+
+    @property
+    def has_metrics(self):
+        return self.keywords.any('metrics')
+
+    @property
+    def skills(self):
+        return self.skills_for('skills')
+
+    def skills_for(self, analyzer):
+        """{category: skills} credited by the 'skills', 'parser_skills' or 'fallback_skills' analyzer"""
+        return analyzer_skills(self.skill_matches, analyzer)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data['keywords'] = KeywordMatches(data['keywords'])
+        return cls(**data)
+
+
+def extract_name(text):
+    """Extract name from resume"""
+    lines = text.split('\n')
+    for line in lines[:5]:  # Check first 5 lines
+        if len(line.strip()) > 0 and len(line.strip().split()) <= 3:
+            return line.strip()
+    return "Candidate"
+
+
+def extract_features(resume_text):
+    """Build the ResumeFeatures record for a resume in one pass"""
+    with timed("features"):
+        return _extract_features(resume_text)
+
+
+def _extract_features(resume_text):
+    years = [int(y) for y in YEARS_RE.findall(resume_text)]
+    return ResumeFeatures(
+        name=extract_name(resume_text),
+        emails=EMAIL_RE.findall(resume_text),
+        phones=PHONE_RE.findall(resume_text),
+        years=max(years) if years else 0,
+        keywords=KEYWORDS.scan(resume_text),
+        text_length=len(resume_text),
+        line_count=resume_text.count('\n'),
+        bullet_count=resume_text.count('•'),
+        dash_count=resume_text.count('-'),
+        skill_matches=get_taxonomy().resolve(resume_text),
+    )
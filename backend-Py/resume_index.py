@@ -0,0 +1,371 @@
+"""Inverted index of analyzed resumes for top-k candidate search.
+
+Resumes are personal data, so indexing is off unless RESUME_INDEX_ENABLED=1.
+When it is on, every resume that goes through the analysis stage is added
+as an IndexDocument: its extracted fields (skills as the taxonomy resolves
+them, aliases included, certification and education keywords, years of
+experience, ATS score) plus its TF-IDF term vector.  Skill postings and
+skill filters use canonical taxonomy names.
+Postings are kept per term id (with weights) and per field value, in
+append-only typed arrays, so a query touches only the postings of its own
+terms and never re-reads a PDF.  Replacing a resume tombstones its old row;
+past RESUME_INDEX_MAX_DOCUMENTS the oldest resumes are evicted, and the
+arrays are rebuilt once tombstoned rows outnumber live ones.
+
+With RESUME_INDEX_DB set, documents are also written to SQLite and the
+in-memory postings are rebuilt from it at startup, oldest first.  As in
+analysis_cache, add() only queues the write; a writer thread applies
+queued writes in batched transactions and drops them (counted) if the
+queue is full.
+"""
+
+import heapq
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+
+import request_log
+from job_matching import SparseVector, job_profile, vectorize
+from lazy_imports import lazy
+from resume_analyzer import analyze_resume_text
+from resume_features import extract_features
+from taxonomy import canonical_name
+
+np = lazy("numpy")
+
+RESUME_INDEX_ENABLED = os.getenv("RESUME_INDEX_ENABLED", "0") == "1"
+RESUME_INDEX_DB = os.getenv("RESUME_INDEX_DB")
+RESUME_INDEX_MAX_DOCUMENTS = int(os.getenv("RESUME_INDEX_MAX_DOCUMENTS", "10000"))
+# /resumes/search is disabled unless a bearer token is configured for it
+RESUME_SEARCH_TOKEN = os.getenv("RESUME_SEARCH_TOKEN")
+# Tombstoned rows are only compacted away once there are at least this many
+COMPACT_MIN_DEAD_ROWS = 1024
+DB_WRITE_QUEUE = 10000
+DB_WRITE_BATCH = 200
+SEARCH_DEFAULT_K = 10
+SEARCH_MAX_K = 100
+
+
+@dataclass(slots=True)
+class IndexDocument:
+    """The searchable fields of one analyzed resume"""
+
+    id: str
+    filename: str
+    name: str
+    years: int
+    ats: int
+    skills: dict
+    certifications: list
+    education: list
+    vector: SparseVector = field(repr=False)
+    indexed_at: float = 0.0
+
+    def fields(self):
+        """Field postings keys such as skill:python or edu:bachelor"""
+        keys = {f"skill:{canonical_name(kw)}" for keywords in self.skills.values() for kw in keywords}
+        keys.update(f"cert:{kw}" for kw in self.certifications)
+        keys.update(f"edu:{kw}" for kw in self.education)
+        return keys
+
+    def summary(self):
+        """JSON-ready fields, without the term vector"""
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "name": self.name,
+            "years": self.years,
+            "ats": self.ats,
+            "skills": self.skills,
+            "certifications": self.certifications,
+            "education": self.education,
+            "indexed_at": self.indexed_at,
+        }
+
+
+def index_features(resume_text):
+    """Pipeline stage: the ResumeFeatures record and term vector of a resume"""
+    return extract_features(resume_text), vectorize(resume_text)
+
+
+def analyze_for_index(resume_text, job_description, doc_id, filename, features=None, vector=None):
+    """Pipeline stage: the analysis result plus the resume's IndexDocument"""
+    if features is None:
+        features, vector = index_features(resume_text)
+    skills = features.skills
+    result = analyze_resume_text(resume_text, job_description, features, vector, skills)
+    document = IndexDocument(
+        id=doc_id,
+        filename=filename,
+        name=features.name,
+        years=features.years,
+        ats=result["scores"]["ats"],
+        skills=skills,
+        certifications=features.keywords.get("certifications", []),
+        education=features.keywords.get("education", []),
+        vector=vector,
+        indexed_at=time.time(),
+    )
+    return result, document
+
+
+class ResumeIndex:
+    """In-memory inverted index with optional SQLite persistence; add() is a no-op when disabled"""
+
+    def __init__(self, db_path=RESUME_INDEX_DB, enabled=RESUME_INDEX_ENABLED,
+                 max_documents=RESUME_INDEX_MAX_DOCUMENTS):
+        self.enabled = enabled
+        self.max_documents = max_documents
+        self._lock = threading.Lock()
+        self._reset()
+        self.evicted = 0
+        self.compactions = 0
+        self._db_path = db_path if enabled else None
+        self._writes = queue.Queue(maxsize=DB_WRITE_QUEUE)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.disk_writes_dropped = 0
+        if self._db_path:
+            db = sqlite3.connect(self._db_path, isolation_level=None)
+            try:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS resume_index ("
+                    "id TEXT PRIMARY KEY, fields TEXT NOT NULL, "
+                    "term_ids BLOB NOT NULL, term_weights BLOB NOT NULL)"
+                )
+                self._load(db)
+            finally:
+                db.close()
+
+    def _reset(self):
+        self._documents = []      # row -> IndexDocument
+        self._rows = {}           # document id -> current row
+        self._alive = bytearray() # row -> 1 unless replaced or evicted
+        self._years = array("f")
+        self._ats = array("f")
+        self._terms = {}          # term id -> (rows, weights)
+        self._fields = {}         # field key -> rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, doc_id):
+        """Return the current IndexDocument for an id, or None"""
+        with self._lock:
+            row = self._rows.get(doc_id)
+            return self._documents[row] if row is not None else None
+
+    def add(self, document):
+        """Index a document, replacing any earlier version with the same id"""
+        if not self.enabled:
+            return
+        if self._db_path:
+            row = (
+                "put",
+                document.id,
+                json.dumps(document.summary(), separators=(",", ":")),
+                document.vector.ids.astype(np.uint32).tobytes(),
+                document.vector.weights.astype(np.float32).tobytes(),
+            )
+        with self._lock:
+            self._append(document)
+            evicted = self._evict()
+            if self._db_path:
+                # Queued under the lock, so SQLite sees the same order as the index
+                self._queue_write(row)
+                if evicted:
+                    self._queue_write(("delete", evicted))
+
+    def _queue_write(self, write):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="resume-index", daemon=True)
+                    self._writer.start()
+        try:
+            self._writes.put_nowait(write)
+        except queue.Full:
+            self.disk_writes_dropped += 1
+
+    def _write_loop(self):
+        db = sqlite3.connect(self._db_path, timeout=30)
+        stopping = False
+        while not stopping:
+            writes = [self._writes.get()]
+            while len(writes) < DB_WRITE_BATCH:
+                try:
+                    writes.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            if writes[-1] is None:
+                stopping = True
+                writes.pop()
+            try:
+                with db:
+                    for write in writes:
+                        if write[0] == "put":
+                            db.execute(
+                                "INSERT OR REPLACE INTO resume_index (id, fields, term_ids, term_weights) "
+                                "VALUES (?, ?, ?, ?)",
+                                write[1:],
+                            )
+                        else:
+                            db.executemany("DELETE FROM resume_index WHERE id = ?", [(doc_id,) for doc_id in write[1]])
+            except sqlite3.Error as e:
+                request_log.event("resume_index_write_failed", logging.WARNING, error=str(e))
+        db.close()
+
+    def close(self):
+        """Write everything queued so far and stop the writer thread"""
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def search(self, job_description=None, skills=(), min_years=None, k=SEARCH_DEFAULT_K):
+        """Return the k best matches for a job description and/or skill filter.
+
+        skills and min_years are hard filters; a query with neither them nor
+        a job description matches nothing.  With a job description the
+        match score is the mean of text similarity and required-skill
+        coverage; with filters alone, resumes are ranked by ATS score.
+        """
+        k = max(1, min(k, SEARCH_MAX_K))
+        has_query = bool(job_description and job_description.strip()) or bool(skills) or min_years is not None
+        with self._lock:
+            rows = len(self._documents)
+            if not self._rows or not has_query:
+                # An empty query would just list whoever is in the index
+                return {"total": len(self._rows), "matched": 0, "results": []}
+            candidates = np.frombuffer(self._alive, dtype=np.bool_).copy()
+
+            for skill in skills:
+                postings = self._fields.get(f"skill:{canonical_name(skill)}")
+                if postings is None:
+                    candidates[:] = False
+                    break
+                has_skill = np.zeros(rows, dtype=np.bool_)
+                has_skill[np.frombuffer(postings, dtype=np.uint32)] = True
+                candidates &= has_skill
+            if min_years is not None:
+                candidates &= np.frombuffer(self._years, dtype=np.float32) >= min_years
+
+            similarity = coverage = None
+            if job_description and job_description.strip():
+                profile = job_profile(job_description)
+                similarity = np.zeros(rows, dtype=np.float32)
+                for term_id, weight in zip(profile.vector.ids.tolist(), profile.vector.weights.tolist()):
+                    postings = self._terms.get(term_id)
+                    if postings is not None:
+                        doc_rows, doc_weights = postings
+                        similarity[np.frombuffer(doc_rows, dtype=np.uint32)] += (
+                            np.frombuffer(doc_weights, dtype=np.float32) * weight
+                        )
+                required = [kw for keywords in profile.skills.values() for kw in keywords]
+                if required:
+                    coverage = np.zeros(rows, dtype=np.float32)
+                    for skill in required:
+                        postings = self._fields.get(f"skill:{canonical_name(skill)}")
+                        if postings is not None:
+                            coverage[np.frombuffer(postings, dtype=np.uint32)] += 1
+                    coverage /= len(required)
+                    scores = (similarity + coverage) / 2
+                else:
+                    scores = similarity
+            else:
+                scores = np.frombuffer(self._ats, dtype=np.float32) / 100
+
+            # A resume that matches nothing in the query is not a result
+            candidates &= scores > 0
+            matched = np.flatnonzero(candidates)
+            # Partial sort: only the k best rows are ordered
+            top = heapq.nlargest(k, matched.tolist(), key=scores.__getitem__)
+            results = []
+            for row in top:
+                entry = self._documents[row].summary()
+                entry["score"] = round(float(scores[row]), 4)
+                if similarity is not None:
+                    entry["similarity"] = round(float(similarity[row]), 4)
+                if coverage is not None:
+                    entry["skill_coverage"] = round(float(coverage[row]), 3)
+                results.append(entry)
+            return {"total": len(self._rows), "matched": len(matched), "results": results}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self._rows),
+                "rows": len(self._documents),
+                "terms": len(self._terms),
+                "fields": len(self._fields),
+                "persistent": bool(self._db_path),
+                "disk_writes_queued": self._writes.qsize(),
+                "disk_writes_dropped": self.disk_writes_dropped,
+                "enabled": self.enabled,
+                "max_documents": self.max_documents,
+                "evicted": self.evicted,
+                "compactions": self.compactions,
+            }
+
+    def _evict(self):
+        """Drop the oldest documents past max_documents; return their ids"""
+        evicted = []
+        if len(self._rows) > self.max_documents:
+            # Rows are in insertion order, so the first live rows are the oldest
+            for row in np.flatnonzero(np.frombuffer(self._alive, dtype=np.bool_)).tolist():
+                if len(self._rows) <= self.max_documents:
+                    break
+                document = self._documents[row]
+                self._alive[row] = 0
+                del self._rows[document.id]
+                evicted.append(document.id)
+            self.evicted += len(evicted)
+        dead = len(self._documents) - len(self._rows)
+        if dead >= COMPACT_MIN_DEAD_ROWS and dead > len(self._rows):
+            self._compact()
+        return evicted
+
+    def _compact(self):
+        """Rebuild the postings from the live documents only"""
+        live = [self._documents[row] for row in sorted(self._rows.values())]
+        self._reset()
+        for document in live:
+            self._append(document)
+        self.compactions += 1
+
+    def _append(self, document):
+        previous = self._rows.get(document.id)
+        if previous is not None:
+            self._alive[previous] = 0
+        row = len(self._documents)
+        self._documents.append(document)
+        self._rows[document.id] = row
+        self._alive.append(1)
+        self._years.append(document.years)
+        self._ats.append(document.ats)
+        for term_id, weight in zip(document.vector.ids.tolist(), document.vector.weights.tolist()):
+            postings = self._terms.get(term_id)
+            if postings is None:
+                postings = self._terms[term_id] = (array("I"), array("f"))
+            postings[0].append(row)
+            postings[1].append(weight)
+        for key in document.fields():
+            self._fields.setdefault(key, array("I")).append(row)
+
+    def _load(self, db):
+        # Oldest first, so rows keep the insertion order eviction relies on
+        for fields, term_ids, term_weights in db.execute(
+            "SELECT fields, term_ids, term_weights FROM resume_index ORDER BY json_extract(fields, '$.indexed_at')"
+        ):
+            data = json.loads(fields)
+            data["vector"] = SparseVector(
+                np.frombuffer(term_ids, dtype=np.uint32), np.frombuffer(term_weights, dtype=np.float32)
+            )
+            self._append(IndexDocument(**data))
@@ -0,0 +1,282 @@
+"""Declarative score tables shared by the three analyzers.
+
+Every score is a base value plus the points of each rule that holds,
+clamped to a floor and a cap.  A rule holds when one numeric resume feature
+lies in [low, high); flags are 0/1, so "has X" is [1, inf) and "lacks X" is
+[0, 1).  The tables are compiled once at import.  A batch of feature
+vectors is then scored with one comparison pass and one matrix-vector
+product,
+
+    scores = clip(base + ((X[:, columns] >= low) & (X[:, columns] < high)) @ points, floor, cap)
+
+so re-scoring a stored corpus after a weight change is a NumPy operation
+rather than a re-run of every analyzer (feature_store.rescore() does this,
+optionally with trial weights given as JSON, see tables_from_json()).  A
+single resume takes a plain Python loop over the same compiled rules,
+which is faster than NumPy for one row and yields exactly the numbers the
+analyzers always produced.  The NumPy side of a table is only built on
+its first batch, so scoring a single resume never imports NumPy.
+"""
+
+import math
+import zlib
+from typing import NamedTuple
+
+from lazy_imports import lazy
+
+np = lazy("numpy")
+
+INF = math.inf
+
+# Numeric features the rules can test, computed from a ResumeFeatures record
+FEATURES = {
+    "emails": lambda f: len(f.emails),
+    "phones": lambda f: len(f.phones),
+    "years": lambda f: f.years,
+    "text_length": lambda f: f.text_length,
+    "line_count": lambda f: f.line_count,
+    "list_markers": lambda f: max(f.bullet_count, f.dash_count),
+    "experience": lambda f: f.has_experience,
+    "education": lambda f: f.has_education,
+    "projects": lambda f: f.has_projects,
+    "certifications": lambda f: f.has_certifications,
+    "leadership": lambda f: f.has_leadership,
+    "metrics": lambda f: f.has_metrics,
+    "skill_categories": lambda f: len(f.skills),
+    "parser_experience": lambda f: f.keywords.any("parser_experience"),
+    "parser_skill_categories": lambda f: len(f.skills_for("parser_skills")),
+    "parser_certifications": lambda f: f.keywords.any("parser_certifications"),
+    "fallback_experience": lambda f: f.keywords.any("experience"),
+    "fallback_skill_terms": lambda f: f.keywords.any("fallback_skill_terms"),
+    "fallback_skill_categories": lambda f: len(f.skills_for("fallback_skills")),
+    "fallback_education": lambda f: f.keywords.any("fallback_education"),
+    "fallback_projects": lambda f: f.keywords.any("fallback_projects"),
+    "fallback_certifications": lambda f: f.keywords.any("fallback_certifications"),
+    "fallback_leadership": lambda f: f.keywords.any("fallback_leadership"),
+    "fallback_metrics": lambda f: f.keywords.any("fallback_metrics"),
+}
+FEATURE_NAMES = tuple(FEATURES)
+FEATURE_INDEX = {name: index for index, name in enumerate(FEATURE_NAMES)}
+# Identifies the vector layout, so stored vectors are only reused when it matches
+FEATURE_SET_ID = zlib.crc32(",".join(FEATURE_NAMES).encode("utf-8"))
+
+
+class Rule(NamedTuple):
+    feature: str
+    low: float
+    high: float
+    points: float
+
+
+def present(feature, points):
+    return Rule(feature, 1, INF, points)
+
+def absent(feature, points):
+    return Rule(feature, -INF, 1, points)
+
+def at_least(feature, threshold, points):
+    return Rule(feature, threshold, INF, points)
+
+def below(feature, threshold, points):
+    return Rule(feature, -INF, threshold, points)
+
+
+class ScoreTable(NamedTuple):
+    base: float
+    rules: tuple
+    floor: float = -INF
+    cap: float = INF
+
+
+TABLES = {
+    "intelligent": {
+        "ats": ScoreTable(base=50, floor=25, cap=85, rules=(
+            # Contact information
+            present("emails", 5),
+            present("phones", 5),
+            # Sections
+            present("experience", 15),
+            present("education", 10),
+            present("skill_categories", 12),
+            at_least("skill_categories", 3, 3),  # Diverse skills
+            present("projects", 8),
+            present("metrics", 10),
+            present("certifications", 5),
+            present("leadership", 5),
+            at_least("years", 5, 5),
+            # Deductions for missing elements
+            absent("metrics", -8),
+            absent("projects", -5),
+            absent("skill_categories", -10),
+            absent("education", -5),
+            # Length: too short, too long, or optimal (500-1500 characters)
+            below("text_length", 300, -10),
+            at_least("text_length", 2501, -5),
+            Rule("text_length", 500, 1501, 2),
+            # ATS-friendly structure
+            at_least("line_count", 21, 2),
+            at_least("list_markers", 6, 2),
+        )),
+        "strength": ScoreTable(base=0, cap=10, rules=(
+            present("experience", 2),
+            present("education", 1.5),
+            present("projects", 2),
+            present("certifications", 1),
+            present("leadership", 1.5),
+            present("metrics", 1),
+            at_least("years", 5, 0.5),
+            at_least("skill_categories", 3, 0.5),
+        )),
+    },
+    "parsed": {
+        "ats": ScoreTable(base=60, cap=100, rules=(
+            present("parser_skill_categories", 10),
+            present("parser_experience", 10),
+            present("education", 5),
+            present("projects", 5),
+            present("parser_certifications", 3),
+            at_least("years", 3, 5),
+        )),
+        "strength": ScoreTable(base=0, cap=10, rules=(
+            present("parser_experience", 2),
+            present("parser_skill_categories", 2),
+            present("education", 1.5),
+            present("projects", 2),
+            present("parser_certifications", 1),
+            at_least("years", 5, 1),
+            at_least("years", 10, 0.5),
+        )),
+    },
+    "fallback": {
+        "ats": ScoreTable(base=50, floor=20, cap=85, rules=(
+            present("fallback_experience", 15),
+            present("fallback_education", 10),
+            present("fallback_skill_terms", 12),
+            present("fallback_projects", 8),
+            present("fallback_metrics", 8),
+            present("fallback_certifications", 5),
+            present("fallback_leadership", 5),
+            absent("fallback_metrics", -5),
+            absent("fallback_projects", -5),
+            below("fallback_skill_categories", 2, -5),
+            below("text_length", 300, -10),
+            at_least("text_length", 2001, -5),
+        )),
+        "strength": ScoreTable(base=0, cap=10, rules=(
+            present("fallback_experience", 2),
+            present("fallback_skill_terms", 2),
+            present("fallback_education", 1.5),
+            present("fallback_projects", 2),
+            present("fallback_certifications", 1),
+            present("fallback_leadership", 1),
+            present("fallback_metrics", 0.5),
+        )),
+    },
+}
+
+
+class Scorer:
+    """One ScoreTable compiled for scalar and batch evaluation"""
+
+    def __init__(self, table):
+        self.base = table.base
+        self.floor = table.floor
+        self.cap = table.cap
+        self._rules = tuple((FEATURE_INDEX[r.feature], r.low, r.high, r.points) for r in table.rules)
+        self._arrays = None  # (columns, low, high, points), built on the first batch
+
+    def _batch_arrays(self):
+        if self._arrays is None:
+            columns, low, high, points = zip(*self._rules) if self._rules else ((), (), (), ())
+            self._arrays = (
+                np.array(columns, dtype=np.intp), np.array(low, dtype=np.float64),
+                np.array(high, dtype=np.float64), np.array(points, dtype=np.float64),
+            )
+        return self._arrays
+
+    def score(self, vector):
+        score = self.base
+        for column, low, high, points in self._rules:
+            if low <= vector[column] < high:
+                score += points
+        return max(self.floor, min(self.cap, score))
+
+    def score_batch(self, matrix):
+        """Score every row of a (resumes x FEATURE_NAMES) matrix at once"""
+        columns, low, high, points = self._batch_arrays()
+        values = matrix[:, columns]
+        fired = (values >= low) & (values < high)
+        return np.clip(self.base + fired @ points, self.floor, self.cap)
+
+
+def compile_tables(tables):
+    return {
+        analyzer: {name: Scorer(table) for name, table in scores.items()}
+        for analyzer, scores in tables.items()
+    }
+
+
+SCORERS = compile_tables(TABLES)
+
+
+def tables_from_json(data):
+    """TABLES with the scores given in data replaced.
+
+    data looks like {"intelligent": {"ats": {"base": 50, "floor": 25,
+    "cap": 85, "rules": [["emails", 1, null, 5], ...]}}}; a null low or
+    high bound is unbounded, and omitted analyzers and scores keep their
+    current table.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Score tables must be an object of analyzers")
+    tables = {analyzer: dict(scores) for analyzer, scores in TABLES.items()}
+    for analyzer, scores in data.items():
+        if not isinstance(scores, dict):
+            raise ValueError(f"Scores of {analyzer} must be an object of tables")
+        for name, table in scores.items():
+            where = f"{analyzer}.{name}"
+            if not isinstance(table, dict) or not isinstance(table.get("rules"), list):
+                raise ValueError(f"{where} must be an object with a list of rules")
+            rules = []
+            for rule in table["rules"]:
+                if not isinstance(rule, list) or len(rule) != 4:
+                    raise ValueError(f"{where}: a rule is [feature, low, high, points], got {rule!r}")
+                feature, low, high, points = rule
+                if feature not in FEATURE_INDEX:
+                    raise ValueError(f"Unknown scoring feature: {feature}")
+                if not all(_is_number(value) for value in (low, high) if value is not None) or not _is_number(points):
+                    raise ValueError(f"{where}: rule bounds and points must be numbers, got {rule!r}")
+                rules.append(Rule(feature, -INF if low is None else low, INF if high is None else high, points))
+            for key in ("base", "floor", "cap"):
+                if table.get(key) is not None and not _is_number(table[key]):
+                    raise ValueError(f"{where}.{key} must be a number")
+            tables.setdefault(analyzer, {})[name] = ScoreTable(
+                base=table.get("base") or 0,
+                rules=tuple(rules),
+                floor=-INF if table.get("floor") is None else table["floor"],
+                cap=INF if table.get("cap") is None else table["cap"],
+            )
+    return tables
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def feature_vector(features):
+    """The FEATURE_NAMES values of one ResumeFeatures record"""
+    return [extract(features) for extract in FEATURES.values()]
+
+def feature_matrix(features_list):
+    """Stack the feature vectors of many resumes into a float matrix"""
+    matrix = np.array([feature_vector(features) for features in features_list], dtype=np.float64)
+    return matrix.reshape(-1, len(FEATURE_NAMES))
+
+def score(analyzer, features):
+    """{"ats", "strength"} for one resume, as the named analyzer scores it"""
+    vector = feature_vector(features)
+    return {name: scorer.score(vector) for name, scorer in SCORERS[analyzer].items()}
+
+def score_batch(analyzer, matrix, scorers=SCORERS):
+    """{"ats": array, "strength": array} for every row of a feature matrix"""
+    return {name: scorer.score_batch(matrix) for name, scorer in scorers[analyzer].items()}
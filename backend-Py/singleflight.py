@@ -0,0 +1,54 @@
+"""Coalesce concurrent calls for the same key into one in-flight task"""
+
+import asyncio
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result"""
+
+    def __init__(self):
+        self._calls = {}  # key -> asyncio.Task
+        self.waiters = 0  # callers of do() currently joined to another caller's call
+        self.joined = 0
+
+    def in_flight(self, key):
+        return self._running(key) is not None
+
+    def _running(self, key):
+        # A finished task stays in _calls until its done callback runs, which
+        # can be after callers woken by it have already retried
+        task = self._calls.get(key)
+        return None if task is None or task.done() else task
+
+    def waiting(self):
+        """Number of keys with a call currently running"""
+        return len(self._calls)
+
+    def start(self, key, fn):
+        """Return the running task for key, starting fn() if there is none"""
+        task = self._running(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return task
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    async def do(self, key, fn):
+        """Await fn() for key, joining a call already in flight.
+
+        The shared task is shielded so one caller being cancelled does not
+        cancel it for everyone else.
+        """
+        task = self._running(key)
+        if task is None:
+            return await asyncio.shield(self.start(key, fn))
+        self.joined += 1
+        self.waiters += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self.waiters -= 1
@@ -0,0 +1,383 @@
+"""Skill taxonomy: canonical skills, their aliases, and fast lookup in text.
+
+A taxonomy source is JSON of the form
+
+    {"skills": [{"name": "kubernetes", "category": "DevOps", "aliases": ["k8s", "kube"]}, ...]}
+
+and can hold tens of thousands of skills.  Rather than parsing that into
+dicts in every worker, `python -m taxonomy build` compiles it once into a
+compact binary artifact that each process memory-maps read-only, so all
+workers share the same pages and loading costs one mmap call.
+
+Terms (names and aliases) are normalized to space-joined tokens, so
+"Node.js", "node js" and "NODE.JS" are the same term.  The artifact keeps
+their 64-bit hashes sorted next to the skill each term resolves to; a text
+is looked up by hashing every token n-gram up to the longest term and
+binary-searching all of them at once.  Hash hits are confirmed against the
+stored term, and overlapping matches resolve to the longest term.
+
+SKILL_TAXONOMY_PATH points at the artifact (default skill_taxonomy.bin next
+to this file).  Without one, a taxonomy is compiled in memory from
+BUILTIN_SKILLS plus DEFAULT_ALIASES.
+
+    python -m taxonomy build [--source skills.json] [--output skill_taxonomy.bin]
+    python -m taxonomy info [--path skill_taxonomy.bin]
+    python -m taxonomy lookup "k8s, postgres and react.js"
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+
+from lazy_imports import lazy
+
+np = lazy("numpy")
+
+MAGIC = b"SKTX"
+FORMAT_VERSION = 1
+TAXONOMY_PATH = os.getenv(
+    "SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.bin")
+)
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+# magic, version, longest term in tokens, term count, skill count, category count
+HEADER = struct.Struct("<4sIIIII")
+# Section table entries: (offset, length in bytes)
+SECTION = struct.Struct("<QQ")
+SECTIONS = (
+    "term_hashes",     # uint64, sorted
+    "term_skills",     # uint32 skill id per term
+    "term_offsets",    # uint32 offsets into term_blob, one more than terms
+    "term_blob",
+    "skill_categories",  # uint16 category id per skill
+    "skill_offsets",
+    "skill_blob",
+    "category_offsets",
+    "category_blob",
+)
+
+# Built-in skills by category: the default taxonomy when no artifact is built
+BUILTIN_SKILLS = {
+    "Frontend": ["react", "vue", "angular", "html", "css", "javascript", "typescript", "tailwind", "bootstrap",
+                 "next.js", "svelte"],
+    "Backend": ["node", "express", "django", "fastapi", "flask", "java", "spring", "golang", "rust", "python", "php",
+                "laravel", "asp.net"],
+    "Database": ["mongodb", "postgresql", "mysql", "redis", "elasticsearch", "cassandra", "dynamodb", "firebase",
+                 "oracle", "sql"],
+    "DevOps": ["docker", "kubernetes", "jenkins", "gitlab", "github", "aws", "azure", "gcp", "terraform", "ansible",
+               "circleci"],
+    "Other": ["git", "rest", "graphql", "microservices", "agile", "scrum", "linux", "unix", "ci/cd", "api"],
+}
+
+# Common aliases for the built-in skills; real taxonomies bring their own
+DEFAULT_ALIASES = {
+    "kubernetes": ["k8s", "kube"],
+    "postgresql": ["postgres", "psql"],
+    "javascript": ["js", "ecmascript"],
+    "typescript": ["ts"],
+    "node": ["node.js", "nodejs"],
+    "react": ["react.js", "reactjs"],
+    "vue": ["vue.js", "vuejs"],
+    "angular": ["angularjs", "angular.js"],
+    "next.js": ["nextjs"],
+    "mongodb": ["mongo"],
+    "elasticsearch": ["elastic search", "opensearch"],
+    "dynamodb": ["dynamo db"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "aws": ["amazon web services"],
+    "azure": ["microsoft azure"],
+    "golang": ["go lang"],
+    "ci/cd": ["cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "rest": ["restful", "rest api"],
+    "python": ["python3"],
+    "github": ["github actions"],
+}
+
+
+def normalize(term):
+    """Canonical token form of a term: lowercase tokens joined by single spaces"""
+    return " ".join(TOKEN_RE.findall(term.lower()))
+
+
+@functools.lru_cache(maxsize=65536)
+def term_hash(term):
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def default_source():
+    """Taxonomy source built from BUILTIN_SKILLS plus DEFAULT_ALIASES"""
+    skills = {}
+    for category, keywords in BUILTIN_SKILLS.items():
+        for keyword in keywords:
+            skills.setdefault(keyword, {"name": keyword, "category": category, "aliases": []})
+    for name, aliases in DEFAULT_ALIASES.items():
+        if name in skills:
+            skills[name]["aliases"] = aliases
+    return {"skills": list(skills.values())}
+
+
+def _strings(values):
+    """(uint32 offsets, utf-8 blob) for a list of strings"""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+
+def compile_taxonomy(source):
+    """Compile a taxonomy source dict into the binary artifact, returning bytes"""
+    categories = {}
+    names = []
+    skill_categories = []
+    terms = {}  # normalized term -> skill id
+    for skill in source["skills"]:
+        name = normalize(skill["name"])
+        if not name or name in terms:
+            continue
+        skill_id = len(names)
+        names.append(skill["name"].lower())
+        skill_categories.append(categories.setdefault(skill.get("category") or "Other", len(categories)))
+        for term in [skill["name"], *skill.get("aliases", ())]:
+            # The first skill to claim a term keeps it
+            terms.setdefault(normalize(term), skill_id)
+    terms.pop("", None)
+
+    ordered = sorted(terms, key=term_hash)
+    sections = {
+        "term_hashes": np.array([term_hash(term) for term in ordered], dtype=np.uint64),
+        "term_skills": np.array([terms[term] for term in ordered], dtype=np.uint32),
+        "skill_categories": np.array(skill_categories, dtype=np.uint16),
+    }
+    sections["term_offsets"], sections["term_blob"] = _strings(ordered)
+    sections["skill_offsets"], sections["skill_blob"] = _strings(names)
+    sections["category_offsets"], sections["category_blob"] = _strings(list(categories))
+
+    longest = max((term.count(" ") + 1 for term in ordered), default=1)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, longest, len(ordered), len(names), len(categories))
+    body_start = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    body = bytearray()
+    for name in SECTIONS:
+        data = sections[name]
+        data = data.tobytes() if isinstance(data, np.ndarray) else data
+        body += b"\0" * (-(body_start + len(body)) % 8)  # 8-byte align every section
+        table.append(SECTION.pack(body_start + len(body), len(data)))
+        body += data
+    return header + b"".join(table) + bytes(body)
+
+
+# Everything but token characters and hyphens becomes a space; str.translate
+# and split() are several times faster than a regex scan of the text
+_SEPARATORS = str.maketrans({
+    chr(code): " " for code in range(128) if not re.fullmatch(r"[a-z0-9+#-]", chr(code))
+})
+_SEPARATOR_RE = re.compile(r"[^a-z0-9+#-]+")
+
+
+def _tokenize(text):
+    """TOKEN_RE tokens of lowercased text, plus the indexes of tokens hyphen-joined to a word on their left or right"""
+    chunks = text.translate(_SEPARATORS).split() if text.isascii() else _SEPARATOR_RE.split(text)
+    tokens = []
+    joined_left = set()
+    joined_right = set()
+    for chunk in chunks:
+        if "-" not in chunk:
+            if chunk:
+                tokens.append(chunk)
+            continue
+        parts = chunk.split("-")
+        for index, part in enumerate(parts):
+            if not part:
+                continue
+            if index > 0 and parts[index - 1][-1:].isalnum():
+                joined_left.add(len(tokens))
+            if index < len(parts) - 1 and parts[index + 1][:1].isalnum():
+                joined_right.add(len(tokens))
+            tokens.append(part)
+    return tokens, joined_left, joined_right
+
+
+class Taxonomy:
+    """Read-only view over a compiled taxonomy (bytes or a memory map)"""
+
+    def __init__(self, buffer, path=None):
+        self.path = path
+        self._buffer = buffer
+        magic, version, self.max_ngram, self.term_count, self.skill_count, self.category_count = \
+            HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a version {FORMAT_VERSION} skill taxonomy artifact")
+        self._sections = {
+            name: SECTION.unpack_from(buffer, HEADER.size + SECTION.size * index)
+            for index, name in enumerate(SECTIONS)
+        }
+        self._term_hashes = self._array("term_hashes", np.uint64)
+        self._term_skills = self._array("term_skills", np.uint32)
+        self._term_offsets = self._array("term_offsets", np.uint32)
+        self._skill_categories = self._array("skill_categories", np.uint16)
+        self._skill_offsets = self._array("skill_offsets", np.uint32)
+        self._category_offsets = self._array("category_offsets", np.uint32)
+        # Categories are few; decode them once
+        self.categories = [self._string("category_blob", self._category_offsets, i) for i in range(self.category_count)]
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map an artifact; its pages are shared by every process that opens it"""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, path)
+
+    def _array(self, name, dtype):
+        offset, length = self._sections[name]
+        return np.frombuffer(self._buffer, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+
+    def _string(self, blob, offsets, index):
+        start = self._sections[blob][0]
+        return bytes(self._buffer[start + int(offsets[index]):start + int(offsets[index + 1])]).decode("utf-8")
+
+    def skill(self, skill_id):
+        """(canonical name, category) of a skill id"""
+        name = self._string("skill_blob", self._skill_offsets, skill_id)
+        return name, self.categories[self._skill_categories[skill_id]]
+
+    def _find(self, hashes, terms):
+        """Skill id for each term, or -1"""
+        positions = np.searchsorted(self._term_hashes, hashes)
+        found = []
+        for term, value, position in zip(terms, hashes.tolist(), positions.tolist()):
+            skill_id = -1
+            # Equal hashes sit next to each other; confirm against the stored term
+            while position < self.term_count and int(self._term_hashes[position]) == value:
+                if self._string("term_blob", self._term_offsets, position) == term:
+                    skill_id = int(self._term_skills[position])
+                    break
+                position += 1
+            found.append(skill_id)
+        return found
+
+    def canonical(self, term):
+        """(canonical name, category) for a skill name or alias, or None"""
+        term = normalize(term)
+        skill_id = self._find(np.array([term_hash(term)], dtype=np.uint64), [term])[0] if term else -1
+        return self.skill(skill_id) if skill_id >= 0 else None
+
+    def resolve(self, text):
+        """{canonical skill: category} for every skill mentioned in text, in order of first mention"""
+        tokens, joined_left, joined_right = _tokenize(text.lower())
+        # grams[n - 1][i] is the n-token term starting at token i
+        grams = [tokens]
+        for length in range(2, self.max_ngram + 1):
+            grams.append(list(map(" ".join, zip(*(tokens[offset:] for offset in range(length))))))
+        terms = list(set().union(*grams))  # Repeated words are looked up once
+        if not terms or not self.term_count:
+            return {}
+        hashes = np.fromiter((term_hash(term) for term in terms), dtype=np.uint64, count=len(terms))
+        # Cheap vectorized filter first; only possible hits are confirmed
+        positions = np.minimum(np.searchsorted(self._term_hashes, hashes), self.term_count - 1)
+        candidates = np.flatnonzero(self._term_hashes[positions] == hashes)
+        picked = [terms[i] for i in candidates]
+        hits = {term: skill_id for term, skill_id in zip(picked, self._find(hashes[candidates], picked)) if skill_id >= 0}
+
+        matches = {}  # start -> (length, skill id), longest term wins
+        for length, terms_at in enumerate(grams, 1):
+            for start, term in enumerate(terms_at):
+                skill_id = hits.get(term)
+                if skill_id is None:
+                    continue
+                # A term inside a hyphenated word does not count: "react-native" is not React
+                if start in joined_left or start + length - 1 in joined_right:
+                    continue
+                matches[start] = (length, skill_id)  # Longer lengths come later and win
+
+        skills = {}
+        covered = 0
+        for start in sorted(matches):
+            length, skill_id = matches[start]
+            if start < covered:
+                continue  # Inside a longer match
+            covered = start + length
+            name, category = self.skill(skill_id)
+            skills.setdefault(name, category)
+        return skills
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "terms": self.term_count,
+            "skills": self.skill_count,
+            "categories": self.category_count,
+            "max_ngram": self.max_ngram,
+            "bytes": len(self._buffer),
+        }
+
+
+_taxonomy = None
+_lock = threading.Lock()
+
+
+def get_taxonomy():
+    """The process-wide taxonomy: the artifact at TAXONOMY_PATH, else the built-in one"""
+    global _taxonomy
+    if _taxonomy is None:
+        with _lock:
+            if _taxonomy is None:
+                if os.path.exists(TAXONOMY_PATH):
+                    _taxonomy = Taxonomy.open(TAXONOMY_PATH)
+                else:
+                    _taxonomy = Taxonomy(compile_taxonomy(default_source()))
+    return _taxonomy
+
+
+@functools.lru_cache(maxsize=4096)
+def canonical_name(term):
+    """The canonical name of a skill or alias; unknown terms come back lowercased"""
+    found = get_taxonomy().canonical(term)
+    return found[0] if found else term.lower()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and inspect skill taxonomy artifacts")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile a JSON taxonomy into a binary artifact")
+    build.add_argument("--source", help="taxonomy JSON (default: the built-in keyword tables)")
+    build.add_argument("--output", default=TAXONOMY_PATH)
+    info = commands.add_parser("info", help="describe an artifact")
+    info.add_argument("--path", default=TAXONOMY_PATH)
+    lookup = commands.add_parser("lookup", help="resolve the skills mentioned in a text")
+    lookup.add_argument("text")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        if args.source:
+            with open(args.source, encoding="utf-8") as f:
+                source = json.load(f)
+        else:
+            source = default_source()
+        data = compile_taxonomy(source)
+        # Written aside and renamed, so running workers never map a partial file
+        partial = args.output + ".tmp"
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, args.output)
+        stats = Taxonomy(data).stats()
+        print(f"Wrote {args.output}: {stats['skills']} skills, {stats['terms']} terms, {len(data)} bytes "
+              f"in {time.perf_counter() - started:.2f}s")
+    elif args.command == "info":
+        print(json.dumps(Taxonomy.open(args.path).stats(), indent=2))
+    else:
+        print(json.dumps(get_taxonomy().resolve(args.text), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Run pipeline stages on threads so tests need no worker processes
+os.environ.setdefault("RESUME_EXECUTION_MODE", "thread")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+import time
+
+from analysis_cache import AnalysisCache, cache_key
+
+
+def test_cache_key_normalizes_job_description():
+    assert cache_key(b"pdf", "  Senior   Python\nEngineer ") == cache_key(b"pdf", "senior python engineer")
+    assert cache_key(b"pdf", None) == cache_key(b"pdf", "")
+    assert cache_key(b"pdf", "python") != cache_key(b"pdf", "java")
+    assert cache_key(b"pdf", "python") != cache_key(b"other", "python")
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = AnalysisCache(max_bytes=25, db_path=None)  # two 10-byte entries
+    cache.put("a", "x" * 8)
+    cache.put("b", "x" * 8)
+    assert cache.get("a") == "x" * 8
+    cache.put("c", "x" * 8)
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 8
+    assert cache.get("c") == "x" * 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = AnalysisCache(ttl=0.01, db_path=None)
+    cache.put("a", {"score": 1})
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    cache = AnalysisCache(db_path=db_path)
+    cache.put("a", {"score": 1})
+    cache.close()
+
+    reopened = AnalysisCache(db_path=db_path)
+    assert reopened.get("a") == {"score": 1}
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
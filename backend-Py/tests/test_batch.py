@@ -0,0 +1,76 @@
+import io
+import json
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from batch import BatchError, _expand
+from benchmarks.synthetic_pdfs import make_pdf
+from resume_index import ResumeIndex
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_zip_member_count_is_limited():
+    archive = _zip([(f"r{i}.pdf", b"%PDF-1.4") for i in range(6)])
+    with pytest.raises(BatchError, match="5 file limit"):
+        _expand([("resumes.zip", archive)], max_files=5)
+
+
+def test_zip_expanded_bytes_are_limited():
+    archive = _zip([(f"r{i}.pdf", b"\0" * 1000) for i in range(4)])
+    with pytest.raises(BatchError, match="more than 2500 bytes"):
+        _expand([("resumes.zip", archive)], max_bytes=2500)
+
+
+def test_zip_keeps_only_pdfs():
+    archive = _zip([("a.pdf", b"%PDF-a"), ("notes.txt", b"x"), ("__MACOSX/a.pdf", b"x"), ("dir/b.PDF", b"%PDF-b")])
+    assert _expand([("resumes.zip", archive)]) == [("a.pdf", b"%PDF-a"), ("dir/b.PDF", b"%PDF-b")]
+
+
+def test_empty_batch_is_rejected():
+    with pytest.raises(BatchError, match="No PDF files"):
+        _expand([("resumes.zip", _zip([("notes.txt", b"x")]))])
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "analysis_cache", main.AnalysisCache(db_path=None))
+    monkeypatch.setattr(main, "resume_index", ResumeIndex(db_path=None, enabled=True))
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_batch_reports_non_pdf_item_without_caching_or_indexing_it(client):
+    resume = make_pdf("text", 1, seed=1)
+    response = client.post(
+        "/analyze-resume/batch",
+        files=[
+            ("files", ("resume.pdf", resume, "application/pdf")),
+            ("files", ("notes.pdf", b"notapdf", "application/pdf")),
+        ],
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    records = {record["filename"]: record for record in lines if "filename" in record}
+    assert records["resume.pdf"]["status"] == "ok"
+    assert records["notes.pdf"]["status"] == "error"
+    assert lines[-1] == {"summary": {"total": 2, "succeeded": 1, "failed": 1}}
+
+    assert main.analysis_cache.get(main.cache_key(b"notapdf", "")) is None
+    assert main.analysis_cache.get(main.cache_key(resume, "")) is not None
+    assert main.resume_index.get(main.resume_id(b"notapdf")) is None
+    assert main.resume_index.get(main.resume_id(resume)) is not None
+
+
+def test_single_non_pdf_upload_is_unprocessable(client):
+    response = client.post("/analyze-resume/", files={"file": ("notes.pdf", b"notapdf", "application/pdf")})
+    assert response.status_code == 422
@@ -0,0 +1,71 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from feature_store import FeatureStore, analyze_for_store, rescore
+from scoring import tables_from_json
+
+RESUMES = [
+    "Jane Doe\njane@example.com\nExperience\nPython developer, 6 years of experience.\n"
+    "Projects: led a team, improved latency by 40%.\nEducation: BSc Computer Science",
+    "John Roe\nSkills: Excel, communication\nEducation: High school",
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FeatureStore(str(tmp_path / "features.db"), flush_seconds=0.01)
+    for n, text in enumerate(RESUMES):
+        result, document, record = analyze_for_store(text, None, f"resume-{n}", f"resume-{n}.pdf")
+        store.append(record, {"extract_ms": 1.0})
+    store.close()
+    return store
+
+
+def test_records_are_written_in_batches(store):
+    stats = store.stats()
+    assert stats["written"] == stats["rows"] == len(RESUMES)
+    assert stats["dropped"] == stats["errors"] == 0
+
+
+def test_rescore_with_current_tables_changes_nothing(store):
+    summary = rescore(store.db_path)
+    assert summary["rows"] == len(RESUMES)
+    assert all(analyzer["changed"] == 0 for analyzer in summary["analyzers"].values())
+
+
+def test_rescore_with_trial_tables_can_be_written_back(store):
+    rules = {"intelligent": {"ats": {"base": 10, "rules": [["emails", 1, None, 5]]}}}
+    trial = rescore(store.db_path, rules)
+    assert trial["analyzers"]["intelligent"]["mean_ats_after"] == 12.5  # one resume has an email
+    assert rescore(store.db_path, rules, write=True)["analyzers"]["intelligent"]["changed"] == len(RESUMES)
+    assert rescore(store.db_path, rules)["analyzers"]["intelligent"]["changed"] == 0
+
+
+@pytest.mark.parametrize("rules", [
+    [],
+    {"intelligent": "x"},
+    {"intelligent": {"ats": {"base": 1}}},
+    {"intelligent": {"ats": {"rules": [["emails", 1, None]]}}},
+    {"intelligent": {"ats": {"rules": [["shoe_size", 1, None, 5]]}}},
+    {"intelligent": {"ats": {"rules": [["emails", "1", None, 5]]}}},
+])
+def test_malformed_tables_are_value_errors(rules):
+    with pytest.raises(ValueError):
+        tables_from_json(rules)
+
+
+def test_rescore_endpoint_requires_the_token(store, monkeypatch):
+    monkeypatch.setattr(main, "feature_store", store)
+    monkeypatch.setattr(main, "RESUME_SEARCH_TOKEN", "secret")
+    client = TestClient(main.app)
+    assert client.post("/feature-store/rescore").status_code == 401
+    assert client.post("/feature-store/rescore", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    auth = {"Authorization": "Bearer secret"}
+    response = client.post("/feature-store/rescore", json={"intelligent": "x"}, headers=auth)
+    assert response.status_code == 400
+    assert client.post("/feature-store/rescore", headers=auth).json()["rows"] == len(RESUMES)
+
+    monkeypatch.setattr(main, "RESUME_SEARCH_TOKEN", None)
+    assert client.post("/feature-store/rescore", headers=auth).status_code == 404
@@ -0,0 +1,79 @@
+import asyncio
+import os
+
+import pytest
+
+from job_queue import JobQueue, callback_allowed
+
+ALLOWED = ["https://hooks.example.com", "https://api.example.org:8443/callbacks/"]
+
+
+@pytest.mark.parametrize("url", [
+    "https://hooks.example.com",
+    "https://hooks.example.com/analysis",
+    "https://HOOKS.example.com:443/analysis",
+    "https://api.example.org:8443/callbacks/",
+    "https://api.example.org:8443/callbacks/job/1",
+])
+def test_callback_allowed(url):
+    assert callback_allowed(url, ALLOWED)
+
+
+@pytest.mark.parametrize("url", [
+    "https://hooks.example.com.attacker.net/",
+    "https://hooks.example.com@attacker.net/",
+    "http://hooks.example.com/",
+    "https://hooks.example.com:8443/",
+    "https://api.example.org:8443/callbacksx",
+    "https://api.example.org/callbacks/",
+    "https://api.example.org:8443/callbacks/../admin",
+    "https://hooks.example.com:notaport/",
+    "ftp://hooks.example.com/",
+    "not a url",
+])
+def test_callback_refused(url):
+    assert not callback_allowed(url, ALLOWED)
+
+
+def test_jobs_keep_uploads_on_disk_until_finished(tmp_path):
+    seen = []
+
+    async def handler(job):
+        seen.append(job["pdf"])
+        if job["attempt"] == 1:
+            raise TimeoutError("try again")
+        return {"filename": job["filename"]}
+
+    async def run():
+        queue = JobQueue(handler, retry_on=(TimeoutError,), db_path=str(tmp_path / "jobs.db"), retry_seconds=0.01)
+        job_id = await queue.submit(b"%PDF-1.4 resume", "resume.pdf")
+        assert len(os.listdir(queue.spool_dir)) == 1
+        assert queue._query("SELECT pdf_path FROM analysis_jobs")[0][0].startswith(queue.spool_dir)
+        for _ in range(200):
+            if queue.lookup(job_id)["status"] == "done":
+                break
+            await asyncio.sleep(0.01)
+        await queue.close()
+        return queue, job_id
+
+    queue, job_id = asyncio.run(run())
+    assert queue.lookup(job_id)["result"] == {"filename": "resume.pdf"}
+    assert queue.stats()["retries"] == 1
+    assert seen == [b"%PDF-1.4 resume"] * 2
+    assert os.listdir(queue.spool_dir) == []
+
+
+def test_in_memory_queue_spools_to_a_temp_dir_it_removes():
+    async def handler(job):
+        return {}
+
+    async def run():
+        queue = JobQueue(handler)
+        assert queue.spool_dir is None
+        await queue.submit(b"%PDF-1.4 resume", "resume.pdf")
+        spool_dir = queue.spool_dir
+        assert os.path.isdir(spool_dir)
+        await queue.close()
+        return spool_dir
+
+    assert not os.path.exists(asyncio.run(run()))
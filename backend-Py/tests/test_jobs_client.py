@@ -0,0 +1,139 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from job_recommender import JobCorpus
+from jobs_client import JobsClient, JobsUpstreamError
+
+LISTINGS = {
+    "1": {"job_id": "py-1", "job_title": "Python Developer", "job_description": "Python, Django and PostgreSQL"},
+    "2": {"job_id": "js-1", "job_title": "Frontend Engineer", "job_description": "React and TypeScript"},
+}
+
+
+class StubJSearch:
+    """httpx transport answering /search with one listing per page"""
+
+    def __init__(self):
+        self.requests = []
+        self.failing = False
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.failing:
+            return httpx.Response(502)
+        assert request.headers["X-RapidAPI-Key"] == "test-key"
+        return httpx.Response(200, json={"data": [LISTINGS[request.url.params["page"]]]})
+
+
+@pytest.fixture
+def upstream():
+    return StubJSearch()
+
+
+def _client(upstream, **kwargs):
+    return JobsClient(api_key="test-key", transport=httpx.MockTransport(upstream), **kwargs)
+
+
+def test_pages_are_fetched_and_cached(upstream):
+    async def run():
+        client = _client(upstream)
+        try:
+            return await client.get_jobs("Python  Developer", "Pune", 2), await client.get_jobs("python developer", "pune", 2)
+        finally:
+            await client.aclose()
+
+    first, second = asyncio.run(run())
+    assert first["cache"] == "miss" and second["cache"] == "fresh"
+    assert [job["job_id"] for job in first["jobs"]] == ["py-1", "js-1"]
+    assert sorted(r.url.params["page"] for r in upstream.requests) == ["1", "2"]
+    assert upstream.requests[0].url.params["query"] == "python developer in pune"
+
+
+def test_stale_entries_are_served_while_refreshing(upstream):
+    async def run():
+        client = _client(upstream, ttl=0, stale=60)
+        try:
+            await client.get_jobs()
+            stale = await client.get_jobs()
+            await asyncio.sleep(0.05)  # let the background refresh finish
+            return stale
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run())["cache"] == "stale"
+    assert len(upstream.requests) == 2
+
+
+def test_upstream_failure(upstream):
+    async def run():
+        client = _client(upstream, ttl=0, stale=0)
+        try:
+            upstream.failing = True
+            with pytest.raises(JobsUpstreamError):
+                await client.get_jobs()
+            upstream.failing = False
+            await client.get_jobs()
+            upstream.failing = True
+            return await client.get_jobs()
+        finally:
+            await client.aclose()
+
+    # With an earlier result cached, a failed refetch serves it as stale
+    assert asyncio.run(run())["cache"] == "stale"
+
+
+def test_fetched_listings_reach_the_corpus_off_the_loop(upstream):
+    corpus = JobCorpus()
+    threads = []
+
+    def on_fetch(jobs, search):
+        threads.append(threading.current_thread())
+        corpus.upsert(jobs, search)
+
+    async def run():
+        client = _client(upstream, on_fetch=on_fetch)
+        try:
+            await client.get_jobs(num_pages=2)
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    assert threads and threads[0] is not threading.main_thread()
+    top = corpus.recommend(["python", "django"])["results"]
+    assert [result["job"]["job_id"] for result in top] == ["py-1"]
+
+
+def _listing(job_id, description="Python and Django"):
+    return {"job_id": job_id, "job_title": "Developer", "job_description": description}
+
+
+def _ids(corpus):
+    return sorted(result["job"]["job_id"] for result in corpus.recommend(["python"], k=100)["results"])
+
+
+def test_corpus_drops_listings_a_search_no_longer_returns():
+    corpus = JobCorpus()
+    corpus.upsert([_listing("a"), _listing("b")], "python")
+    corpus.upsert([_listing("b"), _listing("c")], "django")
+    corpus.upsert([_listing("c")], "python")
+    # b is still listed by the django search
+    assert _ids(corpus) == ["b", "c"]
+    corpus.upsert([], "django")
+    assert _ids(corpus) == ["c"]
+    assert len(corpus) == 1 and corpus.dropped == 2
+
+
+def test_corpus_drops_expired_listings_and_keeps_the_most_recent():
+    corpus = JobCorpus(max_age=60, max_jobs=3)
+    corpus.upsert([_listing(str(n), "Python" if n % 2 else "Python and Django") for n in range(5)])
+    assert _ids(corpus) == ["0", "1", "2"]
+    corpus._seen_at[0] -= 120  # listing 0 was seen long ago
+    corpus.upsert([_listing("5", "Django")])
+    assert len(corpus) == 3
+    # Rows still line up with their listings after compaction
+    results = corpus.recommend(["django"], k=100)["results"]
+    assert sorted(result["job"]["job_id"] for result in results) == ["2", "5"]
+    assert _ids(corpus) == ["1", "2"]
@@ -0,0 +1,36 @@
+import pytest
+
+from keyword_matcher import KeywordMatcher
+from resume_features import KEYWORDS, extract_features
+
+
+@pytest.mark.parametrize("text", [
+    "Expressed interest in mobile work",
+    "Springs and dampers for test rigs",
+    "Section heading layout",
+    "Built apps in react-native",
+    "Pythonic code",
+])
+def test_skills_match_exactly(text):
+    skills = extract_features(text).skills
+    assert not {kw for keywords in skills.values() for kw in keywords} & {"express", "spring", "react", "python"}
+    assert "head" not in KEYWORDS.scan(text).get("leadership", [])
+
+
+def test_section_words_match_inflected():
+    matches = KEYWORDS.scan("Engineers who led projects and mentored leads")
+    assert "engineer" in matches["experience"]
+    assert "project" in matches["projects"]
+    assert "lead" in matches["leadership"]
+
+
+def test_skills_match_as_words():
+    skills = extract_features("Python, React and Node.js on AWS; CI/CD with Docker").skills
+    found = {kw for keywords in skills.values() for kw in keywords}
+    assert {"python", "react", "node", "aws", "ci/cd", "docker"} <= found
+
+
+def test_inflections_apply_per_group():
+    matcher = KeywordMatcher({"verbs": ["build"], "tools": ["build"]}, inflections={"verbs": ("s", "ing")})
+    assert matcher.scan("building") == {"verbs": ["build"]}
+    assert matcher.scan("build") == {"verbs": ["build"], "tools": ["build"]}
@@ -0,0 +1,74 @@
+import asyncio
+
+from llm_enrichment import Enricher, StubProvider, build_prompt
+
+RESULT = {
+    "scores": {"ats": 72, "strength": 6},
+    "experience": {"level": "Mid-Level Developer", "years": 5},
+    "skills": {"Programming Languages": ["Python"]},
+    "sections": {"metrics": False},
+    "missing": ["Quantifiable achievements and metrics"],
+}
+
+
+class FailingProvider:
+    async def generate(self, prompt):
+        raise RuntimeError("quota exceeded")
+
+
+def test_prompt_leaves_out_the_resume_text_and_is_deterministic():
+    prompt = build_prompt(RESULT, "  Senior   Python engineer ")
+    assert prompt == build_prompt(dict(reversed(list(RESULT.items()))), "Senior Python engineer")
+    assert "Senior Python engineer" in prompt
+
+
+def test_output_is_cleaned_and_cached():
+    provider = StubProvider(delay=0)
+    enricher = Enricher(provider, deadline=1)
+
+    async def run():
+        return await enricher.enrich(RESULT), await enricher.enrich(RESULT)
+
+    first, second = asyncio.run(run())
+    assert first["status"] == "ready" and "**" not in first["text"]
+    assert second == first
+    assert provider.calls == 1
+
+
+def test_concurrent_identical_prompts_share_one_call():
+    provider = StubProvider(delay=0.05)
+    enricher = Enricher(provider, deadline=1)
+
+    async def run():
+        return await asyncio.gather(*(enricher.enrich(RESULT) for _ in range(3)))
+
+    assert [r["status"] for r in asyncio.run(run())] == ["ready"] * 3
+    assert provider.calls == 1
+    assert enricher.stats()["coalesced"] == 2
+
+
+def test_slow_model_answers_later_by_id():
+    enricher = Enricher(StubProvider(delay=0.1), deadline=0.01)
+
+    async def run():
+        pending = await enricher.enrich(RESULT)
+        assert enricher.lookup(pending["id"])["status"] == "pending"
+        await asyncio.sleep(0.2)
+        return pending
+
+    pending = asyncio.run(run())
+    assert pending["status"] == "pending" and pending["text"] is None
+    assert enricher.lookup(pending["id"])["status"] == "ready"
+    assert enricher.stats()["deadline_misses"] == 1
+
+
+def test_failures_are_reported_not_raised():
+    enricher = Enricher(FailingProvider(), deadline=1)
+    failed = asyncio.run(enricher.enrich(RESULT))
+    assert failed["status"] == "failed"
+    assert enricher.lookup(failed["id"])["error"] == "quota exceeded"
+    assert enricher.lookup("unknown") is None
+
+
+def test_disabled_without_a_provider():
+    assert asyncio.run(Enricher(None).enrich(RESULT))["status"] == "disabled"
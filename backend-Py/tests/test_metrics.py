@@ -0,0 +1,61 @@
+import re
+
+from fastapi.testclient import TestClient
+
+import main
+import metrics
+from benchmarks.synthetic_pdfs import make_pdf
+
+
+def _samples(text):
+    """{series: value} of a text exposition, comments skipped"""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines() if line and not line.startswith("#")
+    }
+
+
+def test_exposition_format():
+    registry = metrics.Registry()
+    registry.histogram("stage_seconds", "Stage time", buckets=(0.1, 1))
+    registry.counter("pages_total", "Pages")
+    registry.gauge("depth", "Queue depth", lambda: 3)
+    registry.apply([
+        ("stage_seconds", (("stage", "ocr"),), 0.5, True),
+        ("stage_seconds", (("stage", "ocr"),), 2.0, True),
+        ("pages_total", (("method", "text"),), 2, False),
+        ("unregistered", (), 1, False),
+    ])
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert _samples(text) == {
+        'stage_seconds_bucket{stage="ocr",le="0.1"}': 0,
+        'stage_seconds_bucket{stage="ocr",le="1"}': 1,
+        'stage_seconds_bucket{stage="ocr",le="+Inf"}': 2,
+        'stage_seconds_sum{stage="ocr"}': 2.5,
+        'stage_seconds_count{stage="ocr"}': 2,
+        'pages_total{method="text"}': 2,
+        "depth": 3,
+    }
+
+
+def test_metrics_endpoint_reports_an_analysis(monkeypatch):
+    monkeypatch.setattr(main, "analysis_cache", main.AnalysisCache(db_path=None))
+    monkeypatch.setattr(main, "resume_index", main.ResumeIndex(db_path=None, enabled=False))
+    client = TestClient(main.app)
+    before = _samples(client.get("/metrics").text)
+
+    files = {"file": ("resume.pdf", make_pdf("text", 2), "application/pdf")}
+    assert client.post("/analyze-resume/?format=json", files=files).status_code == 200
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    after = _samples(response.text)
+
+    def grew(series, by=1):
+        return after.get(series, 0) - before.get(series, 0) == by
+
+    assert grew('resume_extraction_pages_total{method="text"}', 2)
+    assert grew('resume_stage_duration_seconds_count{stage="text_pass"}', 2)
+    assert grew('resume_stage_duration_seconds_count{stage="scoring"}')
+    assert grew('http_requests_total{method="POST",status="200"}')
+    assert re.search(r"^resume_queue_depth 0$", response.text, re.M)
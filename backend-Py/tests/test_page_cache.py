@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+import main
+from benchmarks.synthetic_pdfs import make_pdf, resume_lines
+from pdf_extraction import PageText, text_pages
+
+
+@pytest.fixture
+def ocr_calls(monkeypatch):
+    """Fake OCR stage that records the pages it was asked for"""
+    calls = []
+    lines = resume_lines(2)
+
+    def ocr_pages(source, sizes):
+        calls.append(sorted(sizes))
+        return [PageText(number, "\n".join(lines[number - 1]), "ocr", size) for number, size in sizes.items()]
+
+    monkeypatch.setattr(main, "ocr_pages", ocr_pages)
+    monkeypatch.setattr(main, "PYTESSERACT_AVAILABLE", True)
+    monkeypatch.setattr(main, "analysis_cache", main.AnalysisCache(db_path=None))
+    monkeypatch.setattr(main, "page_cache", main.AnalysisCache(db_path=None))
+    monkeypatch.setattr(main, "resume_index", main.ResumeIndex(db_path=None, enabled=False))
+    return calls
+
+
+def test_text_pass_fingerprints_each_page():
+    first, second = text_pages(make_pdf("text", 2))
+    assert first.key and second.key and first.key != second.key
+    assert [page.key for page in text_pages(make_pdf("text", 2))] == [first.key, second.key]
+    assert text_pages(make_pdf("text", 2, seed=1))[0].key != first.key
+
+
+def test_reupload_only_ocrs_changed_pages(ocr_calls):
+    scan = make_pdf("scanned", 2)
+    first = asyncio.run(main.analyze_pdf(scan, "", "resume.pdf"))
+    assert ocr_calls == [[1, 2]]
+    assert first["extraction"]["reused_pages"] == []
+
+    # Different bytes, same pages: nothing is OCR'd again
+    second = asyncio.run(main.analyze_pdf(scan + b"\n% saved again\n", "", "resume.pdf"))
+    assert ocr_calls == [[1, 2]]
+    assert second["extraction"]["reused_pages"] == [1, 2]
+    assert second["scores"] == first["scores"]
+
+    # A new document's pages all miss
+    asyncio.run(main.analyze_pdf(make_pdf("scanned", 2, seed=1), "", "resume.pdf"))
+    assert ocr_calls == [[1, 2], [1, 2]]
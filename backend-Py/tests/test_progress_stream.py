@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.synthetic_pdfs import make_pdf
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "analysis_cache", main.AnalysisCache(db_path=None))
+    monkeypatch.setattr(main, "page_cache", main.AnalysisCache(db_path=None))
+    monkeypatch.setattr(main, "resume_index", main.ResumeIndex(db_path=None, enabled=False))
+    return TestClient(main.app)
+
+
+def _events(response):
+    """[(event, data)] of an SSE response body"""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def _stream(client, pdf):
+    files = {"file": ("resume.pdf", pdf, "application/pdf")}
+    response = client.post("/analyze-resume/stream?format=json", files=files)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return _events(response)
+
+
+def test_stages_are_reported_in_order(client):
+    events = _stream(client, make_pdf("text", 2))
+    assert [name for name, _ in events] == ["received", "page", "page", "extracted", "features", "scores", "report"]
+    assert [data["page"] for name, data in events if name == "page"] == [1, 2]
+    assert events[3][1]["pages"] == 2
+    assert events[-1][1]["resumeScore"] == events[-2][1]["ats"]
+
+
+def test_cache_hit_skips_the_pipeline_events(client):
+    pdf = make_pdf("text", 1)
+    first = _stream(client, pdf)
+    again = _stream(client, pdf)
+    assert [name for name, _ in again] == ["received", "cached", "scores", "report"]
+    assert again[-1][1]["result"]["scores"] == first[-1][1]["result"]["scores"]
+
+
+def test_failures_end_the_stream_with_an_error_event(client):
+    events = _stream(client, b"%PDF-1.4 not really a pdf")
+    assert [name for name, _ in events] == ["received", "extracted", "error"]
+    assert events[-1][1]["status"] == 422
@@ -0,0 +1,19 @@
+import logging
+
+import request_log
+import resume_analyzer
+
+
+def test_failed_analysis_is_logged_and_falls_back(monkeypatch):
+    events = []
+    monkeypatch.setattr(request_log, "event", lambda name, level=logging.INFO, **fields: events.append((name, level, fields)))
+
+    def broken(*args):
+        raise ValueError("bad table")
+
+    monkeypatch.setattr(resume_analyzer, "generate_intelligent_analysis", broken)
+    result = resume_analyzer.analyze_resume_text("Jane Doe\nExperience\nPython developer")
+    assert result["analyzer"] == "fallback"
+    [(name, level, fields)] = events
+    assert (name, level, fields["analyzer"], fields["error"]) == ("analysis_failed", logging.WARNING, "intelligent", "bad table")
+    assert fields["exc"] is True
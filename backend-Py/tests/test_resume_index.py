@@ -0,0 +1,30 @@
+import time
+
+from resume_index import ResumeIndex, analyze_for_index
+
+RESUME = "Jane Doe\nExperience\nPython and Docker developer, {years} years of experience.\nEducation: BSc"
+
+
+def _document(doc_id, years):
+    return analyze_for_index(RESUME.format(years=years), None, doc_id, f"{doc_id}.pdf")[1]
+
+
+def test_index_is_rebuilt_oldest_first_from_sqlite(tmp_path):
+    db_path = str(tmp_path / "index.db")
+    index = ResumeIndex(db_path=db_path, enabled=True, max_documents=2)
+    for doc_id, years in (("a", 3), ("b", 5), ("c", 7)):
+        index.add(_document(doc_id, years))
+        time.sleep(0.001)
+    index.add(_document("b", 6))  # replacing b makes it the newest
+    index.close()
+    assert index.stats()["disk_writes_dropped"] == 0
+
+    reopened = ResumeIndex(db_path=db_path, enabled=True, max_documents=2)
+    assert reopened.get("a") is None
+    assert reopened.get("b").years == 6
+    reopened.add(_document("d", 8))
+    # c is now the oldest, so it is the one evicted
+    assert reopened.get("c") is None
+    assert reopened.get("b") is not None
+    assert reopened.search(skills=["python"])["total"] == 2
+    reopened.close()
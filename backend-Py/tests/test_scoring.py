@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_pdfs import resume_lines
+from resume_analyzer import generate_analysis_from_parsed_data, generate_fallback_analysis, generate_intelligent_analysis
+from resume_features import extract_features
+from scoring import SCORERS, TABLES, feature_matrix, score, score_batch
+
+RESUMES = [
+    "",
+    "John Roe\nSkills: Excel",
+    "Jane Doe\njane@example.com | +1 555 123 4567\nExperience\nLed a team of 5, cut costs by 30%.\n"
+    "Projects: github.com/jane\nEducation: BSc\nAWS Certified Solutions Architect\n10 years of experience",
+] + ["\n".join(line for page in resume_lines(pages, seed) for line in page) for seed, pages in ((0, 1), (1, 3), (2, 5))]
+FEATURES = [extract_features(text) for text in RESUMES]
+
+
+@pytest.mark.parametrize("analyzer", sorted(TABLES))
+def test_batch_scores_equal_scalar_scores(analyzer):
+    batch = score_batch(analyzer, feature_matrix(FEATURES))
+    for name in ("ats", "strength"):
+        scalar = [score(analyzer, features)[name] for features in FEATURES]
+        assert batch[name].tolist() == scalar
+
+
+def test_analyzers_report_their_table_scores():
+    for features, text in zip(FEATURES, RESUMES):
+        assert generate_intelligent_analysis(text, features=features)["scores"] == score("intelligent", features)
+        assert generate_analysis_from_parsed_data(features)["scores"] == score("parsed", features)
+        assert generate_fallback_analysis(text, features=features)["scores"] == score("fallback", features)
+
+
+def test_scores_are_clamped():
+    table = TABLES["intelligent"]["ats"]
+    matrix = feature_matrix(FEATURES)
+    scores = SCORERS["intelligent"]["ats"].score_batch(matrix)
+    assert np.all((scores >= table.floor) & (scores <= table.cap))
+    assert SCORERS["intelligent"]["ats"].score(matrix[0]) == table.floor
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+        return flights, results
+
+    flights, results = asyncio.run(run())
+    assert results == [1] * 5
+    assert calls == 1
+    assert flights.joined == 4
+    assert flights.waiting() == 0
+
+
+def test_finished_call_is_not_joined():
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("first")
+
+    async def succeed():
+        return "second"
+
+    async def run():
+        flights = SingleFlight()
+        first = asyncio.ensure_future(flights.do("key", fail))
+        joined = asyncio.ensure_future(flights.do("key", succeed))
+        with pytest.raises(ValueError):
+            await joined
+        # The failed call may still be registered when the joiner wakes up
+        return await flights.do("key", succeed), first
+
+    result, first = asyncio.run(run())
+    assert result == "second"
+    assert isinstance(first.exception(), ValueError)
+
+
+def test_interactive_caller_does_not_wait_on_a_queued_batch_run(monkeypatch):
+    import main
+    import workers
+    from benchmarks.synthetic_pdfs import make_pdf
+
+    monkeypatch.setattr(main, "analysis_cache", main.AnalysisCache(db_path=None))
+    monkeypatch.setattr(workers, "_slot_freed", None)
+    # Every slot is taken, so the batch run queues for one
+    monkeypatch.setattr(workers, "_in_flight", workers.MAX_WORKERS + workers.MAX_QUEUE)
+    pdf = make_pdf("text", 1)
+
+    async def run():
+        batch = asyncio.ensure_future(main.analyze_pdf(pdf, None, "resume.pdf", wait_for_slot=True))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(workers.QueueFullError):
+                await asyncio.wait_for(main.analyze_pdf(pdf, None, "resume.pdf"), 1)
+        finally:
+            batch.cancel()
+
+    asyncio.run(run())
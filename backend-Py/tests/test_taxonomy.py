@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+import taxonomy
+from job_recommender import JobCorpus
+from resume_analyzer import analyze_resume_text
+from resume_features import extract_features
+from taxonomy import Taxonomy, compile_taxonomy, default_source
+
+SOURCE = {"skills": [
+    {"name": "PyTorch", "category": "ML", "aliases": ["torch"]},
+    {"name": "Kubernetes", "category": "DevOps", "aliases": ["k8s"]},
+    {"name": "Google Cloud Platform", "category": "Cloud", "aliases": ["gcp"]},
+    {"name": "Node.js", "category": "Backend", "aliases": ["node"]},
+]}
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    source = tmp_path / "skills.json"
+    source.write_text(json.dumps(SOURCE))
+    output = tmp_path / "skills.bin"
+    taxonomy.main(["build", "--source", str(source), "--output", str(output)])
+    return str(output)
+
+
+@pytest.fixture
+def use_taxonomy(monkeypatch):
+    def use(loaded):
+        monkeypatch.setattr(taxonomy, "_taxonomy", loaded)
+        taxonomy.canonical_name.cache_clear()
+
+    yield use
+    taxonomy.canonical_name.cache_clear()
+
+
+def test_artifact_opens_and_resolves_aliases(artifact):
+    loaded = Taxonomy.open(artifact)
+    assert loaded.stats()["skills"] == 4
+    assert loaded.canonical("K8S") == ("kubernetes", "DevOps")
+    assert loaded.canonical("node js") == ("node.js", "Backend")
+    assert loaded.canonical("cobol") is None
+    assert loaded.resolve("Trained torch models on google cloud platform with k8s") == {
+        "pytorch": "ML", "google cloud platform": "Cloud", "kubernetes": "DevOps",
+    }
+
+
+def test_longest_term_wins_and_compounds_do_not_count():
+    loaded = Taxonomy(compile_taxonomy(default_source()))
+    assert loaded.resolve("google cloud platform") == {"gcp": "DevOps"}
+    assert loaded.resolve("react-native and ms-sql") == {}
+
+
+def test_built_in_taxonomy_resolves_aliases_for_every_analyzer():
+    result = analyze_resume_text("Skills: k8s, postgres and reactjs")
+    assert result["skills"] == {"DevOps": ["kubernetes"], "Database": ["postgresql"], "Frontend": ["react"]}
+    features = extract_features("k8s, next.js and asp.net")
+    assert features.skills_for("parser_skills") == {"DevOps": ["kubernetes"], "Frontend": ["next.js"]}
+    assert features.skills_for("fallback_skills") == {"DevOps": ["kubernetes"]}
+
+
+def test_analysis_uses_the_loaded_artifact(artifact, use_taxonomy):
+    use_taxonomy(Taxonomy.open(artifact))
+    result = analyze_resume_text("Built torch pipelines on k8s")
+    assert result["skills"] == {"ML": ["pytorch"], "DevOps": ["kubernetes"]}
+
+
+def test_recommendations_use_the_loaded_artifact(artifact, use_taxonomy):
+    use_taxonomy(Taxonomy.open(artifact))
+    corpus = JobCorpus()
+    corpus.upsert([
+        {"job_id": "ml", "job_title": "ML engineer", "job_description": "PyTorch and Kubernetes"},
+        {"job_id": "web", "job_title": "Web developer", "job_description": "node js"},
+    ])
+    ranked = corpus.recommend(["torch"])
+    assert [result["job"]["job_id"] for result in ranked["results"]] == ["ml"]
+    assert ranked["results"][0]["matched_skills"] == ["pytorch"]
+    assert ranked["results"][0]["missing_skills"] == ["kubernetes"]
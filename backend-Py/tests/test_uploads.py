@@ -0,0 +1,45 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from uploads import READ_CHUNK_BYTES, UploadSizeLimitMiddleware
+
+LIMIT = 1000
+
+
+def _client():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"bytes": len(await request.body())}
+
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=LIMIT, path_limits={"/batch": 10 * LIMIT})
+
+    @app.post("/batch")
+    async def batch(request: Request):
+        return {"bytes": len(await request.body())}
+
+    return TestClient(app)
+
+
+def test_body_within_limit_is_accepted():
+    assert _client().post("/upload", content=b"x" * LIMIT).json() == {"bytes": LIMIT}
+
+
+def test_declared_length_over_limit_is_refused():
+    response = _client().post("/upload", content=b"x" * (LIMIT + READ_CHUNK_BYTES + 1))
+    assert response.status_code == 413
+    assert str(LIMIT) in response.json()["detail"]
+
+
+def test_streamed_body_over_limit_is_refused():
+    def chunks():
+        for _ in range(20):
+            yield b"x" * READ_CHUNK_BYTES
+
+    assert _client().post("/upload", content=chunks()).status_code == 413
+
+
+def test_path_limits_raise_the_limit_for_batch_routes():
+    body = b"x" * (LIMIT + READ_CHUNK_BYTES + 1)
+    assert _client().post("/batch", content=body).status_code == 200
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import workers
+
+
+def test_stage_over_budget_times_out(monkeypatch):
+    monkeypatch.setattr(workers, "TIMEOUT_GRACE_SECONDS", 0)
+
+    async def run():
+        try:
+            await workers.run_stage("slow", time.sleep, 0.2, timeout=0.05)
+        finally:
+            # Let the abandoned stage finish and give back its slot
+            await asyncio.sleep(0.3)
+
+    with pytest.raises(workers.StageTimeoutError) as raised:
+        asyncio.run(run())
+    assert raised.value.stage == "slow"
+
+
+def test_check_deadline_stops_stepwise_stage():
+    steps = []
+
+    def stepwise():
+        for step in range(100):
+            workers.check_deadline()
+            steps.append(step)
+            time.sleep(0.01)
+
+    with pytest.raises(workers.StageTimeoutError):
+        workers._call_with_deadline("steps", 0.05, stepwise, ())
+    assert 0 < len(steps) < 100
+
+
+def test_check_deadline_outside_a_stage_is_a_no_op():
+    workers.check_deadline()
+
+
+def test_full_pool_turns_away_callers_that_do_not_wait(monkeypatch):
+    monkeypatch.setattr(workers, "MAX_WORKERS", 1)
+    monkeypatch.setattr(workers, "MAX_QUEUE", 0)
+
+    async def run():
+        async with workers.job_slot():
+            with pytest.raises(workers.QueueFullError):
+                async with workers.job_slot():
+                    pass
+
+    asyncio.run(run())
+
+
+def test_broken_process_pool_is_replaced(monkeypatch):
+    monkeypatch.setattr(workers, "EXECUTION_MODE", "process")
+    monkeypatch.setattr(workers, "MAX_WORKERS", 1)
+    workers.shutdown()
+
+    async def run():
+        with pytest.raises(BrokenProcessPool):
+            await workers.run_stage("crash", os._exit, 1, timeout=30)
+        return await workers.run_stage("after", abs, -3, timeout=30)
+
+    try:
+        assert asyncio.run(run()) == 3
+    finally:
+        workers.shutdown()
+
+
+def test_timed_out_stage_keeps_its_slot_until_it_stops(monkeypatch):
+    monkeypatch.setattr(workers, "TIMEOUT_GRACE_SECONDS", 0)
+
+    async def run():
+        async with workers.job_slot():
+            with pytest.raises(workers.StageTimeoutError):
+                await workers.run_stage("slow", time.sleep, 0.3, timeout=0.05)
+        still_running = workers.queue_depth()
+        await asyncio.sleep(0.5)
+        return still_running, workers.queue_depth()
+
+    assert asyncio.run(run()) == (1, 0)
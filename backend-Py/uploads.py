@@ -0,0 +1,128 @@
+"""Upload ingestion: streaming size limits and in-memory PDF sources"""
+
+import contextlib
+import os
+import tempfile
+
+import metrics
+from metrics import timed
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Uploads above this size are handed to workers as a temp file path instead
+# of being pickled through the pool's pipe
+SPILL_THRESHOLD_BYTES = int(os.getenv("UPLOAD_SPILL_BYTES", str(4 * 1024 * 1024)))
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES"""
+
+    def __init__(self, limit=MAX_UPLOAD_BYTES):
+        super().__init__(limit)
+        self.limit = limit
+
+    def __str__(self):
+        return f"Upload exceeds the {self.limit} byte limit"
+
+
+class UploadSizeLimitMiddleware:
+    """Reject request bodies over the limit while they are still streaming in.
+
+    A declared Content-Length over the limit is refused before any body is
+    read; otherwise bytes are counted as they arrive and the request is cut
+    off with 413 as soon as the running total passes the limit.
+    """
+
+    def __init__(self, app, max_bytes=MAX_UPLOAD_BYTES, path_limits=None):
+        self.app = app
+        self.max_bytes = max_bytes
+        # Routes that legitimately take larger bodies, e.g. batch uploads
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_bytes)
+        # Allow for multipart boundaries and the other form fields
+        allowed = limit + READ_CHUNK_BYTES
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > allowed:
+            await _send_too_large(send, limit)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > allowed:
+                    exceeded = True
+                    raise UploadTooLargeError(limit)
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # Whatever the app makes of the aborted body (FastAPI turns it
+            # into a 400), the client gets a 413
+            if exceeded:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLargeError:
+            pass
+        if exceeded and not response_started:
+            await _send_too_large(send, limit)
+
+
+async def _send_too_large(send, limit):
+    body = b'{"detail":"' + str(UploadTooLargeError(limit)).encode() + b'"}'
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def read_upload(upload, max_bytes=MAX_UPLOAD_BYTES):
+    """Read an UploadFile into memory in chunks, enforcing the size limit"""
+    chunks = []
+    total = 0
+    with timed("upload"):
+        while True:
+            chunk = await upload.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            chunks.append(chunk)
+    metrics.inc("resume_uploads_total")
+    metrics.inc("resume_upload_bytes_total", total)
+    return b"".join(chunks)
+
+
+@contextlib.contextmanager
+def pdf_source(pdf_bytes):
+    """Yield the bytes themselves, or a temp file path above the spill threshold"""
+    if len(pdf_bytes) <= SPILL_THRESHOLD_BYTES:
+        yield pdf_bytes
+        return
+
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        yield path
+    finally:
+        os.unlink(path)
@@ -0,0 +1,305 @@
+"""Execution pool for the blocking resume pipeline stages.
+
+PDF parsing, OCR and scoring are CPU-bound and synchronous, so running them
+directly inside an async route stalls uvicorn's event loop for every other
+request.  Routes submit those stages here instead.
+
+RESUME_EXECUTION_MODE selects where stages run:
+- "process" (default): a spawn-based process pool, one job per worker
+- "thread": a thread pool, for hosts where subprocesses are unavailable
+- "inline": on the event loop, the old behaviour (debugging only)
+
+At most RESUME_WORKERS + RESUME_MAX_QUEUE requests are admitted at once;
+anything beyond that is rejected with QueueFullError so callers can answer
+503 instead of letting latency grow without bound.  A stage that runs past
+its budget keeps its slot until its worker actually stops, and a process
+pool left broken by a dead worker is replaced on the next stage.
+
+RESUME_RSS_LIMIT_MB, if set, also gates admission on memory: while the
+resident memory of this process and its pool workers is at or above the
+limit, new requests are rejected with MemoryPressureError (a QueueFullError)
+or, for callers that wait, held until it drops.  RSS is read from /proc;
+where that is unavailable the gate is off.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+import request_log
+
+EXECUTION_MODE = os.getenv("RESUME_EXECUTION_MODE", "process").lower()
+MAX_WORKERS = int(os.getenv("RESUME_WORKERS", str(os.cpu_count() or 2)))
+MAX_QUEUE = int(os.getenv("RESUME_MAX_QUEUE", "16"))
+MAX_TASKS_PER_WORKER = int(os.getenv("RESUME_WORKER_MAX_TASKS", "0"))
+RSS_LIMIT_MB = int(os.getenv("RESUME_RSS_LIMIT_MB", "0"))
+RSS_POLL_SECONDS = 0.25
+
+# Per-stage budgets in seconds
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "60"))
+ANALYSIS_TIMEOUT = float(os.getenv("ANALYSIS_TIMEOUT_SECONDS", "10"))
+
+# Extra time the event loop waits past a stage budget before giving up, so the
+# worker-side alarm normally fires first and the worker is freed cleanly
+TIMEOUT_GRACE_SECONDS = 2.0
+
+_executor = None
+_executor_lock = threading.Lock()
+# Budget of the stage running on the current worker thread, see check_deadline()
+_current_stage = threading.local()
+_in_flight = 0
+_slot_freed = None
+
+
+class QueueFullError(Exception):
+    """Raised when the pool already holds the maximum number of requests"""
+
+    def __init__(self, retry_after=5):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return "Resume analysis queue is full, please retry shortly"
+
+
+class MemoryPressureError(QueueFullError):
+    """Raised when memory use is too high to admit another request"""
+
+    def __str__(self):
+        return "Server is low on memory, please retry shortly"
+
+
+class StageTimeoutError(Exception):
+    """Raised when a pipeline stage exceeds its time budget"""
+
+    def __init__(self, stage, timeout):
+        super().__init__(stage, timeout)
+        self.stage = stage
+        self.timeout = timeout
+
+    def __str__(self):
+        return f"{self.stage} stage exceeded {self.timeout:g}s"
+
+
+class _DeadlineExpired(BaseException):
+    # BaseException so the broad `except Exception` blocks in the extraction
+    # code cannot swallow it
+    pass
+
+
+def _raise_deadline(signum, frame):
+    raise _DeadlineExpired()
+
+
+def _call_with_deadline(stage, timeout, fn, args):
+    """Run fn inside a pool worker, interrupting it once the budget is spent.
+
+    Returns (result, metric events recorded by the worker during the call).
+    """
+    _current_stage.budget = (stage, timeout, time.monotonic() + timeout)
+    try:
+        if threading.current_thread() is not threading.main_thread():
+            # Thread workers cannot receive signals; the caller-side timeout
+            # applies, plus check_deadline() in long-running stages
+            return fn(*args), metrics.drain()
+
+        previous = signal.signal(signal.SIGALRM, _raise_deadline)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            return fn(*args), metrics.drain()
+        except _DeadlineExpired:
+            raise StageTimeoutError(stage, timeout) from None
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    finally:
+        _current_stage.budget = None
+
+
+def check_deadline():
+    """Raise StageTimeoutError if the stage running on this thread is past its budget.
+
+    For stages that work in steps (e.g. page by page), so they stop between
+    steps even where no alarm signal can interrupt them.
+    """
+    budget = getattr(_current_stage, "budget", None)
+    if budget is not None and time.monotonic() >= budget[2]:
+        raise StageTimeoutError(budget[0], budget[1])
+
+
+def get_executor():
+    """Return the shared executor, creating it on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if EXECUTION_MODE == "thread":
+                    _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="resume")
+                else:
+                    # Workers log through the same structured logger as the server
+                    kwargs = {
+                        "mp_context": multiprocessing.get_context("spawn"),
+                        "initializer": request_log.setup_logging,
+                    }
+                    if MAX_TASKS_PER_WORKER > 0:
+                        kwargs["max_tasks_per_child"] = MAX_TASKS_PER_WORKER
+                    _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS, **kwargs)
+    return _executor
+
+
+def warm_pool(fn, *args):
+    """Start the pool's workers now, running fn(*args) on them, rather than on the first requests
+
+    Best effort: every worker is spawned, but one may run fn more than once.
+    """
+    if EXECUTION_MODE != "process":
+        return []
+    executor = get_executor()
+    return [executor.submit(fn, *args) for _ in range(MAX_WORKERS)]
+
+
+def _discard_executor(executor):
+    """Drop a broken pool so the next stage builds a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown():
+    """Stop the pool, abandoning queued jobs"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _rss(pid):
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def pool_rss():
+    """Resident memory in bytes of this process and its pool workers, or None if unknown"""
+    try:
+        total = _rss(os.getpid())
+    except (OSError, ValueError, AttributeError):
+        return None
+    # The executor keeps no public list of its worker processes
+    workers = getattr(_executor, "_processes", None) or {}
+    for pid in list(workers):
+        try:
+            total += _rss(pid)
+        except (OSError, ValueError):
+            pass  # Exited since the list was taken
+    return total
+
+
+def memory_pressure():
+    """True when RSS_LIMIT_MB is set and resident memory has reached it"""
+    if RSS_LIMIT_MB <= 0:
+        return False
+    rss = pool_rss()
+    return rss is not None and rss >= RSS_LIMIT_MB * 1024 * 1024
+
+
+def queue_depth():
+    """Number of admitted requests that are running or waiting for a worker"""
+    return _in_flight
+
+
+def _slot_condition():
+    global _slot_freed
+    if _slot_freed is None:
+        _slot_freed = asyncio.Condition()
+    return _slot_freed
+
+
+@contextlib.asynccontextmanager
+async def job_slot(wait=False):
+    """Admit one request into the pool.
+
+    Interactive callers get QueueFullError straight away when the pool is
+    saturated, or MemoryPressureError when memory is near its limit; batch
+    callers pass wait=True to queue until both clear.
+    """
+    global _in_flight
+    if memory_pressure():
+        if not wait:
+            raise MemoryPressureError()
+        while memory_pressure():
+            await asyncio.sleep(RSS_POLL_SECONDS)
+    capacity = MAX_WORKERS + MAX_QUEUE
+    # Only touched from the event loop thread, so no lock is needed
+    if _in_flight >= capacity:
+        if not wait:
+            raise QueueFullError()
+        condition = _slot_condition()
+        async with condition:
+            await condition.wait_for(lambda: _in_flight < capacity)
+    _in_flight += 1
+    try:
+        yield
+    finally:
+        _in_flight -= 1
+        await _notify_slot_freed()
+
+
+async def _notify_slot_freed():
+    if _slot_freed is not None:
+        async with _slot_freed:
+            _slot_freed.notify()
+
+
+def _hold_slot(future):
+    """Keep counting an abandoned stage against admission until its worker is free again"""
+    global _in_flight
+    _in_flight += 1
+
+    def release(done):
+        global _in_flight
+        _in_flight -= 1
+        if not done.cancelled():
+            done.exception()  # Nobody awaits it any more; retrieve it so it is not reported
+        asyncio.ensure_future(_notify_slot_freed())
+
+    future.add_done_callback(release)
+
+
+async def run_stage(stage, fn, *args, timeout):
+    """Run a blocking pipeline stage off the event loop under a time budget"""
+    started = time.perf_counter()
+    if EXECUTION_MODE == "inline":
+        result = fn(*args)
+    else:
+        executor = get_executor()
+        try:
+            submitted = executor.submit(_call_with_deadline, stage, timeout, fn, args)
+            future = asyncio.wrap_future(submitted)
+            # Shielded: on a timeout the stage may still be running, and its
+            # future tells when the worker is free again
+            result, events = await asyncio.wait_for(asyncio.shield(future), timeout + TIMEOUT_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            if not submitted.cancel():
+                _hold_slot(future)
+            raise StageTimeoutError(stage, timeout) from None
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault in a native library); the
+            # executor refuses all further work, so replace it
+            _discard_executor(executor)
+            raise
+        metrics.REGISTRY.apply(events)
+    # Wall time as seen by the caller, including any wait for a free worker
+    metrics.observe("resume_pool_stage_duration_seconds", time.perf_counter() - started, stage=stage)
+    # On the event loop, the registry's only writer: apply this process's events too
+    metrics.REGISTRY.apply(metrics.drain())
+    return result